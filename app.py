@@ -1,33 +1,267 @@
+import gzip
+import hashlib
 import io
+import json
+import mimetypes
 import os
+import re
+import tempfile
+import time
 
-import pandas as pd
-from flask import Flask, jsonify, request, send_file, send_from_directory
+from flask import (Flask, Response, g, jsonify, request, send_file, send_from_directory,
+                   stream_with_context)
 
 app = Flask(__name__, static_folder="static")
 
-# Max players processed in a single bulk request.
-# Players beyond this limit are silently skipped; the caller receives only the
-# first BULK_GENERATION_LIMIT results.  Increase with caution — each player
-# requires several external API calls and can take several seconds.
+# Max players processed in a single synchronous /api/bulk-generate request.
+# Larger requests are rejected rather than truncated.  Each player requires
+# several external API calls and can take several seconds, so larger runs
+# (whole teams or the whole league) should be submitted as a background job
+# via /api/jobs or streamed with ?stream=ndjson.
 BULK_GENERATION_LIMIT = 30
 
+# Max players in one /api/batch-generate request (an explicit list of ids).
+# Larger requests are rejected rather than truncated; use /api/jobs instead.
+BATCH_GENERATION_LIMIT = 100
+
+
+# Cache-Control per kind of response.  Validators (ETag / Last-Modified) are
+# set alongside, so "no-cache" responses are revalidated cheaply with a 304.
+# Every ETag is sent weak (W/"..."): identity, gzip, brotli and precompressed
+# bodies of one resource share a validator, and If-None-Match compares weakly.
+CACHE_POLICIES = {
+    "page":            "no-cache",
+    "asset":           "public, no-cache",
+    # /static/... URLs carrying ?v=<mtime>, as written into index.html
+    "asset_versioned": "public, max-age=31536000, immutable",
+    # Roster data changes at most a few times a day
+    "search":          "public, max-age=60",
+    # Stored tendencies change on refresh / nightly precompute
+    "generate":        "private, no-cache",
+}
+
+# Responses at least this large are compressed when the client accepts it
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+
+_COMPRESSIBLE = ("text/", "application/json", "application/javascript",
+                 "application/vnd.tendencies.", "image/svg+xml")
+
+# Precompressed siblings written by scripts/precompress_static.py
+_PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+
+_ASSET_URL_RE = re.compile(r'/static/([\w./-]+\.(?:js|css))"')
+
 
 def _cors(response):
-    response.headers["Access-Control-Allow-Origin"]  = "*"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type"
-    response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+    response.headers["Access-Control-Allow-Origin"]   = "*"
+    response.headers["Access-Control-Allow-Headers"]  = "Content-Type"
+    response.headers["Access-Control-Allow-Methods"]  = "GET, POST, OPTIONS"
+    response.headers["Access-Control-Expose-Headers"] = "ETag, Last-Modified"
     return response
 
 
+@app.before_request
+def before_request():
+    g.started = time.perf_counter()
+    if request.endpoint == "static":
+        return _precompressed_static(request.view_args.get("filename", ""))
+    if request.path.startswith("/api/") and not request.path.startswith("/api/traces"):
+        from engine import tracing
+        tracing.start_trace(request.url_rule.rule if request.url_rule else request.path)
+    return None
+
+
 @app.after_request
 def after_request(response):
-    return _cors(response)
+    if request.endpoint == "static":
+        # Flask already sets ETag / Last-Modified and answers 304s for static files
+        response.headers["Cache-Control"] = CACHE_POLICIES[
+            "asset_versioned" if request.args.get("v") else "asset"
+        ]
+    response = _cors(_weak_etag(_compress(_finish_trace(response))))
+    _observe_request(response)
+    return response
+
+
+def _observe_request(response):
+    """Request latency by route template (unmatched paths share one label)."""
+    started = g.get("started")
+    if started is None:
+        return
+    from engine import metrics
+    metrics.HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        route=request.url_rule.rule if request.url_rule else "unmatched",
+        method=request.method,
+        status=response.status_code,
+    )
+
+
+# ── Tracing ───────────────────────────────────────────────────────────────────
+
+def _trace_requested():
+    if _flag(request.args.get("trace", "0")) or _flag(request.headers.get("X-Trace", "0")):
+        return True
+    body = request.get_json(silent=True) if request.is_json else None
+    return isinstance(body, dict) and _flag(body.get("trace", False))
+
+
+def _finish_trace(response):
+    """
+    Close the request's trace.  With ?trace=1 (or "trace": true, or an
+    X-Trace: 1 header) the per-stage timings are returned in a
+    Server-Timing header and, for JSON object bodies, under "_trace".
+    """
+    from engine import tracing
+    trace = tracing.current()
+    if trace is None:
+        return response
+    tracing.finish_trace(trace)
+    response.headers["X-Trace-Id"] = str(trace.id)
+    if not _trace_requested():
+        return response
+    response.headers["Server-Timing"] = tracing.server_timing(trace)
+    if response.mimetype == "application/json" and not response.is_streamed:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body["_trace"] = trace.summary()
+            response.set_data(json.dumps(body))
+    return response
+
+
+# ── Compression ───────────────────────────────────────────────────────────────
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def _accepted_encoding(offered):
+    """Best of *offered* ("br", "gzip") the client accepts, or None."""
+    if "br" in offered and _brotli() is None:
+        offered = [e for e in offered if e != "br"]
+    return request.accept_encodings.best_match(offered) if offered else None
+
+
+def _compress(response):
+    """
+    gzip / brotli the body of a complete (non-streamed) response of a
+    compressible type and at least COMPRESS_MIN_BYTES.  Streams (NDJSON,
+    SSE, bulk CSV exports) are left alone so events are not held back.
+    """
+    # send_file() responses look streamed but are whole files (direct_passthrough)
+    if (response.status_code != 200 or (response.is_streamed and not response.direct_passthrough)
+            or "Content-Encoding" in response.headers
+            or not response.mimetype.startswith(_COMPRESSIBLE)):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = _accepted_encoding(["br", "gzip"])
+    if encoding is None:
+        return response
+
+    # File responses (static assets without a precompressed copy) are read here
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    if encoding == "br":
+        body = _brotli().compress(data, quality=5)
+    else:
+        body = gzip.compress(data, compresslevel=6)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def _weak_etag(response):
+    """
+    Send every ETag weak, whatever the encoding and including 304s: the same
+    resource has different bytes per Content-Encoding, so a strong validator
+    would be wrong for all but one of them.
+    """
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def _precompressed_static(filename):
+    """Serve static/<filename>.br / .gz directly when accepted and up to date."""
+    encoding = _accepted_encoding([e for e in _PRECOMPRESSED
+                                   if os.path.exists(os.path.join(app.static_folder, filename + _PRECOMPRESSED[e]))])
+    if encoding is None:
+        return None
+    original   = os.path.join(app.static_folder, filename)
+    compressed = original + _PRECOMPRESSED[encoding]
+    try:
+        if os.path.getmtime(compressed) < os.path.getmtime(original):
+            return None
+    except OSError:
+        return None
+    response = send_from_directory(app.static_folder, filename + _PRECOMPRESSED[encoding],
+                                   mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+# ── HTTP caching ──────────────────────────────────────────────────────────────
+
+def _etag(*parts):
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+
+
+def _fresh(etag, last_modified=None):
+    """True when the client's copy (If-None-Match / If-Modified-Since) is current."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def _with_validators(response, etag, last_modified=None, policy="no-cache"):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = policy
+    return response
+
+
+def _conditional(etag, last_modified, policy, build):
+    """
+    304 if the client's copy is current, otherwise build() -- which is
+    only called when the body is actually needed.
+    """
+    from engine import metrics
+    fresh = _fresh(etag, last_modified)
+    metrics.cache_result("http_304", fresh)
+    if fresh:
+        return _with_validators(Response(status=304), etag, last_modified, policy)
+    return _with_validators(build(), etag, last_modified, policy)
+
+
+def _render_index():
+    """index.html with ?v=<mtime> on its /static/ asset URLs, so assets can be cached for good."""
+    def versioned(m):
+        try:
+            v = int(os.path.getmtime(os.path.join(app.static_folder, m.group(1))))
+        except OSError:
+            return m.group(0)
+        return f'/static/{m.group(1)}?v={v}"'
+
+    with open(os.path.join(app.static_folder, "index.html"), encoding="utf-8") as f:
+        return _ASSET_URL_RE.sub(versioned, f.read())
 
 
 @app.route("/")
 def index():
-    return send_from_directory("static", "index.html")
+    html = _render_index()
+    return _conditional(_etag("index", html), None, CACHE_POLICIES["page"],
+                        lambda: Response(html, mimetype="text/html"))
 
 
 @app.route("/api/search")
@@ -36,52 +270,265 @@ def api_search():
     if not q or len(q) < 2:
         return jsonify([])
     try:
-        from engine.player_search import search_players
-        results = search_players(q, limit=10)
-        sanitized = [
-            {
-                "name":      str(r.get("name", ""))[:100],
-                "team":      str(r.get("team", ""))[:10],
-                "position":  str(r.get("position", ""))[:10],
-                "player_id": int(r.get("player_id", 0)),
-            }
-            for r in results
-        ]
-        return jsonify(sanitized)
+        from engine import tendency_store
+        from engine.player_search import get_snapshot, search_players
+        season = request.args.get("season", "2024-25")
+
+        # Results only change with the roster snapshot or the stored set
+        snapshot = get_snapshot(season)
+        stored_count, stored_latest = tendency_store.season_stamp(season)
+        etag = _etag("search", snapshot.version, stored_count, stored_latest, season, q.lower())
+
+        def build():
+            results = search_players(q, limit=10, season=season)
+            # "stored": tendencies are in the materialized store, so /api/generate is instant
+            stored = tendency_store.stored_ids([r.get("player_id", 0) for r in results], season=season)
+            sanitized = [
+                {
+                    "name":      str(r.get("name", ""))[:100],
+                    "team":      str(r.get("team", ""))[:10],
+                    "position":  str(r.get("position", ""))[:10],
+                    "player_id": int(r.get("player_id", 0)),
+                    "stored":    int(r.get("player_id", 0)) in stored,
+                }
+                for r in results
+            ]
+            return jsonify(sanitized)
+
+        return _conditional(etag, max(snapshot.fetched_at, stored_latest), CACHE_POLICIES["search"], build)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/generate", methods=["POST", "OPTIONS"])
+def _flag(value):
+    """Boolean request parameter: JSON true/1 or query-string "1"/"true"."""
+    return str(value).lower() in ("1", "true") if isinstance(value, str) else bool(value)
+
+
+def _resolve_request_player(body, season):
+    """
+    (player_id, player_name, error) for a request naming one player by
+    "player_id" or "player_name"; *error* is a response to return instead
+    when neither is given or the name does not resolve.
+    """
+    player_id   = body.get("player_id")
+    player_name = body.get("player_name", "")
+    if not player_id and not player_name:
+        return None, None, (jsonify({"error": "player_id or player_name required"}), 400)
+    if not player_id:
+        # Resolve the name up front; generating for ID 0 burns every
+        # NBA endpoint call only to come back empty.
+        from engine.player_search import resolve_player
+        match = resolve_player(player_name, season=season)
+        if not match:
+            return None, None, (jsonify({"error": f"Player not found: {player_name}"}), 404)
+        player_id   = match["id"]
+        player_name = match["name"]
+    return int(player_id), player_name, None
+
+
+def _stored_or_generate(player_id, player_name, season, refresh=False, provenance=False):
+    """
+    (result, computed_at, from_store) for one player: the stored result
+    unless *refresh* or, when *provenance* is wanted, it was stored without
+    one.  Fresh results are generated with provenance and stored with it,
+    so a later debug view shows exactly the data behind the result.
+    """
+    from engine import metrics, tendency_store
+
+    if not refresh:
+        stamp = tendency_store.computed_at(player_id, season=season, with_provenance=provenance)
+        metrics.cache_result("tendency_store", stamp is not None)
+        if stamp is not None:
+            return None, stamp, True
+
+    result = tendency_store.generate(player_id, player_name, season=season)
+    if not provenance:
+        result.pop("provenance", None)
+    return result, tendency_store.computed_at(player_id, season=season), False
+
+
+@app.route("/api/generate", methods=["GET", "POST", "OPTIONS"])
 def api_generate():
+    """
+    Generate (or serve stored) tendencies for one player.  Parameters come
+    from the JSON body (POST) or the query string (GET, which browsers can
+    cache and revalidate with the ETag of the stored result).  Only a POST
+    may ask for "refresh": a GET from a crawler, prefetch or revalidation
+    never triggers a recompute and store write.  With
+    "provenance": true the result includes the inputs it was computed from.
+    With "profile": true (server started with PROFILING=1) the player is
+    generated fresh under the sampling profiler and the report is returned
+    under "_profile".
+    """
     if request.method == "OPTIONS":
         return jsonify({}), 200
     try:
-        body      = request.get_json(force=True) or {}
-        player_id = body.get("player_id")
-        player_name = body.get("player_name", "")
-        season    = body.get("season", "2024-25")
-
-        if not player_id and not player_name:
-            return jsonify({"error": "player_id or player_name required"}), 400
-
-        from engine.tendency_calculator import generate_tendencies_for_player
-        result = generate_tendencies_for_player(
-            player_id=int(player_id) if player_id else 0,
-            player_name=player_name,
-            season=season,
+        body = request.args.to_dict() if request.method == "GET" else (request.get_json(force=True) or {})
+        season      = body.get("season", "2024-25")
+        refresh     = request.method == "POST" and _flag(body.get("refresh", False))
+        provenance  = _flag(body.get("provenance", False))
+        profile     = _flag(body.get("profile", False))
+
+        player_id, player_name, error = _resolve_request_player(body, season)
+        if error:
+            return error
+        if profile:
+            return _profiled_generate(player_id, player_name, season, provenance)
+
+        # Serve from the materialized store; compute only on a miss or refresh.
+        # The stored row's computed_at versions the result for ETag / 304s.
+        from engine import tendency_store
+        result, stamp, stored = _stored_or_generate(player_id, player_name, season, refresh, provenance)
+        etag = _etag("generate", player_id, season, stamp, provenance)
+        policy = CACHE_POLICIES["generate"]
+        if stored:
+            return _conditional(etag, stamp, policy, lambda: jsonify(
+                tendency_store.get(player_id, season=season, provenance=provenance)))
+        return _with_validators(jsonify(result), etag, stamp, policy)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _profiled_generate(player_id, player_name, season, provenance):
+    """
+    One fresh generation (bypassing the store, which is left untouched)
+    under engine/profiler.py; the call tree and folded stacks come back
+    under "_profile".
+    """
+    from engine import profiler
+    if not profiler.ENABLED:
+        return jsonify({"error": "Profiling is disabled (start the server with PROFILING=1)"}), 403
+    from engine.tendency_calculator import generate_tendencies_for_player
+    try:
+        result, report = profiler.profile(
+            generate_tendencies_for_player,
+            player_id=player_id, player_name=player_name, season=season, provenance=provenance,
         )
+    except profiler.ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    result["_profile"] = report
+    response = jsonify(result)
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/api/tendency-master")
+def api_tendency_master():
+    from engine import constants
+    return jsonify({
+        "source":           "workbook" if constants._compiled else "builtin",
+        "order":            constants.TENDENCY_ORDER,
+        "hard_caps":        constants.HARD_CAPS,
+        "locked_absolute":  constants.LOCKED_ABSOLUTE,
+        "locked_caps":      constants.LOCKED_CAPS,
+        "relational_rules": constants.RELATIONAL_RULES,
+    })
+
+
+@app.route("/api/ready")
+def api_ready():
+    from engine import warmup
+    state = warmup.status()
+    state.pop("modules", None)
+    return jsonify(state), 200 if state["ready"] else 503
+
+
+@app.route("/api/store", methods=["GET", "POST", "OPTIONS"])
+def api_store():
+    """
+    GET: materialized store status.  POST: start a precompute for the season
+    now (?force=1 recomputes every player regardless of input hashes).
+    """
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+    try:
+        from engine import tendency_store
+        season = request.args.get("season", "2024-25")
+        if request.method == "POST":
+            force   = request.args.get("force", "0") == "1"
+            started = tendency_store.precompute_in_background(season=season, force=force)
+            return jsonify(dict(tendency_store.status(season), started=started)), 202
+        return jsonify(tendency_store.status(season))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/query")
+def api_query():
+    """
+    Filter and sort the league on the stored tendency matrix, e.g.
+    /api/query?position=SF&sort=Drive&limit=20 or /api/query?where=Post Up>40
+    """
+    try:
+        from engine import tendency_matrix
+        args = request.args
+        result = tendency_matrix.query(
+            season=args.get("season", "2024-25"),
+            position=args.getlist("position") or None,
+            team=args.getlist("team") or None,
+            where=args.getlist("where"),
+            sort=args.get("sort") or None,
+            descending=args.get("order", "desc").lower() != "asc",
+            limit=min(max(int(args.get("limit", 20)), 0), 1000),
+            columns=[c for c in args.get("columns", "").split(",") if c.strip()] or None,
+        )
+        if result is None:
+            return jsonify({"error": "No stored tendencies for this season yet; run POST /api/store"}), 404
         return jsonify(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/traces")
+def api_traces():
+    """Per-endpoint span aggregates since startup, plus summaries of recent requests."""
+    from engine import tracing
+    return jsonify({
+        "endpoints": tracing.aggregates(),
+        "recent":    [t.summary() for t in tracing.recent()],
+    })
+
+
+@app.route("/api/traces/chrome")
+@app.route("/api/traces/<int:trace_id>")
+def api_trace_export(trace_id=None):
+    """Recent traces (or one) as Chrome trace event JSON, for chrome://tracing or Perfetto."""
+    from engine import tracing
+    traces = tracing.recent(trace_id)
+    if trace_id is not None and not traces:
+        return jsonify({"error": "Trace not found (only the most recent are kept)"}), 404
+    response = jsonify(tracing.chrome_trace(traces))
+    if _flag(request.args.get("download", "0")):
+        name = f"trace-{trace_id}.json" if trace_id is not None else "traces.json"
+        response.headers["Content-Disposition"] = f"attachment; filename={name}"
+    return response
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Latency histograms, NBA API call counts and cache hit/miss counters (Prometheus text format)."""
+    from engine import metrics
+    if not metrics.ENABLED:
+        return jsonify({"error": "Metrics are disabled (METRICS=0)"}), 404
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE,
+                    headers={"Cache-Control": "no-store"})
+
+
 @app.route("/api/refresh-roster")
 def api_refresh_roster():
     try:
         from engine.player_search import refresh_cache
-        players = refresh_cache()
-        return jsonify({"status": "ok", "count": len(players)})
+        season = request.args.get("season", "2024-25")
+        snapshot, started = refresh_cache(season=season)
+        return jsonify({
+            "status":  "refreshing" if started else "already_refreshing",
+            "season":  season,
+            "count":   len(snapshot.players),
+            "version": snapshot.version,
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -95,16 +542,11 @@ def api_export_csv():
         name       = body.get("name", "player")
         tendencies = body.get("tendencies", {})
 
-        rows = [{"Tendency": k, "Value": v} for k, v in tendencies.items()]
-        df   = pd.DataFrame(rows)
-
-        buf = io.StringIO()
-        df.to_csv(buf, index=False)
-        buf.seek(0)
+        from engine.exporters import tendency_csv
 
         safe_name = name.replace(" ", "_")
         return send_file(
-            io.BytesIO(buf.getvalue().encode()),
+            io.BytesIO(tendency_csv(tendencies).encode()),
             mimetype="text/csv",
             as_attachment=True,
             download_name=f"{safe_name}_tendencies.csv",
@@ -122,12 +564,10 @@ def api_export_excel():
         name       = body.get("name", "player")
         tendencies = body.get("tendencies", {})
 
-        rows = [{"Tendency": k, "Value": v} for k, v in tendencies.items()]
-        df   = pd.DataFrame(rows)
+        from engine.exporters import tendency_xlsx
 
         buf = io.BytesIO()
-        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Tendencies")
+        tendency_xlsx(tendencies, buf)
         buf.seek(0)
 
         safe_name = name.replace(" ", "_")
@@ -141,39 +581,331 @@ def api_export_excel():
         return jsonify({"error": str(e)}), 500
 
 
+def _bulk_players(body, season):
+    """Players selected by a bulk request body ({team} or {all: true}), or None."""
+    from engine.player_search import get_all_players
+
+    players = get_all_players(season=season)
+    team = body.get("team")
+    if team:
+        return [p for p in players if p.get("team_abbrev", "") == team]
+    if body.get("all", False):
+        return list(players)
+    return None
+
+
+# ── Compact bulk responses ────────────────────────────────────────────────────
+
+_COMPACT_MIMETYPES = {
+    "columnar": "application/vnd.tendencies.columnar+json",
+    "packed":   "application/vnd.tendencies.packed",
+}
+
+
+def _compact_format():
+    """'columnar' / 'packed' when asked for via ?format= or the Accept header, else None."""
+    fmt = request.args.get("format", "").lower()
+    if fmt in _COMPACT_MIMETYPES:
+        return fmt
+    accept = request.headers.get("Accept", "")
+    for fmt, mimetype in _COMPACT_MIMETYPES.items():
+        if mimetype in accept:
+            return fmt
+    return None
+
+
+def _compact_response(results, fmt, errors=None):
+    from engine import exporters
+    if fmt == "packed":
+        return Response(exporters.packed(results, errors), mimetype=_COMPACT_MIMETYPES[fmt])
+    return Response(json.dumps(exporters.columnar(results, errors), separators=(",", ":")),
+                    mimetype=_COMPACT_MIMETYPES[fmt])
+
+
+# ── Streaming bulk responses ──────────────────────────────────────────────────
+
+_STREAM_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse":    "text/event-stream",
+}
+
+
+def _stream_format():
+    """'ndjson' / 'sse' when the client asked for a streamed response, else None."""
+    fmt = request.args.get("stream", "").lower()
+    if fmt in _STREAM_MIMETYPES:
+        return fmt
+    accept = request.headers.get("Accept", "")
+    for fmt, mimetype in _STREAM_MIMETYPES.items():
+        if mimetype in accept:
+            return fmt
+    return None
+
+
+def _stream_bulk(players, season, fmt):
+    """
+    Yield one event per player as soon as it is generated, so nothing is
+    held in memory and the client sees the first result within seconds.
+    Streams are not capped at BULK_GENERATION_LIMIT.
+    """
+    from engine.bulk_runner import iter_bulk
+
+    def encode(event, payload):
+        # SSE carries the event name in its own field; NDJSON lines get a "type" key
+        if fmt == "sse":
+            return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps({"type": event, **payload}) + "\n"
+
+    def generate():
+        stats = {}
+        for p, result, error in iter_bulk(players, season=season, stats=stats):
+            if error is not None:
+                print(f"[bulk] {p.get('name')} ({p.get('id')}) failed: {error}")
+                yield encode("error", {"player_id": p["id"], "name": p["name"], "error": error})
+            else:
+                yield encode("result", result)
+        yield encode("done", stats)
+
+    response = Response(stream_with_context(generate()), mimetype=_STREAM_MIMETYPES[fmt])
+    response.headers["Cache-Control"]     = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+# ── Bulk export ───────────────────────────────────────────────────────────────
+
+def _export_results(body):
+    """
+    Results to export for a bulk export request, as an iterator: either a
+    finished job's stored results ({"job_id"}) or a fresh bulk run
+    ({"team"} / {"all": true}).  Returns (results, error_response).
+    """
+    job_id = body.get("job_id")
+    if job_id:
+        from engine import jobs
+        job = jobs.get_job(job_id, include_players=False)
+        if job is None:
+            return None, (jsonify({"error": f"Job not found: {job_id}"}), 404)
+        return jobs.iter_results(job_id), None
+
+    season  = body.get("season", "2024-25")
+    players = _bulk_players(body, season)
+    if players is None:
+        return None, (jsonify({"error": "Provide job_id, team or set all=true"}), 400)
+
+    from engine.bulk_runner import iter_bulk
+
+    def results():
+        for p, result, error in iter_bulk(players, season=season):
+            if error is not None:
+                print(f"[export] {p.get('name')} ({p.get('id')}) failed: {error}")
+            else:
+                yield result
+    return results(), None
+
+
+def _export_basename(body):
+    return str(body.get("job_id") or body.get("team") or "league").replace(" ", "_")
+
+
+@app.route("/api/export/bulk/csv", methods=["POST", "OPTIONS"])
+def api_export_bulk_csv():
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+    try:
+        body = request.get_json(force=True) or {}
+        results, error = _export_results(body)
+        if error:
+            return error
+
+        from engine.exporters import iter_csv
+
+        response = Response(stream_with_context(iter_csv(results)), mimetype="text/csv")
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="{_export_basename(body)}_tendencies.csv"'
+        )
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/export/bulk/excel", methods=["POST", "OPTIONS"])
+def api_export_bulk_excel():
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+    try:
+        body   = request.get_json(force=True) or {}
+        layout = body.get("layout", "wide")
+
+        from engine.exporters import LAYOUTS, results_xlsx
+
+        if layout not in LAYOUTS:
+            return jsonify({"error": f"layout must be one of {list(LAYOUTS)}"}), 400
+        results, error = _export_results(body)
+        if error:
+            return error
+
+        # Rows are streamed into the zip as they arrive; the finished file
+        # only stays in memory while small.
+        buf = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        results_xlsx(results, buf, layout=layout)
+        buf.seek(0)
+
+        return send_file(
+            buf,
+            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            as_attachment=True,
+            download_name=f"{_export_basename(body)}_tendencies.xlsx",
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/bulk-generate", methods=["POST", "OPTIONS"])
 def api_bulk_generate():
     if request.method == "OPTIONS":
         return jsonify({}), 200
     try:
         body   = request.get_json(force=True) or {}
-        team   = body.get("team")
-        do_all = body.get("all", False)
         season = body.get("season", "2024-25")
 
-        from engine.player_search import get_all_players
-        from engine.tendency_calculator import generate_tendencies_for_player
+        players = _bulk_players(body, season)
+        if players is None:
+            return jsonify({"error": "Provide team or set all=true"}), 400
 
-        players = get_all_players(season=season)
+        stream = _stream_format()
+        if stream:
+            return _stream_bulk(players, season, stream)
 
-        if team:
-            players = [p for p in players if p.get("team_abbrev", "") == team]
-        elif not do_all:
-            return jsonify({"error": "Provide team or set all=true"}), 400
+        if len(players) > BULK_GENERATION_LIMIT:
+            return jsonify({
+                "error": f"At most {BULK_GENERATION_LIMIT} players per request ({len(players)} requested); "
+                         "submit larger runs to /api/jobs or stream them with ?stream=ndjson",
+                "players": len(players),
+            }), 400
 
-        results = []
-        for p in players[:BULK_GENERATION_LIMIT]:
+        from engine.bulk_runner import run_bulk
+
+        results, errors, _ = run_bulk(players, season=season)
+        compact = _compact_format()
+        if compact:
+            return _compact_response(results, compact, errors)
+        return jsonify({"results": results, "errors": errors})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/batch-generate", methods=["POST", "OPTIONS"])
+def api_batch_generate():
+    """
+    Generate an arbitrary list of players in one call:
+        {"players": [201939, {"player_id": 2544, "season": "2023-24"},
+                     {"player_name": "Jokic"}], "season": "2024-25"}
+    League-wide sources are fetched once per season and shared by every
+    player.  Returns one entry per requested player, in request order, with
+    status "ok" (and "result") or "error" (and "error").
+    """
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+    try:
+        body     = request.get_json(force=True) or {}
+        season   = body.get("season", "2024-25")
+        items    = body.get("players") or []
+
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "players must be a non-empty list"}), 400
+        if len(items) > BATCH_GENERATION_LIMIT:
+            return jsonify({
+                "error": f"At most {BATCH_GENERATION_LIMIT} players per batch; submit larger runs to /api/jobs"
+            }), 400
+
+        from engine.bulk_runner import iter_bulk
+        from engine.player_search import find_player, resolve_player
+
+        entries = []
+        players = []
+        for item in items:
+            if not isinstance(item, dict):
+                item = {"player_id": item}
+            p_season = item.get("season", season)
+            entry = {"player_id": item.get("player_id"), "season": p_season}
+            entries.append(entry)
             try:
-                r = generate_tendencies_for_player(
-                    player_id=p["id"],
-                    player_name=p["name"],
-                    season=season,
-                )
-                results.append(r)
-            except Exception:
-                pass
-
-        return jsonify(results)
+                if item.get("player_id"):
+                    match = find_player(item["player_id"], season=p_season)
+                    name  = match["name"] if match else item.get("player_name", "")
+                    pid   = int(item["player_id"])
+                else:
+                    match = resolve_player(item.get("player_name", ""), season=p_season)
+                    if not match:
+                        raise LookupError(f"Player not found: {item.get('player_name', '')}")
+                    name, pid = match["name"], match["id"]
+            except Exception as e:
+                entry.update(status="error", error=str(e))
+                continue
+            entry["player_id"] = pid
+            players.append({"id": pid, "name": name, "season": p_season, "entry": entry})
+
+        stats = {}
+        for p, result, error in iter_bulk(players, season=season, stats=stats):
+            if error is not None:
+                print(f"[batch] {p['name']} ({p['id']}) failed: {error}")
+                p["entry"].update(status="error", error=error)
+            else:
+                p["entry"].update(status="ok", result=result)
+
+        return jsonify({"results": entries, "stats": stats})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/jobs", methods=["GET", "POST", "OPTIONS"])
+def api_jobs():
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+    try:
+        from engine import jobs
+
+        if request.method == "GET":
+            limit = int(request.args.get("limit", 20))
+            return jsonify(jobs.list_jobs(limit=limit))
+
+        body   = request.get_json(force=True) or {}
+        season = body.get("season", "2024-25")
+        players = _bulk_players(body, season)
+        if players is None:
+            return jsonify({"error": "Provide team or set all=true"}), 400
+
+        job_id = jobs.submit_job(players, season=season, team=body.get("team"))
+        return jsonify(jobs.get_job(job_id, include_players=False)), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/jobs/<job_id>")
+def api_job_status(job_id):
+    try:
+        from engine import jobs
+
+        job = jobs.get_job(job_id, include_players=request.args.get("players", "1") != "0")
+        if job is None:
+            return jsonify({"error": f"Job not found: {job_id}"}), 404
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/jobs/<job_id>/results")
+def api_job_results(job_id):
+    try:
+        from engine import jobs
+
+        after = int(request.args.get("after", 0))
+        found = jobs.get_results(job_id, after=after)
+        if found is None:
+            return jsonify({"error": f"Job not found: {job_id}"}), 404
+        results, errors, next_after = found
+        return jsonify({"results": results, "errors": errors, "next": next_after})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -184,108 +916,64 @@ def api_debug_raw():
         return jsonify({}), 200
     try:
         body = request.get_json(force=True) or {}
-        player_id = int(body.get("player_id", 0))
-        player_name = body.get("player_name", "")
         season = body.get("season", "2024-25")
+        player_id, player_name, error = _resolve_request_player(body, season)
+        if error:
+            return error
+
+        # The provenance recorded by the generation itself: no second round
+        # of API calls, and always the data behind the stored result.
+        from engine import tendency_store
+        result, _, stored = _stored_or_generate(
+            player_id, player_name, season, refresh=_flag(body.get("refresh", False)), provenance=True,
+        )
+        if stored:
+            result = tendency_store.get(player_id, season=season, provenance=True)
+        provenance = result.get("provenance") or {}
+
+        return jsonify({
+            "player_id":      player_id,
+            "player_name":    result.get("name") or player_name,
+            "position":       result.get("position", ""),
+            "team":           result.get("team", ""),
+            "data_sources":   provenance.get("data_sources", {}),
+            "inputs_used":    provenance.get("used", {}),
+            "engine_version": provenance.get("engine_version"),
+            "from_store":     stored,
+            "tendencies":     result.get("tendencies", {}),
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        from engine import nba_stats, shotdetail_loader
 
-        result = {
-            "player_id": player_id,
-            "player_name": player_name,
-            "position": "",
-            "team": "",
-            "data_sources": {},
-        }
+def _start_background():
+    from engine import jobs, tendency_store, warmup
+    warmup.start()
+    # Pick up bulk jobs interrupted by the last shutdown
+    jobs.start()
+    tendency_store.start_scheduler()
 
-        # 1. Player info
-        try:
-            info = nba_stats.get_player_info(player_id)
-            result["position"] = info.get("position", "")
-            result["team"] = info.get("team", "")
-            result["player_name"] = info.get("name") if info.get("name") is not None else player_name
-        except Exception as e:
-            result["data_sources"]["player_info"] = {"status": "FAILED", "error": str(e), "data": {}}
-
-        # 2. Per-game and advanced stats
-        try:
-            per_game, advanced = nba_stats.get_player_per_game_stats(player_id, season=season)
-            result["data_sources"]["nba_api_per_game"] = {
-                "status": "OK" if per_game else "EMPTY",
-                "data": per_game or {},
-            }
-            result["data_sources"]["nba_api_advanced"] = {
-                "status": "OK" if advanced else "EMPTY",
-                "data": advanced or {},
-            }
-        except Exception as e:
-            result["data_sources"]["nba_api_per_game"] = {"status": "FAILED", "error": str(e), "data": {}}
-            result["data_sources"]["nba_api_advanced"] = {"status": "FAILED", "error": str(e), "data": {}}
-
-        # 3. Tracking stats
-        try:
-            tracking = nba_stats.get_tracking_stats(player_id, season=season)
-            has_data = any(v is not None for v in tracking.values())
-            result["data_sources"]["nba_api_tracking"] = {
-                "status": "OK" if has_data else "ALL_NULL",
-                "data": tracking,
-            }
-        except Exception as e:
-            result["data_sources"]["nba_api_tracking"] = {"status": "FAILED", "error": str(e), "data": {}}
-
-        # 4. Shot zones
-        try:
-            zones = nba_stats.get_shot_zones(player_id, season=season)
-            result["data_sources"]["nba_api_shot_zones"] = {
-                "status": "OK" if zones else "EMPTY",
-                "data": zones or {},
-            }
-        except Exception as e:
-            result["data_sources"]["nba_api_shot_zones"] = {"status": "FAILED", "error": str(e), "data": {}}
-
-        # 5. Shotdetail CSV
-        try:
-            season_year = int(season.split("-")[0])
-            sd = shotdetail_loader.load_player_shotdetail(player_id, season_year=season_year)
-            if sd:
-                sd_stats = shotdetail_loader.estimate_per_game_stats(sd)
-                action_counts = sd.get("action_counts", {})
-                top_actions = sorted(action_counts.items(), key=lambda x: x[1], reverse=True)[:20]
-
-                sd_data = {
-                    "total_fga": sd.get("total_fga", 0),
-                    "total_fgm": sd.get("total_fgm", 0),
-                    "games_played": sd.get("games_played", 0),
-                    "shooting_splits": sd.get("shooting_splits", {}),
-                    "zone_area_mid": sd.get("zone_area_mid", {}),
-                    "zone_area_three": sd.get("zone_area_three", {}),
-                    "zone_area_close": sd.get("zone_area_close", {}),
-                    "top_action_types": top_actions,
-                    "estimated_stats": sd_stats or {},
-                }
 
-                if action_counts:
-                    merged_counts = dict(action_counts)
-                    merged_counts["_stepback_2pt"] = sd.get("stepback_2pt_count", 0)
-                    merged_counts["_stepback_3pt"] = sd.get("stepback_3pt_count", 0)
-                    move_freqs = shotdetail_loader.extract_move_frequencies(
-                        merged_counts,
-                        sd.get("total_fga", 1),
-                        games_played=sd.get("games_played"),
-                    )
-                    sd_data["move_frequencies"] = move_freqs
-
-                result["data_sources"]["shotdetail_csv"] = {"status": "OK", "data": sd_data}
-            else:
-                result["data_sources"]["shotdetail_csv"] = {"status": "NO_DATA", "data": {}}
-        except Exception as e:
-            result["data_sources"]["shotdetail_csv"] = {"status": "FAILED", "error": str(e), "data": {}}
+def serve(host="0.0.0.0", port=5000):
+    """
+    Bind first, then warm up: the listening socket is open before the
+    background warm-up thread starts importing the hot modules, so startup
+    never delays accepting connections.
+    """
+    from werkzeug.serving import make_server
 
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    server = make_server(host, port, app, threaded=True)
+    print(f"[app] Listening on http://{host}:{port}")
+    _start_background()
+    server.serve_forever()
 
 
 if __name__ == "__main__":
     debug_mode = os.environ.get("FLASK_DEBUG", "0") == "1"
-    app.run(host="0.0.0.0", port=5000, debug=debug_mode)
+    if debug_mode:
+        # The reloader needs app.run(); warm up in the serving child only
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            _start_background()
+        app.run(host="0.0.0.0", port=5000, debug=True)
+    else:
+        serve()
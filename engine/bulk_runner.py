@@ -0,0 +1,290 @@
+"""
+Parallel execution engine for bulk and league-wide generation.
+
+Generation is split into two stages (see engine/tendency_calculator.py):
+
+  - gather_player_inputs()       network-bound NBA Stats API calls
+  - compute_player_tendencies()  CPU-bound shotdetail aggregation,
+                                 calculate_tendencies() and zone distribution
+
+iter_bulk() runs the first stage on a thread pool shared by every bulk run
+(bounded, because the NBA API is rate limited) and fans the second out over
+a process pool in batches, so one pass over the season's shotdetail CSV
+serves a whole batch.  Results are yielded as each batch finishes and
+throughput is reported in players per second.
+
+Worker processes are started with forkserver (spawn where unavailable),
+never fork: the server is multi-threaded, and a forked child inherits any
+lock another thread holds at that moment (e.g. the shotdetail store lock
+during warm-up) with no thread left to release it.
+
+If worker processes cannot be started, or a batch does not finish within
+BULK_COMPUTE_TIMEOUT seconds, batches are computed in-process.
+"""
+
+import contextvars
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import (FIRST_COMPLETED, Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+# Concurrent NBA API fetches across all bulk runs
+IO_WORKERS  = int(os.environ.get("BULK_IO_WORKERS", "4"))
+# Compute processes (0 = one per CPU)
+CPU_WORKERS = int(os.environ.get("BULK_CPU_WORKERS", "0")) or os.cpu_count() or 1
+# Players per compute task; each task makes one pass over the shotdetail CSV
+BATCH_SIZE  = int(os.environ.get("BULK_BATCH_SIZE", "8"))
+# Seconds a compute batch may take in a worker before it is redone in-process
+COMPUTE_TIMEOUT = float(os.environ.get("BULK_COMPUTE_TIMEOUT", "300"))
+
+_io_pool   = None
+_cpu_pool  = None
+_cpu_pids  = None    # queue the pool's workers report their PIDs on at start-up
+_pool_lock = threading.Lock()
+
+
+def _get_io_pool():
+    global _io_pool
+    with _pool_lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="bulk-io")
+        return _io_pool
+
+
+def _report_pid(pids):
+    """Worker initializer: tell the parent our PID, so it can kill a hung worker."""
+    pids.put(os.getpid())
+
+
+def _get_cpu_pool():
+    global _cpu_pool, _cpu_pids
+    with _pool_lock:
+        if _cpu_pool is None:
+            try:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                pids = context.SimpleQueue()
+                _cpu_pool = ProcessPoolExecutor(max_workers=CPU_WORKERS, mp_context=context,
+                                                initializer=_report_pid, initargs=(pids,))
+                _cpu_pids = pids
+            except Exception as e:
+                print(f"[bulk] WARNING: process pool unavailable, computing in-process: {e}")
+                return None
+        return _cpu_pool
+
+
+def _worker_pids():
+    """PIDs of every worker the current pool has started (they report in at start-up)."""
+    pids = set()
+    if _cpu_pids is not None:
+        while not _cpu_pids.empty():
+            pids.add(_cpu_pids.get())
+    return pids
+
+
+def _reset_cpu_pool(terminate=False):
+    """Drop the process pool; with *terminate*, kill its workers (e.g. one is hung)."""
+    global _cpu_pool, _cpu_pids
+    with _pool_lock:
+        if _cpu_pool is not None:
+            if terminate:
+                for pid in _worker_pids():
+                    try:
+                        os.kill(pid, signal.SIGTERM)     # TerminateProcess on Windows
+                    except OSError:
+                        pass                             # already gone
+            _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+        _cpu_pids = None
+
+
+def _compute_batch(batch, provenance=False):
+    """
+    Process-pool task: compute tendencies for a batch of gathered inputs
+    (with *provenance*, see compute_player_tendencies).  Returns
+    [(result, error)] in batch order.
+    """
+    from engine import shotdetail_loader
+    from engine.tendency_calculator import compute_player_tendencies
+
+    profiles = {}
+    for season in {inputs["season"] for inputs in batch}:
+        ids = [inputs["player_id"] for inputs in batch if inputs["season"] == season]
+        try:
+            profiles[season] = shotdetail_loader.load_players_shotdetail(
+                ids, season_year=int(season.split("-")[0]),
+            )
+        except Exception as e:
+            print(f"[shotdetail] WARNING: Could not load shotdetail data: {e}")
+            profiles[season] = {}
+
+    out = []
+    for inputs in batch:
+        try:
+            sd = profiles[inputs["season"]].get(int(inputs["player_id"]))
+            out.append((compute_player_tendencies(inputs, shotdetail_data=sd, provenance=provenance), None))
+        except Exception as e:
+            out.append((None, f"{type(e).__name__}: {e}"))
+    return out
+
+
+def _submit_compute(batch, provenance=False):
+    pool = _get_cpu_pool()
+    if pool is not None:
+        try:
+            return pool.submit(_compute_batch, batch, provenance)
+        except Exception as e:
+            print(f"[bulk] WARNING: process pool failed, computing in-process: {e}")
+            _reset_cpu_pool()
+    future = Future()
+    future.set_result(_compute_batch(batch, provenance))
+    return future
+
+
+def iter_bulk(players, season="2024-25", stats=None, on_start=None, should_compute=None,
+              provenance=False):
+    """
+    Generate tendencies for *players* (dicts with "id", "name" and an
+    optional per-player "season") and yield (player, result, error) as each
+    one finishes; exactly one of result/error is None.  Completion order
+    is not input order.
+
+    *stats*, if given, is a dict kept up to date with total/done/failed/
+    skipped, elapsed_s and players_per_sec.  *on_start(player)* is called
+    from an I/O thread when a player's fetch begins.
+
+    *should_compute(player, inputs)*, if given, is called from the I/O
+    thread once a player's inputs are gathered; when it returns False the
+    compute stage is skipped and the player is yielded as (player, None, None).
+
+    With *provenance*, results carry the data they were computed from
+    (see tendency_calculator.compute_player_tendencies).
+    """
+    from engine import shotdetail_loader
+    from engine.tendency_calculator import gather_player_inputs
+
+    players = list(players)
+    stats = stats if stats is not None else {}
+    stats.update(total=len(players), done=0, failed=0, skipped=0, elapsed_s=0.0, players_per_sec=0.0)
+    started = time.perf_counter()
+
+    # Download each season's shotdetail CSV once, before workers need it
+    for s in {p.get("season", season) for p in players}:
+        try:
+            shotdetail_loader.shotdetail_csv_path(int(s.split("-")[0]))
+        except Exception as e:
+            print(f"[bulk] WARNING: shotdetail prefetch failed for {s}: {e}")
+
+    def gather(p):
+        if on_start:
+            on_start(p)
+        inputs = gather_player_inputs(p["id"], p["name"], p.get("season", season))
+        if should_compute is not None and not should_compute(p, inputs):
+            return None
+        return inputs
+
+    def finish(p, result, error):
+        if error is not None:
+            stats["failed"] += 1
+        elif result is None:
+            stats["skipped"] += 1
+        else:
+            stats["done"] += 1
+        stats["elapsed_s"] = round(time.perf_counter() - started, 3)
+        stats["players_per_sec"] = round(
+            (stats["done"] + stats["failed"] + stats["skipped"]) / stats["elapsed_s"], 2
+        ) if stats["elapsed_s"] else 0.0
+        return p, result, error
+
+    io_pool = _get_io_pool()
+    max_io  = IO_WORKERS * 2
+    max_cpu = CPU_WORKERS * 2
+    queue   = iter(players)
+    pending_io, pending_cpu, batch = {}, {}, []
+    deadlines = {}   # compute future -> time.monotonic() deadline
+
+    def fill():
+        # Backpressure: stop fetching while compute is saturated
+        while len(pending_io) < max_io and len(pending_cpu) < max_cpu:
+            p = next(queue, None)
+            if p is None:
+                return
+            # copy_context(): fetch spans join the caller's trace (engine/tracing.py)
+            pending_io[io_pool.submit(contextvars.copy_context().run, gather, p)] = p
+
+    fill()
+    while pending_io or pending_cpu or batch:
+        if batch and (len(batch) >= BATCH_SIZE or not pending_io):
+            future = _submit_compute([inputs for _, inputs in batch], provenance)
+            pending_cpu[future] = batch
+            deadlines[future] = time.monotonic() + COMPUTE_TIMEOUT
+            batch = []
+            continue
+
+        timeout = max(0.0, min(deadlines.values()) - time.monotonic()) if deadlines else None
+        done, _ = wait(list(pending_io) + list(pending_cpu), timeout=timeout, return_when=FIRST_COMPLETED)
+        now = time.monotonic()
+        expired = [f for f in pending_cpu if f not in done and deadlines[f] <= now]
+        if expired:
+            # A worker is stuck; kill the pool and compute the overdue batches here.
+            # Other batches on the pool fail with BrokenProcessPool and are redone below.
+            print(f"[bulk] WARNING: {len(expired)} compute batch(es) exceeded {COMPUTE_TIMEOUT:.0f}s; "
+                  f"computing in-process")
+            _reset_cpu_pool(terminate=True)
+            for future in expired:
+                computed = pending_cpu.pop(future)
+                deadlines.pop(future)
+                outcomes = _compute_batch([inputs for _, inputs in computed], provenance)
+                for (p, _), (result, error) in zip(computed, outcomes):
+                    yield finish(p, result, error)
+        for future in done:
+            if future in pending_io:
+                p = pending_io.pop(future)
+                try:
+                    inputs = future.result()
+                except Exception as e:
+                    yield finish(p, None, f"{type(e).__name__}: {e}")
+                    continue
+                if inputs is None:
+                    yield finish(p, None, None)
+                else:
+                    batch.append((p, inputs))
+                continue
+
+            computed = pending_cpu.pop(future)
+            deadlines.pop(future, None)
+            try:
+                outcomes = future.result()
+            except Exception as e:
+                # A worker died (BrokenProcessPool); start a fresh pool and
+                # recompute this batch here so its players are not lost.
+                print(f"[bulk] WARNING: compute batch failed ({e}); retrying in-process")
+                _reset_cpu_pool()
+                outcomes = _compute_batch([inputs for _, inputs in computed], provenance)
+            for (p, _), (result, error) in zip(computed, outcomes):
+                yield finish(p, result, error)
+        fill()
+
+    stats["elapsed_s"] = round(time.perf_counter() - started, 3)
+    print(
+        f"[bulk] {stats['done']} players ({stats['failed']} failed, {stats['skipped']} skipped) "
+        f"in {stats['elapsed_s']:.1f}s "
+        f"— {stats['players_per_sec']:.2f} players/s, {IO_WORKERS} I/O threads, {CPU_WORKERS} processes"
+    )
+
+
+def run_bulk(players, season="2024-25"):
+    """Collect iter_bulk() into (results, errors, stats), results in input order."""
+    stats = {}
+    order = {id(p): i for i, p in enumerate(players)}
+    results, errors = [], []
+    for p, result, error in iter_bulk(players, season=season, stats=stats):
+        if error is None:
+            results.append((order[id(p)], result))
+        else:
+            print(f"[bulk] {p.get('name')} ({p.get('id')}) failed: {error}")
+            errors.append({"player_id": p["id"], "name": p["name"], "error": error})
+    return [r for _, r in sorted(results, key=lambda x: x[0])], errors, stats
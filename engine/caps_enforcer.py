@@ -1,3 +1,4 @@
+from engine import tracing
 from engine.constants import HARD_CAPS, LOCKED_ABSOLUTE, LOCKED_CAPS, RELATIONAL_RULES
 
 
@@ -5,6 +6,7 @@ def _round5(v):
     return round(v / 5) * 5
 
 
+@tracing.traced()
 def enforce_caps(tendencies):
     result = {}
 
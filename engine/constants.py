@@ -1,7 +1,13 @@
+from engine import tendency_master
+
 SEASON = "2024-25"
 SEASON_YEAR = "2024"
 
-TENDENCIES = [
+# Built-in copy of the Tendency Master table.  It defines the locked
+# 98-tendency order and is used as-is when data/tendency_master.json has not
+# been compiled (see engine/tendency_master.py); otherwise caps and locked
+# rules come from the compiled workbook.
+BUILTIN_TENDENCIES = [
     {"order": 1,  "name": "Shot",                          "hard_cap": 75, "notes": "Usage tendency"},
     {"order": 2,  "name": "Touch",                         "hard_cap": 65, "notes": "Involvement/priority"},
     {"order": 3,  "name": "Shot Close",                    "hard_cap": 60, "notes": "3-10 ft shots"},
@@ -102,11 +108,9 @@ TENDENCIES = [
     {"order": 98, "name": "Contest Shot",                  "hard_cap": 60, "notes": "Contest shot tendency"},
 ]
 
-HARD_CAPS = {t["name"]: t["hard_cap"] for t in TENDENCIES}
-
-LOCKED_ABSOLUTE = {"No Set Up Dribble": 35}
+_BUILTIN_LOCKED_ABSOLUTE = {"No Set Up Dribble": 35}
 
-LOCKED_CAPS = {
+_BUILTIN_LOCKED_CAPS = {
     "Step-Back Jumper Mid":   40,
     "Step-Back Jumper Three": 35,
     "Flashy Dunk":            55,
@@ -114,11 +118,29 @@ LOCKED_CAPS = {
     "Putback":                55,
 }
 
-RELATIONAL_RULES = [
+_BUILTIN_RELATIONAL_RULES = [
     ("Spot-Up Shot Mid", "<=", "Shot Mid"),
     ("Off-Screen Mid",   "<=", "Shot Mid"),
 ]
 
+_compiled = tendency_master.load_compiled()
+
+if _compiled:
+    TENDENCIES       = _compiled["tendencies"]
+    LOCKED_ABSOLUTE  = _compiled["locked_absolute"]
+    LOCKED_CAPS      = _compiled["locked_caps"]
+    RELATIONAL_RULES = [tuple(rule) for rule in _compiled["relational_rules"]]
+else:
+    TENDENCIES       = BUILTIN_TENDENCIES
+    LOCKED_ABSOLUTE  = _BUILTIN_LOCKED_ABSOLUTE
+    LOCKED_CAPS      = _BUILTIN_LOCKED_CAPS
+    RELATIONAL_RULES = _BUILTIN_RELATIONAL_RULES
+
+HARD_CAPS = {t["name"]: t["hard_cap"] for t in TENDENCIES}
+
+# Identifies the caps/rules table in use; part of the stored-result version
+RULES_VERSION = _compiled["workbook_sha256"][:12] if _compiled else "builtin"
+
 POSITION_GROUPS = {
     "guard": ["PG", "SG"],
     "wing":  ["SF", "SG"],
@@ -126,3 +148,5 @@ POSITION_GROUPS = {
 }
 
 TENDENCY_ORDER = [t["name"] for t in TENDENCIES]
+TENDENCY_INDEX = {name: i for i, name in enumerate(TENDENCY_ORDER)}
+HARD_CAP_ARRAY = tuple(t["hard_cap"] for t in TENDENCIES)
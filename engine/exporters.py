@@ -0,0 +1,288 @@
+"""
+Bulk tendency exports.
+
+Writers take an iterable of generation results (dicts with name, team,
+position, player_id and tendencies) and write one row per player, with the
+tendencies as columns in TENDENCY_ORDER.  Results are consumed one at a
+time, so memory stays flat for a whole-league export:
+
+  - iter_csv()      yields CSV text chunks, suitable for a streamed response
+  - results_xlsx()  writes an .xlsx, either one wide sheet or one sheet per
+                    team
+
+Every .xlsx, bulk or single-player, is written by write_xlsx(), a direct
+SpreadsheetML writer, so neither pandas nor openpyxl is imported to export.
+
+Compact bulk responses send the tendency names once instead of once per
+player:
+
+  - columnar()  JSON with "columns" (TENDENCY_ORDER), per-player id fields
+                and "values", one integer array per player
+  - packed()    binary: PACKED_HEADER, a JSON block with the columns and
+                player fields, then players × columns uint8 values
+"""
+
+import csv
+import io
+import json
+import math
+import numbers
+import struct
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+from engine.constants import TENDENCY_ORDER
+
+ID_COLUMNS = ["Player", "Team", "Position", "Player ID"]
+HEADER     = ID_COLUMNS + list(TENDENCY_ORDER)
+
+LAYOUTS = ("wide", "teams")
+
+# Excel limits sheet titles to 31 characters and forbids []:*?/\
+_SHEET_TITLE_BAD = str.maketrans({c: "_" for c in "[]:*?/\\"})
+
+
+def result_row(result):
+    tendencies = result.get("tendencies") or {}
+    return [
+        result.get("name", ""),
+        result.get("team", ""),
+        result.get("position", ""),
+        result.get("player_id", ""),
+    ] + [tendencies.get(name, "") for name in TENDENCY_ORDER]
+
+
+def iter_csv(results):
+    """Yield the CSV header and then one line per result, as text."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+
+    def flush():
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return chunk
+
+    writer.writerow(HEADER)
+    yield flush()
+    for result in results:
+        writer.writerow(result_row(result))
+        yield flush()
+
+
+def _sheet_title(team):
+    return (str(team or "Free Agents").translate(_SHEET_TITLE_BAD))[:31]
+
+
+def results_xlsx(results, fileobj, layout="wide"):
+    """
+    Write *results* to an .xlsx with write_xlsx().  layout="wide" streams
+    every player onto one "Tendencies" sheet; layout="teams" creates a
+    sheet per team in order of first appearance, spooling each team's rows
+    to a temporary file until its sheet is written.  Returns the number of
+    rows written.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown export layout: {layout!r} (expected one of {LAYOUTS})")
+
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    if layout == "wide":
+        write_xlsx([("Tendencies", _with_header(result_row(r) for r in counted(results)))], fileobj)
+        return count
+
+    spools = {}
+    try:
+        for result in counted(results):
+            title = _sheet_title(result.get("team"))
+            spool = spools.get(title)
+            if spool is None:
+                spool = spools[title] = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode="w+")
+            spool.write(json.dumps(result_row(result)) + "\n")
+        sheets = [(title, _with_header(_replay(spool))) for title, spool in spools.items()]
+        write_xlsx(sheets or [("Tendencies", [HEADER])], fileobj)
+    finally:
+        for spool in spools.values():
+            spool.close()
+    return count
+
+
+def _with_header(rows):
+    yield HEADER
+    yield from rows
+
+
+def _replay(spool):
+    spool.seek(0)
+    for line in spool:
+        yield json.loads(line)
+
+
+# ── Compact bulk responses ────────────────────────────────────────────────────
+
+PLAYER_FIELDS = ["player_id", "name", "team", "position"]
+
+PACKED_MAGIC  = b"TPK1"
+# magic, column count, player count, length of the JSON block that follows
+PACKED_HEADER = struct.Struct("<4sHII")
+
+
+def _values(result):
+    tendencies = result.get("tendencies") or {}
+    return [int(tendencies.get(name, 0) or 0) for name in TENDENCY_ORDER]
+
+
+def columnar(results, errors=None):
+    """
+    {"columns", "fields", "players", "values"}: each player as [id, name,
+    team, position].  Given *errors* (per-player failures), they are
+    included as "errors".
+    """
+    players, values = [], []
+    for result in results:
+        players.append([result.get(f, "") for f in PLAYER_FIELDS])
+        values.append(_values(result))
+    table = {"columns": list(TENDENCY_ORDER), "fields": PLAYER_FIELDS,
+             "players": players, "values": values}
+    if errors is not None:
+        table["errors"] = errors
+    return table
+
+
+def packed(results, errors=None):
+    """
+    Binary form of columnar(): PACKED_HEADER, the UTF-8 JSON block
+    {"columns", "fields", "players"} (and "errors", if given), then
+    len(players) rows of len(columns) uint8 values (clamped to 0-255),
+    row-major.
+    """
+    table = columnar(results, errors)
+    values = table.pop("values")
+    meta = json.dumps(table, separators=(",", ":")).encode()
+    body = bytes(min(max(v, 0), 255) for row in values for v in row)
+    return PACKED_HEADER.pack(PACKED_MAGIC, len(TENDENCY_ORDER), len(values), len(meta)) + meta + body
+
+
+def unpack(data):
+    """Inverse of packed(): a columnar() dict."""
+    magic, n_columns, n_players, meta_len = PACKED_HEADER.unpack_from(data, 0)
+    if magic != PACKED_MAGIC:
+        raise ValueError("not a packed tendency response")
+    start = PACKED_HEADER.size + meta_len
+    table = json.loads(data[PACKED_HEADER.size:start])
+    table["values"] = [list(data[start + i * n_columns:start + (i + 1) * n_columns])
+                       for i in range(n_players)]
+    return table
+
+
+# ── Single-player exports ─────────────────────────────────────────────────────
+
+SINGLE_HEADER = ["Tendency", "Value"]
+
+
+def tendency_csv(tendencies):
+    """CSV text for one player's {tendency: value} dict."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(SINGLE_HEADER)
+    writer.writerows(tendencies.items())
+    return buf.getvalue()
+
+
+def tendency_xlsx(tendencies, fileobj, sheet_name="Tendencies"):
+    """Write one player's {tendency: value} dict as a single-sheet .xlsx."""
+    write_xlsx([(sheet_name, [SINGLE_HEADER, *tendencies.items()])], fileobj)
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{sheets}'
+    '</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{n}" r:id="rId{n}"/>'
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{rels}</Relationships>'
+)
+_WORKBOOK_REL = (
+    '<Relationship Id="rId{n}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{n}.xml"/>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _xlsx_cell(value):
+    # numbers.Real covers numpy scalars too (numpy.bool_ is recognised by dtype)
+    if isinstance(value, bool) or getattr(getattr(value, "dtype", None), "kind", None) == "b":
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Integral):
+        return f'<c><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        # NaN / inf have no representation in a numeric cell: leave it empty
+        return f'<c><v>{value!r}</v></c>' if math.isfinite(value) else '<c/>'
+    if value is None or value == "":
+        return '<c/>'
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def write_xlsx(sheets, fileobj):
+    """
+    Minimal .xlsx writer: *sheets* is [(title, rows)] where rows is an
+    iterable of lists of str/int/float values.  Each sheet's XML is
+    streamed into the zip row by row (inline strings, no styles).
+    """
+    titles = []
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+        for n, (title, rows) in enumerate(sheets, 1):
+            titles.append(_sheet_title(title))
+            with zf.open(f"xl/worksheets/sheet{n}.xml", "w") as part:
+                part.write(_SHEET_HEAD.encode())
+                for row in rows:
+                    part.write(("<row>" + "".join(_xlsx_cell(v) for v in row) + "</row>").encode())
+                part.write(_SHEET_TAIL.encode())
+
+        count = range(1, len(titles) + 1)
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES.format(
+            sheets="".join(_SHEET_CONTENT_TYPE.format(n=n) for n in count)))
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+            _WORKBOOK_SHEET.format(name=escape(t, {'"': "&quot;"}), n=n) for n, t in zip(count, titles))))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(
+            rels="".join(_WORKBOOK_REL.format(n=n) for n in count)))
@@ -0,0 +1,300 @@
+"""
+Background bulk-generation jobs.
+
+A job is a list of players to generate for one season.  Jobs and their
+per-player status live in a local SQLite table (data/jobs.sqlite3), so
+progress and errors can be polled over the API and unfinished work is
+picked up again after a restart.  Each running job drives
+engine/bulk_runner.py (shared I/O threads + compute processes); there is
+no per-job player cap.
+
+Player status moves pending -> running -> done | error.  A job is
+"queued" until its first player starts, "running" while any player is
+pending or running, then "done" (or "failed" if every player errored).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+DB_PATH  = os.path.join(DATA_DIR, "jobs.sqlite3")
+
+# Jobs processed concurrently; players within a job are parallelized by bulk_runner.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    season      TEXT NOT NULL,
+    team        TEXT,
+    status      TEXT NOT NULL,
+    total       INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_players (
+    job_id      TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    player_id   INTEGER NOT NULL,
+    player_name TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    error       TEXT,
+    result      TEXT,
+    started_at  REAL,
+    finished_at REAL,
+    finish_seq  INTEGER,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS job_players_status ON job_players (job_id, status);
+"""
+
+_executor = None
+_db_lock  = threading.Lock()
+_started  = False
+_start_lock = threading.Lock()
+
+
+# ── Storage ────────────────────────────────────────────────────────────────────
+
+def _connect():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _init_db():
+    with _db_lock, _connect() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="bulk-job")
+    return _executor
+
+
+def start():
+    """Create the job table and resume unfinished jobs.  Safe to call repeatedly."""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _init_db()
+        _started = True
+    resume_unfinished()
+
+
+# ── Job lifecycle ──────────────────────────────────────────────────────────────
+
+def submit_job(players, season, team=None):
+    """Persist a job for *players* (dicts with id/name) and queue it.  Returns the job id."""
+    start()
+    job_id = uuid.uuid4().hex[:12]
+    now = time.time()
+    with _db_lock, _connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, season, team, status, total, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, season, team, "queued" if players else "done", len(players), now, now),
+        )
+        conn.executemany(
+            "INSERT INTO job_players (job_id, seq, player_id, player_name, status) "
+            "VALUES (?, ?, ?, ?, 'pending')",
+            [(job_id, seq, int(p["id"]), p.get("name", "")) for seq, p in enumerate(players)],
+        )
+    _schedule(job_id)
+    print(f"[jobs] Job {job_id}: {len(players)} players queued ({season}{', ' + team if team else ''})")
+    return job_id
+
+
+def resume_unfinished():
+    """Requeue players that were pending or mid-run when the process stopped."""
+    with _db_lock, _connect() as conn:
+        conn.execute(
+            "UPDATE job_players SET status = 'pending', started_at = NULL "
+            "WHERE status = 'running'"
+        )
+        job_ids = [r["id"] for r in conn.execute(
+            "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+        )]
+    for job_id in job_ids:
+        print(f"[jobs] Resuming job {job_id}")
+        _schedule(job_id)
+    return job_ids
+
+
+def _schedule(job_id):
+    _get_executor().submit(_run_job, job_id)
+
+
+def _run_job(job_id):
+    from engine.bulk_runner import iter_bulk
+
+    with _db_lock, _connect() as conn:
+        job = conn.execute("SELECT season FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        rows = conn.execute(
+            "SELECT seq, player_id, player_name FROM job_players "
+            "WHERE job_id = ? AND status = 'pending' ORDER BY seq",
+            (job_id,),
+        ).fetchall()
+    if job is None:
+        return
+    players = [{"seq": r["seq"], "id": r["player_id"], "name": r["player_name"]} for r in rows]
+
+    def mark_running(p):
+        now = time.time()
+        with _db_lock, _connect() as conn:
+            conn.execute(
+                "UPDATE job_players SET status = 'running', started_at = ? WHERE job_id = ? AND seq = ?",
+                (now, job_id, p["seq"]),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (now, job_id),
+            )
+
+    stats = {}
+    try:
+        for p, result, error in iter_bulk(players, season=job["season"], stats=stats, on_start=mark_running):
+            if error:
+                print(f"[jobs] Job {job_id}: {p['name']} ({p['id']}) failed: {error}")
+            _finish_player(job_id, p["seq"], result, error)
+    except Exception as e:
+        # Leave unfinished players pending; they are retried on the next start()
+        print(f"[jobs] Job {job_id} interrupted: {e}")
+        traceback.print_exc()
+        return
+    if players:
+        print(f"[jobs] Job {job_id}: {stats.get('players_per_sec', 0):.2f} players/s")
+
+
+def _finish_player(job_id, seq, result, error):
+    now = time.time()
+    with _db_lock, _connect() as conn:
+        conn.execute(
+            "UPDATE job_players SET status = ?, error = ?, result = ?, finished_at = ?, "
+            "finish_seq = (SELECT COALESCE(MAX(finish_seq), 0) + 1 FROM job_players WHERE job_id = ?) "
+            "WHERE job_id = ? AND seq = ?",
+            ("error" if error else "done", error,
+             json.dumps(result) if result is not None else None, now, job_id, job_id, seq),
+        )
+        counts = _status_counts(conn, job_id)
+        if not counts.get("pending") and not counts.get("running"):
+            status = "failed" if counts.get("error") and not counts.get("done") else "done"
+            conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, now, job_id))
+            print(f"[jobs] Job {job_id} {status}: {counts.get('done', 0)} done, {counts.get('error', 0)} errors")
+        else:
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+
+
+def _status_counts(conn, job_id):
+    return {
+        r["status"]: r["n"]
+        for r in conn.execute(
+            "SELECT status, COUNT(*) AS n FROM job_players WHERE job_id = ? GROUP BY status",
+            (job_id,),
+        )
+    }
+
+
+# ── Queries ────────────────────────────────────────────────────────────────────
+
+def _job_summary(conn, row):
+    counts = _status_counts(conn, row["id"])
+    return {
+        "job_id":     row["id"],
+        "season":     row["season"],
+        "team":       row["team"],
+        "status":     row["status"],
+        "total":      row["total"],
+        "done":       counts.get("done", 0),
+        "failed":     counts.get("error", 0),
+        "running":    counts.get("running", 0),
+        "pending":    counts.get("pending", 0),
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def get_job(job_id, include_players=True):
+    """Job summary with per-player status and errors, or None if unknown."""
+    start()
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = _job_summary(conn, row)
+        if include_players:
+            job["players"] = [
+                {
+                    "player_id": r["player_id"],
+                    "name":      r["player_name"],
+                    "status":    r["status"],
+                    "error":     r["error"],
+                }
+                for r in conn.execute(
+                    "SELECT player_id, player_name, status, error FROM job_players "
+                    "WHERE job_id = ? ORDER BY seq",
+                    (job_id,),
+                )
+            ]
+    return job
+
+
+def list_jobs(limit=20):
+    start()
+    with _connect() as conn:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [_job_summary(conn, r) for r in rows]
+
+
+def get_results(job_id, after=0):
+    """
+    Results finished after cursor *after*, in completion order.  Returns
+    (results, errors, next_after) or None if the job is unknown; pass
+    next_after back in to fetch only the results finished since.
+    """
+    start()
+    with _connect() as conn:
+        if conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+            return None
+        rows = conn.execute(
+            "SELECT finish_seq, player_id, player_name, status, error, result FROM job_players "
+            "WHERE job_id = ? AND finish_seq > ? ORDER BY finish_seq",
+            (job_id, after),
+        ).fetchall()
+    results, errors = [], []
+    next_after = after
+    for r in rows:
+        if r["status"] == "done":
+            results.append(json.loads(r["result"]))
+        else:
+            errors.append({"player_id": r["player_id"], "name": r["player_name"], "error": r["error"]})
+        next_after = r["finish_seq"]
+    return results, errors, next_after
+
+
+def iter_results(job_id):
+    """
+    Yield a finished job's results one at a time in submission order,
+    straight from the database cursor (for exports of any size).
+    """
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "SELECT result FROM job_players WHERE job_id = ? AND status = 'done' ORDER BY seq",
+            (job_id,),
+        )
+        for row in cursor:
+            yield json.loads(row["result"])
+    finally:
+        conn.close()
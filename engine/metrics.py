@@ -0,0 +1,213 @@
+"""
+Process metrics, exposed by GET /metrics in the Prometheus text exposition
+format (version 0.0.4), so any Prometheus-compatible scraper can collect
+them.  No client library is needed: counters and histograms are plain
+in-process objects updated under a lock.
+
+    http_request_duration_seconds     histogram  route, method, status
+    nba_api_requests_total            counter    endpoint
+    nba_api_request_duration_seconds  histogram  endpoint
+    nba_api_errors_total              counter    endpoint, error
+    nba_api_throttled_total           counter    endpoint
+    nba_api_sleep_seconds_total       counter
+    shotdetail_load_seconds           histogram  operation
+    cache_requests_total              counter    cache, result (hit / miss)
+
+Caches reported under cache_requests_total:
+
+    roster          season roster snapshot served from memory
+    league_frame    league-wide NBA API frame within its TTL
+    shotdetail      season shot profile store already in memory
+    tendency_store  /api/generate answered from the materialized store
+    http_304        conditional GET answered with 304 Not Modified
+
+Counters only grow for the life of the process; rates and hit ratios are
+computed by the scraper.  METRICS=0 disables the endpoint.
+"""
+
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("METRICS", "1") != "0"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; NBA API calls and cold shotdetail loads run into the tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = {}   # name -> metric, in registration order
+_lock     = threading.Lock()
+
+_STARTED = time.time()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, doc, labelnames=()):
+        self.name       = name
+        self.doc        = doc
+        self.labelnames = tuple(labelnames)
+        # An unlabelled counter is exposed (as 0) before its first increment
+        self._values    = {} if self.labelnames else {(): 0}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with _lock:
+            return self._values.get(key, 0)
+
+    def _samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name       = name
+        self.doc        = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets    = tuple(sorted(buckets)) + (math.inf,)
+        self._values    = {}   # label values -> [bucket counts..., sum, count]
+
+    def observe(self, seconds, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with _lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry[i] += 1
+                    break
+            entry[-2] += seconds
+            entry[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the with-block (also when it raises)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of time()."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _samples(self):
+        for key, entry in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, entry):
+                cumulative += n
+                le = _labels(self.labelnames, key, [("le", _number(bound))])
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {repr(round(entry[-2], 6))}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {entry[-1]}"
+
+
+def _register(metric):
+    with _lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name, doc, labelnames=()):
+    return _register(Counter(name, doc, labelnames))
+
+
+def histogram(name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, doc, labelnames, buckets))
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response (headers, for streamed bodies), by route.",
+    ("route", "method", "status"))
+
+NBA_API_REQUESTS = counter(
+    "nba_api_requests_total", "NBA Stats API requests made, by endpoint.", ("endpoint",))
+NBA_API_SECONDS = histogram(
+    "nba_api_request_duration_seconds", "NBA Stats API request latency, by endpoint.", ("endpoint",))
+NBA_API_ERRORS = counter(
+    "nba_api_errors_total", "NBA Stats API requests that raised, by endpoint and exception type.",
+    ("endpoint", "error"))
+NBA_API_THROTTLED = counter(
+    "nba_api_throttled_total",
+    "NBA Stats API requests rejected with 429 or timed out (how stats.nba.com throttles), by endpoint.",
+    ("endpoint",))
+NBA_API_SLEEP_SECONDS = counter(
+    "nba_api_sleep_seconds_total", "Time spent in the client-side rate-limit sleep.")
+
+SHOTDETAIL_LOAD_SECONDS = histogram(
+    "shotdetail_load_seconds",
+    "Shotdetail load time by operation (download, build_store, load_store, load_player, load_players).",
+    ("operation",))
+
+CACHE_REQUESTS = counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit / miss).", ("cache", "result"))
+
+
+def cache_result(cache, hit):
+    """Count one lookup of *cache*."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def is_throttle(exc):
+    """True for an HTTP 429 or a timeout -- stats.nba.com throttles by not answering."""
+    text = f"{type(exc).__name__} {exc}"
+    return "429" in text or "Too Many Requests" in text or "Timeout" in text or "timed out" in text
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = [
+        "# HELP process_start_time_seconds Start time of the process since the epoch.",
+        "# TYPE process_start_time_seconds gauge",
+        f"process_start_time_seconds {_STARTED:.3f}",
+    ]
+    with _lock:
+        for metric in _registry.values():
+            lines.append(f"# HELP {metric.name} {metric.doc}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric._samples())
+    return "\n".join(lines) + "\n"
@@ -1,12 +1,203 @@
+import hashlib
+import threading
 import time
+from contextlib import contextmanager
 
+from engine import metrics, tracing
 from engine.constants import SEASON
 
+# League-wide frames are reused for this long before being fetched again
+LEAGUE_FRAME_TTL_SECONDS = 6 * 60 * 60
 
+_league_frames = {}   # (source, season, variant) -> (fetched_at, DataFrame)
+_frame_locks   = {}
+_frames_lock   = threading.Lock()
+_fingerprints  = {}   # season -> (frames they were computed from, {player_id: digest})
+
+
+@tracing.traced("nba_api.sleep")
 def _sleep():
     time.sleep(1.0)
+    metrics.NBA_API_SLEEP_SECONDS.inc(1.0)
+
+
+@contextmanager
+def api_call(endpoint):
+    """
+    Wrap one NBA Stats API request (the endpoint constructor) for tracing
+    and metrics: calls, latency, errors and throttles per endpoint.
+    """
+    metrics.NBA_API_REQUESTS.inc(endpoint=endpoint)
+    try:
+        with tracing.span(f"nba_api.{endpoint}"), metrics.NBA_API_SECONDS.time(endpoint=endpoint):
+            yield
+    except Exception as e:
+        metrics.NBA_API_ERRORS.inc(endpoint=endpoint, error=type(e).__name__)
+        if metrics.is_throttle(e):
+            metrics.NBA_API_THROTTLED.inc(endpoint=endpoint)
+        raise
+
+
+# ── League-wide frame cache ───────────────────────────────────────────────────
+# LeagueDashPtStats, SynergyPlayTypes, LeagueDashPlayerStats and
+# PlayerEstimatedMetrics return every player in one response, so each
+# (endpoint, season, measure) is fetched once and shared by all players.
+# Concurrent callers for the same frame wait for a single fetch; failures
+# (an exception or an empty response) are not cached, so the next caller
+# retries.
+
+def _league_frame(key, fetch):
+    with _frames_lock:
+        lock = _frame_locks.setdefault(key, threading.Lock())
+    with lock:
+        cached = _league_frames.get(key)
+        if cached and time.time() - cached[0] < LEAGUE_FRAME_TTL_SECONDS:
+            metrics.cache_result("league_frame", True)
+            return cached[1]
+        metrics.cache_result("league_frame", False)
+        with tracing.span("nba_stats.league_frame_fetch", source=key[0], variant=key[2]):
+            df = fetch()
+        # An empty frame is a failed fetch too (the API answers some outages
+        # with no rows); cache neither, so the next caller tries again
+        if df is None or df.empty:
+            return None
+        _league_frames[key] = (time.time(), df)
+        return df
+
+
+def _first_frame(endpoint):
+    dfs = endpoint.get_data_frames()
+    return dfs[0] if dfs and not dfs[0].empty else None
+
+
+def _synergy_frame(season, play_type):
+    def fetch():
+        from nba_api.stats.endpoints import synergyplaytypes
+        _sleep()
+        with api_call("SynergyPlayTypes"):
+            syn = synergyplaytypes.SynergyPlayTypes(
+                season=season,
+                play_type_nullable=play_type,
+                per_mode_simple="PerGame",
+                player_or_team_abbreviation="P",
+                season_type_all_star="Regular Season",
+                type_grouping_nullable="offensive",
+            )
+        _sleep()
+        return _first_frame(syn)
+    return _league_frame(("synergy", season, play_type), fetch)
+
+
+def _pt_stats_frame(season, measure):
+    def fetch():
+        from nba_api.stats.endpoints import leaguedashptstats
+        _sleep()
+        with api_call("LeagueDashPtStats"):
+            pt = leaguedashptstats.LeagueDashPtStats(
+                season=season,
+                pt_measure_type=measure,
+                per_mode_simple="PerGame",
+                player_or_team="Player",
+            )
+        _sleep()
+        return _first_frame(pt)
+    return _league_frame(("pt_stats", season, measure), fetch)
+
+
+def _player_stats_frame(season, measure="Base"):
+    def fetch():
+        from nba_api.stats.endpoints import leaguedashplayerstats
+        _sleep()
+        kwargs = {"measure_type_detailed_defense": measure} if measure != "Base" else {}
+        with api_call("LeagueDashPlayerStats"):
+            dash = leaguedashplayerstats.LeagueDashPlayerStats(
+                season=season,
+                per_mode_detailed="PerGame",
+                **kwargs,
+            )
+        _sleep()
+        return _first_frame(dash)
+    return _league_frame(("player_stats", season, measure), fetch)
 
 
+def _estimated_metrics_frame(season):
+    def fetch():
+        from nba_api.stats.endpoints import playerestimatedmetrics
+        _sleep()
+        with api_call("PlayerEstimatedMetrics"):
+            est = playerestimatedmetrics.PlayerEstimatedMetrics(season=season)
+        _sleep()
+        return _first_frame(est)
+    return _league_frame(("estimated_metrics", season, None), fetch)
+
+
+def _league_loaders(season):
+    """Loaders for every league-wide frame get_tracking_stats() and get_player_per_game_stats() use."""
+    return (
+        [lambda pt=pt: _synergy_frame(season, pt)
+         for pt in ("Isolation", "Postup", "PRRollMan", "Transition", "Spotup", "OffScreen")]
+        + [lambda m=m: _pt_stats_frame(season, m)
+           for m in ("Drives", "Passing", "PullUpShot", "Possessions", "CatchShoot", "Defense", "SpeedDistance")]
+        + [lambda m=m: _player_stats_frame(season, m) for m in ("Advanced", "Base")]
+        + [lambda: _estimated_metrics_frame(season)]
+    )
+
+
+def prefetch_league_frames(season=SEASON):
+    """
+    Load every league-wide frame get_tracking_stats() and
+    get_player_per_game_stats() use for *season* (one request each), e.g.
+    during startup warm-up.  Returns the number of frames loaded.
+    """
+    loaded = 0
+    for load in _league_loaders(season):
+        try:
+            if load() is not None:
+                loaded += 1
+        except Exception as e:
+            print(f"[nba_stats] League frame prefetch failed: {e}")
+    return loaded
+
+
+def league_fingerprints(season=SEASON):
+    """
+    {player_id: hex digest} of each player's rows across every league-wide
+    frame of *season* -- cheap once the frames are cached, and it changes
+    whenever the player's season stats do.  None when any frame is
+    unavailable, so callers fall back to a full per-player check.
+
+    The digests are kept until one of the cached frames is refetched, so
+    single generations can fingerprint a player without rehashing the league.
+    """
+    import pandas as pd
+
+    frames = []
+    for load in _league_loaders(season):
+        try:
+            df = load()
+        except Exception as e:
+            print(f"[nba_stats] League frame unavailable for fingerprints: {e}")
+            return None
+        frames.append(df)
+
+    cached = _fingerprints.get(season)
+    if cached and len(cached[0]) == len(frames) and all(a is b for a, b in zip(cached[0], frames)):
+        return cached[1]
+
+    digests = {}
+    for i, df in enumerate(frames):
+        id_col = next((c for c in ("PLAYER_ID", "player_id", "Player_ID") if df is not None and c in df.columns), None)
+        if id_col is None:
+            return None
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        for pid, row_hash in zip(df[id_col].to_numpy(), row_hashes):
+            digests.setdefault(int(pid), hashlib.sha256()).update(f"{i}:{row_hash};".encode())
+    fingerprints = {pid: h.hexdigest() for pid, h in digests.items()}
+    _fingerprints[season] = (frames, fingerprints)
+    return fingerprints
+
+
+@tracing.traced()
 def get_tracking_stats(player_id, season=SEASON):
     result = {
         "touches_per_game":       None,
@@ -37,12 +228,13 @@ def get_tracking_stats(player_id, season=SEASON):
     try:
         from nba_api.stats.endpoints import playerdashptshots
         _sleep()
-        shot_data = playerdashptshots.PlayerDashPtShots(
-            team_id=0,
-            player_id=player_id,
-            season=season,
-            per_mode_simple="PerGame",
-        )
+        with api_call("PlayerDashPtShots"):
+            shot_data = playerdashptshots.PlayerDashPtShots(
+                team_id=0,
+                player_id=player_id,
+                season=season,
+                per_mode_simple="PerGame",
+            )
         _sleep()
         dfs = shot_data.get_data_frames()
         for df in dfs:
@@ -65,12 +257,13 @@ def get_tracking_stats(player_id, season=SEASON):
     try:
         from nba_api.stats.endpoints import playerdashptpass
         _sleep()
-        pass_data = playerdashptpass.PlayerDashPtPass(
-            team_id=0,
-            player_id=player_id,
-            season=season,
-            per_mode_simple="PerGame",
-        )
+        with api_call("PlayerDashPtPass"):
+            pass_data = playerdashptpass.PlayerDashPtPass(
+                team_id=0,
+                player_id=player_id,
+                season=season,
+                per_mode_simple="PerGame",
+            )
         _sleep()
         dfs = pass_data.get_data_frames()
         if len(dfs) > 1 and not dfs[1].empty:
@@ -99,20 +292,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # Try synergy-style endpoints
     try:
-        from nba_api.stats.endpoints import synergyplaytypes
-        _sleep()
-        syn = synergyplaytypes.SynergyPlayTypes(
-            season=season,
-            play_type_nullable="Isolation",
-            per_mode_simple="PerGame",
-            player_or_team_abbreviation="P",
-            season_type_all_star="Regular Season",
-            type_grouping_nullable="offensive",
-        )
-        _sleep()
-        dfs = syn.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _synergy_frame(season, "Isolation")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -121,20 +302,8 @@ def get_tracking_stats(player_id, season=SEASON):
         print(f"[nba_stats] Isolation synergy failed: {e}")
 
     try:
-        from nba_api.stats.endpoints import synergyplaytypes
-        _sleep()
-        syn = synergyplaytypes.SynergyPlayTypes(
-            season=season,
-            play_type_nullable="Postup",
-            per_mode_simple="PerGame",
-            player_or_team_abbreviation="P",
-            season_type_all_star="Regular Season",
-            type_grouping_nullable="offensive",
-        )
-        _sleep()
-        dfs = syn.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _synergy_frame(season, "Postup")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -143,20 +312,8 @@ def get_tracking_stats(player_id, season=SEASON):
         print(f"[nba_stats] Postup synergy failed: {e}")
 
     try:
-        from nba_api.stats.endpoints import synergyplaytypes
-        _sleep()
-        syn = synergyplaytypes.SynergyPlayTypes(
-            season=season,
-            play_type_nullable="PRRollMan",
-            per_mode_simple="PerGame",
-            player_or_team_abbreviation="P",
-            season_type_all_star="Regular Season",
-            type_grouping_nullable="offensive",
-        )
-        _sleep()
-        dfs = syn.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _synergy_frame(season, "PRRollMan")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -166,18 +323,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # Drives
     try:
-        from nba_api.stats.endpoints import leaguedashptstats
-        _sleep()
-        drv = leaguedashptstats.LeagueDashPtStats(
-            season=season,
-            pt_measure_type="Drives",
-            per_mode_simple="PerGame",
-            player_or_team="Player",
-        )
-        _sleep()
-        dfs = drv.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _pt_stats_frame(season, "Drives")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -188,18 +335,8 @@ def get_tracking_stats(player_id, season=SEASON):
     # Touches (with retry and fallback measure type)
     for attempt in range(2):
         try:
-            from nba_api.stats.endpoints import leaguedashptstats
-            _sleep()
-            touches = leaguedashptstats.LeagueDashPtStats(
-                season=season,
-                pt_measure_type="Passing",
-                per_mode_simple="PerGame",
-                player_or_team="Player",
-            )
-            _sleep()
-            dfs = touches.get_data_frames()
-            if dfs and not dfs[0].empty:
-                df = dfs[0]
+            df = _pt_stats_frame(season, "Passing")
+            if df is not None and not df.empty:
                 if "PLAYER_ID" in df.columns:
                     rows = df[df["PLAYER_ID"] == int(player_id)]
                     if not rows.empty:
@@ -219,18 +356,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # PullUpShot
     try:
-        from nba_api.stats.endpoints import leaguedashptstats
-        _sleep()
-        pullups = leaguedashptstats.LeagueDashPtStats(
-            season=season,
-            pt_measure_type="PullUpShot",
-            per_mode_simple="PerGame",
-            player_or_team="Player",
-        )
-        _sleep()
-        dfs = pullups.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _pt_stats_frame(season, "PullUpShot")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -247,18 +374,8 @@ def get_tracking_stats(player_id, season=SEASON):
     # Average dribbles — from Possessions measure type
     if result["avg_dribbles_before_shot"] is None:
         try:
-            from nba_api.stats.endpoints import leaguedashptstats
-            _sleep()
-            poss = leaguedashptstats.LeagueDashPtStats(
-                season=season,
-                pt_measure_type="Possessions",
-                per_mode_simple="PerGame",
-                player_or_team="Player",
-            )
-            _sleep()
-            dfs = poss.get_data_frames()
-            if dfs and not dfs[0].empty:
-                df = dfs[0]
+            df = _pt_stats_frame(season, "Possessions")
+            if df is not None and not df.empty:
                 if "PLAYER_ID" in df.columns:
                     rows = df[df["PLAYER_ID"] == int(player_id)]
                     if not rows.empty:
@@ -273,18 +390,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # CatchShoot
     try:
-        from nba_api.stats.endpoints import leaguedashptstats
-        _sleep()
-        catchshoot = leaguedashptstats.LeagueDashPtStats(
-            season=season,
-            pt_measure_type="CatchShoot",
-            per_mode_simple="PerGame",
-            player_or_team="Player",
-        )
-        _sleep()
-        dfs = catchshoot.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _pt_stats_frame(season, "CatchShoot")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -300,19 +407,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # Defense
     try:
-        from nba_api.stats.endpoints import leaguedashptstats
-        _sleep()
-        defended = leaguedashptstats.LeagueDashPtStats(
-            season=season,
-            pt_measure_type="Defense",
-            per_mode_simple="PerGame",
-            player_or_team="Player",
-            player_id_nullable=player_id,
-        )
-        _sleep()
-        dfs = defended.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _pt_stats_frame(season, "Defense")
+        if df is not None and not df.empty:
             id_col = None
             for col_name in ["PLAYER_ID", "player_id", "Player_ID"]:
                 if col_name in df.columns:
@@ -338,18 +434,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # SpeedDistance
     try:
-        from nba_api.stats.endpoints import leaguedashptstats
-        _sleep()
-        speed = leaguedashptstats.LeagueDashPtStats(
-            season=season,
-            pt_measure_type="SpeedDistance",
-            per_mode_simple="PerGame",
-            player_or_team="Player",
-        )
-        _sleep()
-        dfs = speed.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _pt_stats_frame(season, "SpeedDistance")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -359,20 +445,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # Transition synergy
     try:
-        from nba_api.stats.endpoints import synergyplaytypes
-        _sleep()
-        syn = synergyplaytypes.SynergyPlayTypes(
-            season=season,
-            play_type_nullable="Transition",
-            per_mode_simple="PerGame",
-            player_or_team_abbreviation="P",
-            season_type_all_star="Regular Season",
-            type_grouping_nullable="offensive",
-        )
-        _sleep()
-        dfs = syn.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _synergy_frame(season, "Transition")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -385,20 +459,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # Spot-Up synergy
     try:
-        from nba_api.stats.endpoints import synergyplaytypes
-        _sleep()
-        syn = synergyplaytypes.SynergyPlayTypes(
-            season=season,
-            play_type_nullable="Spotup",
-            per_mode_simple="PerGame",
-            player_or_team_abbreviation="P",
-            season_type_all_star="Regular Season",
-            type_grouping_nullable="offensive",
-        )
-        _sleep()
-        dfs = syn.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _synergy_frame(season, "Spotup")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -408,20 +470,8 @@ def get_tracking_stats(player_id, season=SEASON):
 
     # OffScreen synergy
     try:
-        from nba_api.stats.endpoints import synergyplaytypes
-        _sleep()
-        syn = synergyplaytypes.SynergyPlayTypes(
-            season=season,
-            play_type_nullable="OffScreen",
-            per_mode_simple="PerGame",
-            player_or_team_abbreviation="P",
-            season_type_all_star="Regular Season",
-            type_grouping_nullable="offensive",
-        )
-        _sleep()
-        dfs = syn.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _synergy_frame(season, "OffScreen")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -446,17 +496,19 @@ def get_tracking_stats(player_id, season=SEASON):
     return result
 
 
+@tracing.traced()
 def get_shot_zones(player_id, season=SEASON):
     zones = {}
     try:
         from nba_api.stats.endpoints import shotchartdetail
         _sleep()
-        chart = shotchartdetail.ShotChartDetail(
-            team_id=0,
-            player_id=player_id,
-            season_nullable=season,
-            context_measure_simple="FGA",
-        )
+        with api_call("ShotChartDetail"):
+            chart = shotchartdetail.ShotChartDetail(
+                team_id=0,
+                player_id=player_id,
+                season_nullable=season,
+                context_measure_simple="FGA",
+            )
         _sleep()
         dfs = chart.get_data_frames()
         if not dfs or dfs[0].empty:
@@ -483,12 +535,24 @@ def get_shot_zones(player_id, season=SEASON):
     return zones
 
 
-def get_player_info(player_id):
+@tracing.traced()
+def get_player_info(player_id, season=SEASON):
+    # League-wide roster snapshot first: one PlayerIndex call per season covers
+    # every rostered player, so the three per-player calls below are skipped.
+    try:
+        from engine.player_search import get_player_bio
+        bio = get_player_bio(player_id, season=season)
+        if bio:
+            return bio
+    except Exception as e:
+        print(f"[nba_stats] roster bio lookup failed: {e}")
+
     info = {"name": "", "team": "", "position": "", "height": "", "weight": ""}
     try:
         from nba_api.stats.endpoints import playerprofilev2
         _sleep()
-        profile = playerprofilev2.PlayerProfileV2(player_id=player_id, timeout=60)
+        with api_call("PlayerProfileV2"):
+            profile = playerprofilev2.PlayerProfileV2(player_id=player_id, timeout=60)
         _sleep()
         dfs = profile.get_data_frames()
         if dfs and not dfs[0].empty:
@@ -509,7 +573,8 @@ def get_player_info(player_id):
     try:
         from nba_api.stats.endpoints import commonplayerinfo
         _sleep()
-        cpi = commonplayerinfo.CommonPlayerInfo(player_id=player_id, timeout=60)
+        with api_call("CommonPlayerInfo"):
+            cpi = commonplayerinfo.CommonPlayerInfo(player_id=player_id, timeout=60)
         _sleep()
         dfs = cpi.get_data_frames()
         if dfs and not dfs[0].empty:
@@ -525,6 +590,7 @@ def get_player_info(player_id):
     return info
 
 
+@tracing.traced()
 def get_player_per_game_stats(player_id, season=SEASON):
     """
     Fetch per-game and advanced stats using nba_api.
@@ -543,10 +609,11 @@ def get_player_per_game_stats(player_id, season=SEASON):
     try:
         from nba_api.stats.endpoints import playercareerstats
         _sleep()
-        career = playercareerstats.PlayerCareerStats(
-            player_id=player_id,
-            per_mode36="PerGame",
-        )
+        with api_call("PlayerCareerStats"):
+            career = playercareerstats.PlayerCareerStats(
+                player_id=player_id,
+                per_mode36="PerGame",
+            )
         _sleep()
         dfs = career.get_data_frames()
         if dfs and not dfs[0].empty:
@@ -578,16 +645,8 @@ def get_player_per_game_stats(player_id, season=SEASON):
     # Fallback to LeagueDashPlayerStats for per-game stats
     if not per_game:
         try:
-            from nba_api.stats.endpoints import leaguedashplayerstats
-            _sleep()
-            dash = leaguedashplayerstats.LeagueDashPlayerStats(
-                season=season,
-                per_mode_detailed="PerGame",
-            )
-            _sleep()
-            dfs = dash.get_data_frames()
-            if dfs and not dfs[0].empty:
-                df = dfs[0]
+            df = _player_stats_frame(season, "Base")
+            if df is not None and not df.empty:
                 rows = df[df["PLAYER_ID"] == int(player_id)]
                 if not rows.empty:
                     row = rows.iloc[0]
@@ -613,17 +672,8 @@ def get_player_per_game_stats(player_id, season=SEASON):
     # Try LeagueDashPlayerStats (Advanced) for advanced metrics
     # nba_api returns decimals (e.g. 0.30 = 30% USG); multiply by 100 for percentage
     try:
-        from nba_api.stats.endpoints import leaguedashplayerstats
-        _sleep()
-        adv_dash = leaguedashplayerstats.LeagueDashPlayerStats(
-            season=season,
-            per_mode_detailed="PerGame",
-            measure_type_detailed_defense="Advanced",
-        )
-        _sleep()
-        dfs = adv_dash.get_data_frames()
-        if dfs and not dfs[0].empty:
-            df = dfs[0]
+        df = _player_stats_frame(season, "Advanced")
+        if df is not None and not df.empty:
             rows = df[df["PLAYER_ID"] == int(player_id)]
             if not rows.empty:
                 row = rows.iloc[0]
@@ -644,13 +694,8 @@ def get_player_per_game_stats(player_id, season=SEASON):
     # Fallback to PlayerEstimatedMetrics for advanced metrics
     if not advanced:
         try:
-            from nba_api.stats.endpoints import playerestimatedmetrics
-            _sleep()
-            est = playerestimatedmetrics.PlayerEstimatedMetrics(season=season)
-            _sleep()
-            dfs = est.get_data_frames()
-            if dfs and not dfs[0].empty:
-                df = dfs[0]
+            df = _estimated_metrics_frame(season)
+            if df is not None and not df.empty:
                 rows = df[df["PLAYER_ID"] == int(player_id)]
                 if not rows.empty:
                     row = rows.iloc[0]
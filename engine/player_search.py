@@ -1,59 +1,182 @@
 import json
 import os
+import threading
 import time
 
+from engine import metrics, tracing
+from engine.constants import SEASON
+from engine.nba_stats import api_call
+from engine.search_index import NameIndex, normalize_name
+
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+# Pre-season-keyed cache; still read as a stale fallback for the default season
 CACHE_FILE = os.path.join(DATA_DIR, "players_cache.json")
 
-_players_cache = None
+# Rosters older than this are served while a background refresh runs
+ROSTER_TTL_SECONDS = 24 * 3600
+# Minimum gap between refresh attempts for one season (avoids hammering a down API)
+_RETRY_SECONDS = 300
 
+# Hard latency bound for the typo-tolerant pass of search_players()
+FUZZY_BUDGET_MS = 5.0
 
-def _load_cache():
-    global _players_cache
-    if _players_cache is not None:
-        return _players_cache
-    if os.path.exists(CACHE_FILE):
-        try:
+_snapshots = {}         # season -> RosterSnapshot (replaced, never mutated)
+_refreshing = set()     # seasons with a background refresh in flight
+_last_attempt = {}      # season -> time of the last refresh attempt
+_load_locks = {}        # season -> lock serializing the first (blocking) load
+_lock = threading.Lock()
+_static_index = None    # NameIndex over nba_api's bundled (historical) player list
+
+# Common nicknames -> canonical roster name (matched after normalization)
+_NICKNAMES = {
+    "greek freak":    "Giannis Antetokounmpo",
+    "giannis":        "Giannis Antetokounmpo",
+    "king james":     "LeBron James",
+    "lebron":         "LeBron James",
+    "bron":           "LeBron James",
+    "steph":          "Stephen Curry",
+    "steph curry":    "Stephen Curry",
+    "chef curry":     "Stephen Curry",
+    "kd":             "Kevin Durant",
+    "slim reaper":    "Kevin Durant",
+    "ad":             "Anthony Davis",
+    "the brow":       "Anthony Davis",
+    "sga":            "Shai Gilgeous-Alexander",
+    "shai":           "Shai Gilgeous-Alexander",
+    "cp3":            "Chris Paul",
+    "joker":          "Nikola Jokic",
+    "jokic":          "Nikola Jokic",
+    "luka":           "Luka Doncic",
+    "the beard":      "James Harden",
+    "dame":           "Damian Lillard",
+    "pg13":           "Paul George",
+    "pg":             "Paul George",
+    "wemby":          "Victor Wembanyama",
+    "ant":            "Anthony Edwards",
+    "ant man":        "Anthony Edwards",
+    "spida":          "Donovan Mitchell",
+    "jimmy buckets":  "Jimmy Butler",
+    "zion":           "Zion Williamson",
+    "kat":            "Karl-Anthony Towns",
+    "jjj":            "Jaren Jackson Jr.",
+    "book":           "Devin Booker",
+    "dlo":            "D'Angelo Russell",
+    "embiid":         "Joel Embiid",
+    "the process":    "Joel Embiid",
+    "trae":           "Trae Young",
+    "ja":             "Ja Morant",
+    "scottie":        "Scottie Barnes",
+    "chet":           "Chet Holmgren",
+    "tatum":          "Jayson Tatum",
+    "jt":             "Jayson Tatum",
+}
+
+class RosterSnapshot:
+    """
+    One season's roster plus its search index.  Snapshots are never mutated:
+    a refresh builds a new one and swaps it into _snapshots in a single
+    assignment, so readers never block and never see a half-built roster.
+    """
+
+    __slots__ = ("season", "players", "index", "by_id", "fetched_at", "version")
+
+    def __init__(self, season, players, fetched_at):
+        self.season     = season
+        self.players    = tuple(players)
+        self.index      = NameIndex(self.players)
+        self.by_id      = {int(p.get("id", 0)): p for p in self.players}
+        self.fetched_at = float(fetched_at)
+        self.version    = f"{season}:{int(self.fetched_at)}:{len(self.players)}"
+
+    def is_stale(self, now=None):
+        return ((now or time.time()) - self.fetched_at) > ROSTER_TTL_SECONDS
+
+
+def _cache_path(season):
+    return os.path.join(DATA_DIR, f"players_cache_{season}.json")
+
+
+def _read_snapshot(season):
+    path = _cache_path(season)
+    try:
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            return RosterSnapshot(season, data.get("players", []), data.get("fetched_at", 0))
+        if season == SEASON and os.path.exists(CACHE_FILE):
+            # Legacy un-versioned cache: serve it, but treat it as stale
             with open(CACHE_FILE, "r") as f:
-                _players_cache = json.load(f)
-            return _players_cache
-        except Exception:
-            pass
+                return RosterSnapshot(season, json.load(f), 0)
+    except Exception as e:
+        print(f"[player_search] Could not read roster cache for {season}: {e}")
     return None
 
 
-def _save_cache(players):
+def _write_snapshot(snapshot):
+    """Write atomically: readers of the file see either the old or the new roster."""
     os.makedirs(DATA_DIR, exist_ok=True)
-    with open(CACHE_FILE, "w") as f:
-        json.dump(players, f)
+    path = _cache_path(snapshot.season)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "season":     snapshot.season,
+            "fetched_at": snapshot.fetched_at,
+            "players":    list(snapshot.players),
+        }, f)
+    os.replace(tmp, path)
 
 
-def get_all_players(season="2024-25"):
-    cached = _load_cache()
-    if cached:
-        return cached
-
+@tracing.traced()
+def _fetch_players(season):
+    """
+    One league-wide fetch per season.  PlayerIndex returns name, team,
+    position, height and weight for every rostered player in a single call,
+    so generation never needs per-player bio lookups for roster players.
+    """
     players = []
     try:
-        from nba_api.stats.static import players as static_players
+        from nba_api.stats.endpoints import playerindex
+
+        time.sleep(0.6)
+        with api_call("PlayerIndex"):
+            index_data = playerindex.PlayerIndex(league_id="00", season=season, timeout=60)
+        time.sleep(0.6)
+        df = index_data.get_data_frames()[0]
+
+        for _, row in df.iterrows():
+            players.append({
+                "id":          int(row.get("PERSON_ID", 0)),
+                "name":        f"{row.get('PLAYER_FIRST_NAME', '')} {row.get('PLAYER_LAST_NAME', '')}".strip(),
+                "team_abbrev": _clean(row.get("TEAM_ABBREVIATION")),
+                "position":    _clean(row.get("POSITION")),
+                "height":      _clean(row.get("HEIGHT")),
+                "weight":      _clean(row.get("WEIGHT")),
+            })
+    except Exception as e:
+        print(f"[player_search] PlayerIndex failed: {e}")
+
+    if players:
+        return players
+
+    try:
         from nba_api.stats.endpoints import commonallplayers
-        import time
 
         time.sleep(0.6)
-        all_players_data = commonallplayers.CommonAllPlayers(
-            is_only_current_season=1,
-            league_id="00",
-            season=season,
-        )
+        with api_call("CommonAllPlayers"):
+            all_players_data = commonallplayers.CommonAllPlayers(
+                is_only_current_season=1,
+                league_id="00",
+                season=season,
+            )
         time.sleep(0.6)
         df = all_players_data.get_data_frames()[0]
 
         for _, row in df.iterrows():
             players.append({
-                "id":         int(row.get("PERSON_ID", 0)),
-                "name":       str(row.get("DISPLAY_FIRST_LAST", "")),
-                "team_abbrev": str(row.get("TEAM_ABBREVIATION", "")),
-                "position":   str(row.get("ROSTERSTATUS", "")),
+                "id":          int(row.get("PERSON_ID", 0)),
+                "name":        str(row.get("DISPLAY_FIRST_LAST", "")),
+                "team_abbrev": _clean(row.get("TEAM_ABBREVIATION")),
+                "position":    "",
             })
     except Exception:
         # Fall back to static players list
@@ -70,42 +193,189 @@ def get_all_players(season="2024-25"):
                 })
         except Exception:
             pass
+    return players
 
-    if players:
-        _save_cache(players)
-        global _players_cache
-        _players_cache = players
 
-    return players
+def _clean(value):
+    if value is None or str(value).strip() in ("", "None", "nan"):
+        return ""
+    return str(value).strip()
 
 
-def search_players(query, limit=10):
-    players = get_all_players()
+def _refresh(season):
+    """Fetch, persist and swap in a new snapshot.  Returns it, or None on failure."""
+    _last_attempt[season] = time.time()
+    players = _fetch_players(season)
     if not players:
+        print(f"[player_search] Roster refresh for {season} returned no players; keeping current snapshot")
+        return None
+    snapshot = RosterSnapshot(season, players, time.time())
+    try:
+        _write_snapshot(snapshot)
+    except Exception as e:
+        print(f"[player_search] Could not write roster cache for {season}: {e}")
+    _snapshots[season] = snapshot
+    return snapshot
+
+
+def _refresh_in_background(season):
+    with _lock:
+        if season in _refreshing:
+            return False
+        if time.time() - _last_attempt.get(season, 0) < _RETRY_SECONDS:
+            return False
+        _refreshing.add(season)
+
+    def run():
+        try:
+            _refresh(season)
+        finally:
+            with _lock:
+                _refreshing.discard(season)
+
+    threading.Thread(target=run, name=f"roster-refresh-{season}", daemon=True).start()
+    return True
+
+
+def _season_lock(season):
+    with _lock:
+        return _load_locks.setdefault(season, threading.Lock())
+
+
+def get_snapshot(season=SEASON):
+    """
+    Return the RosterSnapshot for *season*.  Only the very first load (no
+    cache file at all) blocks on the network; an expired snapshot is served
+    as-is while a background refresh replaces it.
+    """
+    snapshot = _snapshots.get(season)
+    metrics.cache_result("roster", snapshot is not None)
+    if snapshot is None:
+        with _season_lock(season):
+            snapshot = _snapshots.get(season)
+            if snapshot is None:
+                snapshot = _read_snapshot(season)
+                if snapshot is None or not snapshot.players:
+                    snapshot = _refresh(season) or RosterSnapshot(season, [], 0)
+                _snapshots[season] = snapshot
+    if snapshot.is_stale():
+        _refresh_in_background(season)
+    return snapshot
+
+
+def get_all_players(season=SEASON):
+    return get_snapshot(season).players
+
+
+def get_player_bio(player_id, season=SEASON):
+    """
+    Roster metadata for one player from the league-wide snapshot:
+    {"name", "team", "position", "height", "weight"}, or None when the
+    player is not on the roster or the snapshot has no bio fields.
+    """
+    p = get_snapshot(season).by_id.get(int(player_id))
+    if not p or not p.get("position"):
+        return None
+    return {
+        "name":     p.get("name", ""),
+        "team":     p.get("team_abbrev", ""),
+        "position": p.get("position", ""),
+        "height":   p.get("height", ""),
+        "weight":   p.get("weight", ""),
+    }
+
+
+def _get_static_index():
+    """Index of nba_api's bundled (offline) player list, including historical players."""
+    global _static_index
+    if _static_index is None:
+        entries = []
+        try:
+            from nba_api.stats.static import players as static_players
+            # Active players first so they win when historical names collide
+            for p in sorted(static_players.get_players(), key=lambda p: not p.get("is_active")):
+                entries.append({"id": int(p.get("id", 0)), "name": str(p.get("full_name", ""))})
+        except Exception as e:
+            print(f"[player_search] static player index unavailable: {e}")
+        _static_index = NameIndex(entries)
+    return _static_index
+
+
+def resolve_player(name, season=SEASON):
+    """
+    Resolve a free-text player name to {"id", "name", ...} without any network
+    calls beyond the (cached) roster load.  Handles diacritics ("Jokic"),
+    suffixes ("Jaren Jackson"), nicknames ("Greek Freak") and unique last
+    names.  Returns None when the name cannot be resolved unambiguously.
+    """
+    key = normalize_name(name)
+    if not key:
+        return None
+    index = get_snapshot(season).index
+
+    match = index.lookup(key)
+    if match:
+        return match
+
+    # Unique last-name match on the current roster
+    if " " not in key:
+        matches = index.by_last_name(key)
+        if len(matches) == 1:
+            return matches[0]
+
+    static = _get_static_index()
+    match = static.lookup(key)
+    if match:
+        return match
+
+    # Nicknames only when the name itself matches nobody: short ones ("ad",
+    # "ja", "book") are also real name parts and must not shadow a player
+    alias = _NICKNAMES.get(key)
+    if alias:
+        return index.lookup(alias) or static.lookup(alias)
+    return None
+
+
+def find_player(player_id, season=SEASON):
+    """Roster (or static list) entry for *player_id*, or None."""
+    player_id = int(player_id)
+    match = get_snapshot(season).by_id.get(player_id)
+    if match:
+        return match
+    return next((p for p in _get_static_index().players if p["id"] == player_id), None)
+
+
+@tracing.traced()
+def search_players(query, limit=10, season=SEASON):
+    index = get_snapshot(season).index
+    if not len(index):
         return []
 
-    query_lower = query.lower()
-    results = []
-    for p in players:
-        name = p.get("name", "")
-        if query_lower in name.lower():
-            results.append({
-                "name":      name,
-                "team":      p.get("team_abbrev", ""),
-                "position":  p.get("position", ""),
-                "player_id": p.get("id", 0),
-            })
-        if len(results) >= limit:
-            break
+    matches = index.search(query, limit=limit)
+    if len(matches) < limit:
+        # Fill remaining slots with typo-tolerant matches ("Antetokoumpo")
+        matches += index.fuzzy_search(
+            query, limit=limit - len(matches), budget_ms=FUZZY_BUDGET_MS, exclude=matches,
+        )
 
-    # Prioritize starts-with matches
-    results.sort(key=lambda x: (0 if x["name"].lower().startswith(query_lower) else 1, x["name"]))
-    return results[:limit]
+    return [
+        {
+            "name":      p.get("name", ""),
+            "team":      p.get("team_abbrev", ""),
+            "position":  p.get("position", ""),
+            "player_id": p.get("id", 0),
+        }
+        for p in matches
+    ]
 
 
-def refresh_cache():
-    global _players_cache
-    _players_cache = None
-    if os.path.exists(CACHE_FILE):
-        os.remove(CACHE_FILE)
-    return get_all_players()
+def refresh_cache(season=SEASON):
+    """
+    Start a background roster refresh for *season* and return the snapshot
+    that is being served meanwhile.  The new roster is swapped in when the
+    fetch completes.
+    """
+    with _lock:
+        _last_attempt.pop(season, None)
+    started = _refresh_in_background(season)
+    return get_snapshot(season), started
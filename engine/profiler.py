@@ -0,0 +1,199 @@
+"""
+On-demand sampling profiler for a single call.
+
+    result, report = profiler.profile(generate_tendencies_for_player, pid, name, season)
+
+The call runs on the calling thread while a sampler thread reads that
+thread's stack (sys._current_frames) every PROFILE_INTERVAL_MS.  Sampling
+is wall-clock, so time blocked on NBA API requests and rate-limit sleeps
+shows up alongside CPU time.  The report holds
+
+  tree    call tree rooted at the profiled function: per frame, samples,
+          self/total ms and children (slowest first)
+  folded  folded stacks ("a;b;c 12" per line) for flamegraph.pl,
+          speedscope or any other flame-graph viewer
+  top     frames with the most self time
+
+Profiling is off unless the server runs with PROFILING=1.  Nothing is
+installed or patched ahead of time: a sampler thread exists only while a
+profile() call is running, so requests that do not ask for a profile pay
+nothing.  One profile runs at a time.
+
+While a profile runs, the interpreter's switch interval is lowered so a
+CPU-bound call yields the GIL to the sampler often enough.  The setting
+is process-wide: every thread in the server switches more often until the
+call returns, when the previous value is restored.  The profiler never
+lowers it below MIN_SWITCH_INTERVAL_MS.
+"""
+
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+ENABLED     = os.environ.get("PROFILING", "0") == "1"
+INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "2"))
+
+MIN_SWITCH_INTERVAL_MS = 0.5
+
+_ROOT   = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_active = threading.Lock()
+
+# Decorator wrappers (tracing.traced, metrics timers) are left out of stacks
+_SKIP_FILES = {os.path.join(os.path.dirname(__file__), name) for name in ("tracing.py", "metrics.py")}
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profile() call is already running."""
+
+
+def _label(code):
+    """'qualname (path:firstline)', with paths shortened to the repo or package."""
+    path = os.path.abspath(code.co_filename)
+    if path.startswith(_ROOT + os.sep):
+        path = os.path.relpath(path, _ROOT)
+    else:
+        parts = path.replace("\\", "/").split("/")
+        cut = max((i for i, p in enumerate(parts) if p in ("site-packages", "lib", "Lib")), default=-1)
+        path = "/".join(parts[cut + 1:]) if cut >= 0 else parts[-1]
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({path}:{code.co_firstlineno})"
+
+
+def _code_of(fn):
+    """The code object samples of *fn* start with (None for builtins, partials, ...)."""
+    fn = inspect.unwrap(getattr(fn, "__func__", fn))
+    return getattr(fn, "__code__", None)
+
+
+def _sample(thread_id, stop_frame, root_code=None):
+    """
+    The target thread's stack below *stop_frame*, outermost first, or None
+    when the thread is not inside *stop_frame* or, given *root_code*, the
+    outermost frame is not that code (the thread is still starting or
+    already returning from the call).
+    """
+    frame = sys._current_frames().get(thread_id)
+    stack = []
+    while frame is not None and frame is not stop_frame:
+        if frame.f_code.co_filename not in _SKIP_FILES:
+            stack.append(frame.f_code)
+        frame = frame.f_back
+    if frame is None or not stack:
+        return None
+    stack.reverse()
+    if root_code is not None and stack[0] is not root_code:
+        return None
+    return tuple(stack)
+
+
+def _tree(stacks, interval_ms):
+    root = {"children": {}, "samples": 0, "self": 0}
+    for stack, n in stacks.items():
+        node = root
+        node["samples"] += n
+        for code in stack:
+            node = node["children"].setdefault(code, {"children": {}, "samples": 0, "self": 0})
+            node["samples"] += n
+        node["self"] += n
+
+    def render(code, node):
+        return {
+            "name":     _label(code),
+            "samples":  node["samples"],
+            "total_ms": round(node["samples"] * interval_ms, 1),
+            "self_ms":  round(node["self"] * interval_ms, 1),
+            "children": [render(c, child) for c, child in
+                         sorted(node["children"].items(), key=lambda kv: -kv[1]["samples"])],
+        }
+
+    tops = [render(code, node) for code, node in
+            sorted(root["children"].items(), key=lambda kv: -kv[1]["samples"])]
+    # Every sample starts at the profiled function, so there is normally a single top node
+    return tops[0] if len(tops) == 1 else {"name": "(all)", "samples": root["samples"],
+                                           "total_ms": round(root["samples"] * interval_ms, 1),
+                                           "self_ms": 0.0, "children": tops}
+
+
+def _folded(stacks):
+    lines = Counter()
+    for stack, n in stacks.items():
+        lines[";".join(_label(code).replace(";", ",") for code in stack)] += n
+    return "\n".join(f"{line} {n}" for line, n in lines.most_common())
+
+
+def _top(stacks, interval_ms, limit=20):
+    self_samples = Counter()
+    for stack, n in stacks.items():
+        self_samples[stack[-1]] += n
+    return [{"name": _label(code), "samples": n, "self_ms": round(n * interval_ms, 1)}
+            for code, n in self_samples.most_common(limit)]
+
+
+def profile(fn, *args, interval_ms=None, **kwargs):
+    """
+    Call fn(*args, **kwargs) under the sampling profiler.  Returns
+    (result, report); exceptions from *fn* propagate.  Raises
+    ProfilerBusy if another profile is already running.
+    """
+    interval_ms = interval_ms or INTERVAL_MS
+    if not _active.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        thread_id  = threading.get_ident()
+        root_code  = _code_of(fn)
+        call_frame = []
+        stacks     = Counter()
+        stop       = threading.Event()
+
+        def call():
+            # Samples are cut at this frame, so profile()'s own work (starting
+            # and joining the sampler) never shows up in the tree
+            call_frame.append(sys._getframe())
+            return fn(*args, **kwargs)
+
+        def sampler():
+            while not stop.wait(interval_ms / 1000):
+                if not call_frame:
+                    continue
+                stack = _sample(thread_id, call_frame[0], root_code)
+                if stack:
+                    stacks[stack] += 1
+
+        # A CPU-bound target only yields the GIL every switch interval; shorten
+        # it (process-wide, see the module docstring) so samples arrive close
+        # to the requested rate
+        switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch, max(MIN_SWITCH_INTERVAL_MS, interval_ms / 2) / 1000))
+        thread = threading.Thread(target=sampler, name="profiler", daemon=True)
+        t0 = time.perf_counter()
+        thread.start()
+        try:
+            result = call()
+        finally:
+            stop.set()
+            thread.join()
+            wall_ms = (time.perf_counter() - t0) * 1000
+            sys.setswitchinterval(switch)
+
+        samples = sum(stacks.values())
+        report = {
+            "function":    getattr(fn, "__qualname__", repr(fn)),
+            "wall_ms":     round(wall_ms, 1),
+            "interval_ms": interval_ms,
+            "samples":     samples,
+            # Per-sample weight from the measured rate, so totals add up to wall time
+            "sample_ms":   round(wall_ms / samples, 3) if samples else interval_ms,
+            "tree":        None,
+            "top":         [],
+            "folded":      "",
+        }
+        if samples:
+            weight = wall_ms / samples
+            report["tree"]   = _tree(stacks, weight)
+            report["top"]    = _top(stacks, weight)
+            report["folded"] = _folded(stacks)
+        return result, report
+    finally:
+        _active.release()
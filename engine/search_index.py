@@ -0,0 +1,254 @@
+"""
+In-memory name index for typeahead search and name resolution.
+
+Built once per roster load.  Names are normalized (diacritics, case and
+punctuation folded) and indexed three ways:
+
+  - sorted full names      -> "starts with" matches via bisect
+  - sorted name tokens     -> "a word starts with" matches via bisect
+  - 2-/3-gram postings     -> "contains" matches by posting intersection
+
+so a query never scans the roster.  Results are ranked by
+(match tier, normalized name): full-name prefix, then word prefix, then
+substring.
+
+fuzzy_search() handles typos ("antetokoumpo") from padded-trigram postings:
+candidates are scored by shared trigrams, then re-ranked by a bounded edit
+distance, all under a hard per-query time budget.
+"""
+
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize_name(name):
+    """Fold diacritics, case and punctuation: 'Nikola Jokić' -> 'nikola jokic'."""
+    folded = unicodedata.normalize("NFKD", str(name or ""))
+    folded = "".join(c for c in folded if not unicodedata.combining(c)).lower()
+    folded = re.sub(r"[.'’`]", "", folded)
+    folded = re.sub(r"[^a-z0-9]+", " ", folded)
+    return folded.strip()
+
+
+def name_keys(name):
+    """Normalized lookup keys for a player name (with and without Jr./III suffix)."""
+    norm = normalize_name(name)
+    keys = [norm]
+    parts = norm.split()
+    if len(parts) > 2 and parts[-1] in _SUFFIXES:
+        keys.append(" ".join(parts[:-1]))
+    return keys
+
+
+def _ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _padded_trigrams(text):
+    return _ngrams(f"  {text} ", 3)
+
+
+def bounded_levenshtein(a, b, max_dist):
+    """Edit distance between a and b, or max_dist + 1 once it must exceed max_dist."""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    if len(a) > len(b):
+        a, b = b, a
+    prev = list(range(len(a) + 1))
+    for j, cb in enumerate(b, 1):
+        cur = [j] + [0] * len(a)
+        for i, ca in enumerate(a, 1):
+            cur[i] = min(prev[i] + 1, cur[i - 1] + 1, prev[i - 1] + (ca != cb))
+        if min(cur) > max_dist:
+            return max_dist + 1
+        prev = cur
+    return prev[-1] if prev[-1] <= max_dist else max_dist + 1
+
+
+def _max_edits(q):
+    return max(1, min(3, len(q) // 4))
+
+
+def _word_distance(q_tokens, name_tokens, max_dist):
+    """Sum over query words of the distance to the closest name word (or its prefix)."""
+    total = 0
+    for qt in q_tokens:
+        best = max_dist + 1
+        for nt in name_tokens:
+            best = min(best,
+                       bounded_levenshtein(qt, nt, max_dist),
+                       bounded_levenshtein(qt, nt[:len(qt)], max_dist))
+            if best == 0:
+                break
+        total += best
+        if total > max_dist:
+            return max_dist + 1
+    return total
+
+
+def _prefix_range(sorted_keys, prefix):
+    lo = bisect_left(sorted_keys, prefix)
+    hi = bisect_left(sorted_keys, prefix + _MAX_CHAR, lo)
+    return lo, hi
+
+
+class NameIndex:
+    """Immutable search index over a list of player dicts (keyed by "name")."""
+
+    __slots__ = ("players", "norms", "exact", "last_names",
+                 "_names", "_name_ids", "_tokens", "_token_ids", "_grams",
+                 "_fuzzy_grams", "_common_df")
+
+    # Fuzzy candidates kept for edit-distance re-ranking
+    FUZZY_CANDIDATES = 40
+
+    def __init__(self, players):
+        self.players = list(players)
+        self.norms   = [normalize_name(p.get("name", "")) for p in self.players]
+
+        self.exact = {}
+        self.last_names = {}
+        for i, p in enumerate(self.players):
+            for key in name_keys(p.get("name", "")):
+                self.exact.setdefault(key, p)
+                parts = key.split()
+                if parts:
+                    self.last_names.setdefault(parts[-1], set()).add(i)
+
+        names = sorted((norm, i) for i, norm in enumerate(self.norms))
+        self._names    = [n for n, _ in names]
+        self._name_ids = [i for _, i in names]
+
+        tokens = sorted({(tok, i) for i, norm in enumerate(self.norms) for tok in norm.split()})
+        self._tokens    = [t for t, _ in tokens]
+        self._token_ids = [i for _, i in tokens]
+
+        grams = {}
+        for i, norm in enumerate(self.norms):
+            for n in (2, 3):
+                for g in _ngrams(norm, n):
+                    grams.setdefault(g, []).append(i)
+        self._grams = {g: tuple(ids) for g, ids in grams.items()}
+
+        # Padded trigrams of the full name and of each token, for fuzzy matching
+        fuzzy = {}
+        for i, norm in enumerate(self.norms):
+            grams_i = _padded_trigrams(norm)
+            for tok in norm.split():
+                grams_i |= _padded_trigrams(tok)
+            for g in grams_i:
+                fuzzy.setdefault(g, []).append(i)
+        self._fuzzy_grams = {g: tuple(ids) for g, ids in fuzzy.items()}
+        # Trigrams shared by more than this many names carry little signal
+        # and dominate scoring cost, so fuzzy_search skips them.
+        self._common_df = max(50, len(self.players) // 10)
+
+    def __len__(self):
+        return len(self.players)
+
+    def lookup(self, name):
+        """Exact normalized-name lookup (suffix-insensitive)."""
+        return self.exact.get(normalize_name(name))
+
+    def by_last_name(self, last):
+        return [self.players[i] for i in sorted(self.last_names.get(normalize_name(last), ()))]
+
+    def _substring_ids(self, q):
+        if len(q) < 2:
+            return range(len(self.players))
+        n = 3 if len(q) >= 3 else 2
+        postings = sorted((self._grams.get(g, ()) for g in _ngrams(q, n)), key=len)
+        if not postings or not postings[0]:
+            return ()
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query, limit=10):
+        """Return up to *limit* player dicts ranked by match quality."""
+        q = normalize_name(query)
+        if not q or limit <= 0:
+            return []
+
+        # Tier 0: full name starts with the query (already in name order)
+        lo, hi = _prefix_range(self._names, q)
+        ranked = [(0, self._names[j], self._name_ids[j]) for j in range(lo, min(hi, lo + limit))]
+        seen = {i for _, _, i in ranked}
+        if len(ranked) >= limit:
+            return [self.players[i] for _, _, i in ranked]
+
+        # Tier 1: any word starts with the query
+        tier1 = []
+        lo, hi = _prefix_range(self._tokens, q)
+        for j in range(lo, hi):
+            i = self._token_ids[j]
+            if i not in seen:
+                seen.add(i)
+                tier1.append((1, self.norms[i], i))
+
+        # Tier 2: query appears anywhere in the name
+        tier2 = []
+        for i in self._substring_ids(q):
+            if i not in seen and q in self.norms[i]:
+                tier2.append((2, self.norms[i], i))
+
+        ranked.extend(heapq.nsmallest(limit - len(ranked), tier1 + tier2))
+        return [self.players[i] for _, _, i in ranked]
+
+    def fuzzy_search(self, query, limit=10, budget_ms=5.0, exclude=()):
+        """
+        Typo-tolerant search.  Returns up to *limit* player dicts whose name
+        (or its prefix while typing, or its words) is within a small edit
+        distance of the query.  Players in *exclude* (e.g. exact matches
+        already shown) are skipped.  Work stops once *budget_ms* elapses and
+        the best matches found so far are returned.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        q = normalize_name(query)
+        if len(q) < 3 or limit <= 0:
+            return []
+
+        grams = sorted(
+            (self._fuzzy_grams.get(g, ()) for g in _padded_trigrams(q)),
+            key=len,
+        )
+        scores = {}
+        for ids in grams:
+            if not ids or len(ids) > self._common_df:
+                continue
+            for i in ids:
+                scores[i] = scores.get(i, 0) + 1
+            if time.perf_counter() > deadline:
+                break
+        excluded = {id(p) for p in exclude}
+        candidates = heapq.nlargest(
+            self.FUZZY_CANDIDATES,
+            ((n, i) for i, n in scores.items() if id(self.players[i]) not in excluded),
+        )
+
+        max_dist = _max_edits(q)
+        q_tokens = q.split()
+        ranked = []
+        for n, i in candidates:
+            if time.perf_counter() > deadline:
+                break
+            norm = self.norms[i]
+            dist = min(
+                bounded_levenshtein(q, norm, max_dist),
+                bounded_levenshtein(q, norm[:len(q)], max_dist),
+            )
+            if dist > 0:
+                dist = min(dist, _word_distance(q_tokens, norm.split(), max_dist))
+            if dist <= max_dist:
+                ranked.append((dist, -n, norm, i))
+
+        return [self.players[i] for _, _, _, i in heapq.nsmallest(limit, ranked)]
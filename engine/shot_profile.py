@@ -0,0 +1,340 @@
+"""
+Compact per-player shot profile built from shotdetail data.
+
+A ShotProfile holds fixed-size counters (zone fga/fgm, distance ranges,
+3PT areas, action types) in flat arrays instead of nested string-keyed
+dicts, so a whole league of profiles is cheap to keep in memory, pickle
+across processes and persist with to_bytes()/from_bytes().
+
+The dict views (shot_zones(), shooting_splits(), zone_area_*(),
+action_counts()) return the same shapes load_player_shotdetail used to
+produce, so zone_distributor and the calculator keep working unchanged.
+"""
+
+import struct
+import sys
+from array import array
+
+# ── Fixed vocabularies (append-only: indices are part of the binary format) ─
+
+ZONE_BASICS = (
+    "Restricted Area",
+    "In The Paint (Non-RA)",
+    "Mid-Range",
+    "Left Corner 3",
+    "Right Corner 3",
+    "Above the Break 3",
+    "Backcourt",
+)
+
+ZONE_AREAS = (
+    "Left Side(L)",
+    "Left Side Center(LC)",
+    "Center(C)",
+    "Right Side Center(RC)",
+    "Right Side(R)",
+    "Back Court(BC)",
+)
+
+ZONE_RANGES = (
+    "Less Than 8 ft.",
+    "8-16 ft.",
+    "16-24 ft.",
+    "24+ ft.",
+    "Back Court Shot",
+)
+
+# NBA ACTION_TYPE values seen in shotdetail data.  Anything not listed here
+# is kept in a small overflow dict so no counts are ever lost.
+ACTION_TYPES = (
+    "Jump Shot",
+    "Pullup Jump shot",
+    "Step Back Jump shot",
+    "Running Jump Shot",
+    "Running Pull-Up Jump Shot",
+    "Fadeaway Jump Shot",
+    "Turnaround Jump Shot",
+    "Turnaround Fadeaway shot",
+    "Floating Jump shot",
+    "Driving Floating Jump Shot",
+    "Driving Floating Bank Jump Shot",
+    "Jump Bank Shot",
+    "Pullup Bank shot",
+    "Step Back Bank Jump Shot",
+    "Running Bank shot",
+    "Driving Bank shot",
+    "Fadeaway Bank shot",
+    "Turnaround Bank shot",
+    "Turnaround Fadeaway Bank Jump Shot",
+    "Layup Shot",
+    "Driving Layup Shot",
+    "Running Layup Shot",
+    "Cutting Layup Shot",
+    "Reverse Layup Shot",
+    "Driving Reverse Layup Shot",
+    "Running Reverse Layup Shot",
+    "Finger Roll Layup Shot",
+    "Driving Finger Roll Layup Shot",
+    "Running Finger Roll Layup Shot",
+    "Cutting Finger Roll Layup Shot",
+    "Tip Layup Shot",
+    "Tip Shot",
+    "Putback Layup Shot",
+    "Alley Oop Layup shot",
+    "Running Alley Oop Layup Shot",
+    "Dunk Shot",
+    "Slam Dunk Shot",
+    "Driving Dunk Shot",
+    "Driving Slam Dunk Shot",
+    "Running Dunk Shot",
+    "Running Slam Dunk Shot",
+    "Cutting Dunk Shot",
+    "Reverse Dunk Shot",
+    "Reverse Slam Dunk Shot",
+    "Driving Reverse Dunk Shot",
+    "Running Reverse Dunk Shot",
+    "Alley Oop Dunk Shot",
+    "Running Alley Oop Dunk Shot",
+    "Putback Dunk Shot",
+    "Putback Slam Dunk Shot",
+    "Follow Up Dunk Shot",
+    "Tip Dunk Shot",
+    "Hook Shot",
+    "Jump Hook Shot",
+    "Running Hook Shot",
+    "Driving Hook Shot",
+    "Turnaround Hook Shot",
+    "Hook Bank Shot",
+    "Driving Bank Hook Shot",
+    "Turnaround Bank Hook Shot",
+    "No Shot",
+)
+
+_AREA_LABELS = ZONE_AREAS[:5]  # L/LC/C/RC/R used for zone_area_* distributions
+
+_BASIC_INDEX  = {name: i for i, name in enumerate(ZONE_BASICS)}
+_AREA_INDEX   = {name: i for i, name in enumerate(ZONE_AREAS)}
+_RANGE_INDEX  = {name: i for i, name in enumerate(ZONE_RANGES)}
+_ACTION_INDEX = {name: i for i, name in enumerate(ACTION_TYPES)}
+
+_N_ZONES = len(ZONE_BASICS) * len(ZONE_AREAS)
+
+_MAGIC   = b"SP"
+_VERSION = 1
+# magic, version, player_id, season_year, total_fga, total_fgm, games_played,
+# stepback_2pt, stepback_3pt, n_actions, n_extra
+_HEADER = struct.Struct("<2sBIHIIIIIHH")
+_EXTRA  = struct.Struct("<HI")
+
+
+def _counter(n):
+    return array("I", bytes(4 * n))
+
+
+def _zone_index(basic, area):
+    b = _BASIC_INDEX.get(basic)
+    a = _AREA_INDEX.get(area)
+    if b is None or a is None:
+        return None
+    return b * len(ZONE_AREAS) + a
+
+
+class ShotProfile:
+    """Fixed-size shot counters for one player-season."""
+
+    __slots__ = (
+        "player_id", "season_year",
+        "total_fga", "total_fgm", "games_played",
+        "stepback_2pt", "stepback_3pt",
+        "zone_fga", "zone_fgm", "range_fga", "three_area_fga",
+        "action_fga", "extra_actions",
+    )
+
+    def __init__(self, player_id=0, season_year=0):
+        self.player_id      = int(player_id)
+        self.season_year    = int(season_year)
+        self.total_fga      = 0
+        self.total_fgm      = 0
+        self.games_played   = 0
+        self.stepback_2pt   = 0
+        self.stepback_3pt   = 0
+        self.zone_fga       = _counter(_N_ZONES)
+        self.zone_fgm       = _counter(_N_ZONES)
+        self.range_fga      = _counter(len(ZONE_RANGES))
+        self.three_area_fga = _counter(len(ZONE_AREAS))
+        self.action_fga     = _counter(len(ACTION_TYPES))
+        self.extra_actions  = {}
+
+    # ── Counting ──────────────────────────────────────────────────
+
+    def add_zone(self, basic, area, fga, fgm):
+        idx = _zone_index(basic, area)
+        if idx is not None:
+            self.zone_fga[idx] += int(fga)
+            self.zone_fgm[idx] += int(fgm)
+
+    def add_range(self, zone_range, fga):
+        idx = _RANGE_INDEX.get(zone_range)
+        if idx is not None:
+            self.range_fga[idx] += int(fga)
+
+    def add_three_area(self, area, fga):
+        idx = _AREA_INDEX.get(area)
+        if idx is not None:
+            self.three_area_fga[idx] += int(fga)
+
+    def add_action(self, action, count):
+        idx = _ACTION_INDEX.get(action)
+        if idx is not None:
+            self.action_fga[idx] += int(count)
+        else:
+            action = str(action)
+            self.extra_actions[action] = self.extra_actions.get(action, 0) + int(count)
+
+    # ── Dict views (legacy shapes) ────────────────────────────────
+
+    def _basic_fga(self, basic):
+        start = _BASIC_INDEX[basic] * len(ZONE_AREAS)
+        return sum(self.zone_fga[start:start + len(ZONE_AREAS)])
+
+    def _area_dist(self, basics):
+        counts = [0] * len(ZONE_AREAS)
+        for basic in basics:
+            start = _BASIC_INDEX[basic] * len(ZONE_AREAS)
+            for a in range(len(ZONE_AREAS)):
+                counts[a] += self.zone_fga[start + a]
+        return counts
+
+    @staticmethod
+    def _as_freqs(counts):
+        total = sum(counts)
+        if total <= 0:
+            return {}
+        return {name: counts[i] / total for i, name in enumerate(_AREA_LABELS)}
+
+    def shooting_splits(self):
+        total = self.total_fga
+        if total <= 0:
+            return {}
+        three = (self._basic_fga("Above the Break 3")
+                 + self._basic_fga("Left Corner 3")
+                 + self._basic_fga("Right Corner 3"))
+        return {
+            "pct_fga_0_3":    self.range_fga[_RANGE_INDEX["Less Than 8 ft."]] / total,   # < 8 ft (restricted area)
+            "pct_fga_3_10":   self._basic_fga("In The Paint (Non-RA)") / total,          # In The Paint (Non-RA)
+            "pct_fga_10_16":  self.range_fga[_RANGE_INDEX["8-16 ft."]] / total,          # 8-16 ft mid-range
+            "pct_fga_16_3pt": self.range_fga[_RANGE_INDEX["16-24 ft."]] / total,         # 16-24 ft mid-range
+            "pct_fga_3pt":    three / total,
+        }
+
+    def shot_zones(self):
+        zones = {}
+        n_areas = len(ZONE_AREAS)
+        for idx in range(_N_ZONES):
+            fga = self.zone_fga[idx]
+            if not fga:
+                continue
+            fgm = self.zone_fgm[idx]
+            key = f"{ZONE_BASICS[idx // n_areas]}|{ZONE_AREAS[idx % n_areas]}"
+            zones[key] = {"fga": fga, "fgm": fgm, "fg_pct": fgm / fga}
+        return zones
+
+    def zone_area_close(self):
+        return self._as_freqs(self._area_dist(("Restricted Area", "In The Paint (Non-RA)")))
+
+    def zone_area_mid(self):
+        return self._as_freqs(self._area_dist(("Mid-Range",)))
+
+    def zone_area_three(self):
+        return self._as_freqs(self.three_area_fga)
+
+    def action_counts(self):
+        counts = {ACTION_TYPES[i]: c for i, c in enumerate(self.action_fga) if c}
+        for action, c in self.extra_actions.items():
+            counts[action] = counts.get(action, 0) + c
+        return counts
+
+    def to_dict(self):
+        """Expanded dict form, matching the old load_player_shotdetail() result."""
+        return {
+            "total_fga":          self.total_fga,
+            "total_fgm":          self.total_fgm,
+            "games_played":       self.games_played,
+            "shooting_splits":    self.shooting_splits(),
+            "shot_zones":         self.shot_zones(),
+            "action_counts":      self.action_counts(),
+            "zone_area_mid":      self.zone_area_mid(),
+            "zone_area_three":    self.zone_area_three(),
+            "zone_area_close":    self.zone_area_close(),
+            "stepback_2pt_count": self.stepback_2pt,
+            "stepback_3pt_count": self.stepback_3pt,
+        }
+
+    # ── Binary serialization ──────────────────────────────────────
+
+    def to_bytes(self):
+        extras = [(a.encode("utf-8"), c) for a, c in self.extra_actions.items()]
+        parts = [_HEADER.pack(
+            _MAGIC, _VERSION, self.player_id, self.season_year,
+            self.total_fga, self.total_fgm, self.games_played,
+            self.stepback_2pt, self.stepback_3pt,
+            len(self.action_fga), len(extras),
+        )]
+        for arr in (self.zone_fga, self.zone_fgm, self.range_fga,
+                    self.three_area_fga, self.action_fga):
+            if sys.byteorder == "big":
+                arr = array("I", arr)
+                arr.byteswap()
+            parts.append(arr.tobytes())
+        for raw, c in extras:
+            parts.append(_EXTRA.pack(len(raw), c))
+            parts.append(raw)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = memoryview(data)
+        (magic, version, player_id, season_year, total_fga, total_fgm,
+         games_played, sb2, sb3, n_actions, n_extra) = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a ShotProfile blob")
+        if n_actions > len(ACTION_TYPES):
+            raise ValueError("ShotProfile blob uses a newer action vocabulary")
+        p = cls(player_id, season_year)
+        p.total_fga, p.total_fgm, p.games_played = total_fga, total_fgm, games_played
+        p.stepback_2pt, p.stepback_3pt = sb2, sb3
+
+        offset = _HEADER.size
+        for name, n in (("zone_fga", _N_ZONES), ("zone_fgm", _N_ZONES),
+                        ("range_fga", len(ZONE_RANGES)),
+                        ("three_area_fga", len(ZONE_AREAS)),
+                        ("action_fga", n_actions)):
+            arr = array("I")
+            arr.frombytes(data[offset:offset + 4 * n])
+            if sys.byteorder == "big":
+                arr.byteswap()
+            offset += 4 * n
+            if name == "action_fga" and n < len(ACTION_TYPES):
+                # Blob written with an older (shorter) vocabulary
+                arr.extend([0] * (len(ACTION_TYPES) - n))
+            setattr(p, name, arr)
+
+        for _ in range(n_extra):
+            length, c = _EXTRA.unpack_from(data, offset)
+            offset += _EXTRA.size
+            action = bytes(data[offset:offset + length]).decode("utf-8")
+            offset += length
+            p.add_action(action, c)
+        return p
+
+    def __reduce__(self):
+        return (self.__class__.from_bytes, (self.to_bytes(),))
+
+    def __eq__(self, other):
+        if not isinstance(other, ShotProfile):
+            return NotImplemented
+        return self.to_bytes() == other.to_bytes()
+
+    def __repr__(self):
+        return (f"ShotProfile(player_id={self.player_id}, season_year={self.season_year}, "
+                f"fga={self.total_fga}, fgm={self.total_fgm}, games={self.games_played})")
@@ -7,11 +7,15 @@ The dataset is downloaded as a .tar.xz archive and cached locally in data/.
 """
 
 import os
+import struct
 import tarfile
-import pandas as pd
+import threading
 from io import BytesIO
 from urllib.request import urlopen, Request
 
+from engine import metrics, tracing
+from engine.shot_profile import ShotProfile
+
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 
 # Rough average FGA per game for a starter; used to estimate games_played when GAME_ID is missing
@@ -33,6 +37,8 @@ def _get_shotdetail_path(season_year=2024):
     return os.path.join(DATA_DIR, f"shotdetail_{season_year}.csv")
 
 
+@tracing.traced("shotdetail.download")
+@metrics.SHOTDETAIL_LOAD_SECONDS.timed(operation="download")
 def _download_shotdetail(season_year=2024):
     """
     Download shotdetail CSV from shufinskiy/nba_data if not cached.
@@ -95,23 +101,157 @@ def _download_shotdetail(season_year=2024):
     return None
 
 
+def shotdetail_csv_path(season_year=2024):
+    """Path to the season's shotdetail CSV, downloading it first if needed (None if unavailable)."""
+    return _download_shotdetail(season_year)
+
+
+# ── Season store ───────────────────────────────────────────────────────────────
+# One pass over a season's CSV produces every player's ShotProfile.  The set
+# is kept in memory and persisted to data/shotdetail_{year}.profiles (an id
+# index followed by ShotProfile.to_bytes() blobs), so after a restart the
+# whole season loads in milliseconds instead of rescanning the CSV per player.
+
+_STORE_MAGIC   = b"SPS1"
+_STORE_HEADER  = struct.Struct("<4sHI")   # magic, season_year, player count
+_STORE_ENTRY   = struct.Struct("<III")    # player_id, blob offset, blob length
+_STORE_COLUMNS = {"PLAYER_ID", "GAME_ID", "EVENT_TYPE", "SHOT_ZONE_RANGE",
+                  "SHOT_ZONE_BASIC", "SHOT_ZONE_AREA", "SHOT_TYPE", "ACTION_TYPE"}
+
+_stores     = {}   # season_year -> {player_id: ShotProfile}
+_store_lock = threading.Lock()   # guards _stores only; never held while reading or building
+_build_lock = threading.Lock()   # one CSV download / store build at a time
+
+
+def _store_path(season_year):
+    return os.path.join(DATA_DIR, f"shotdetail_{season_year}.profiles")
+
+
+def _write_store(season_year, profiles):
+    blobs = [(pid, profile.to_bytes()) for pid, profile in sorted(profiles.items())]
+    offset = _STORE_HEADER.size + _STORE_ENTRY.size * len(blobs)
+    index = []
+    for pid, blob in blobs:
+        index.append(_STORE_ENTRY.pack(pid, offset, len(blob)))
+        offset += len(blob)
+
+    path = _store_path(season_year)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_STORE_HEADER.pack(_STORE_MAGIC, season_year, len(blobs)))
+        f.write(b"".join(index))
+        f.write(b"".join(blob for _, blob in blobs))
+    os.replace(tmp, path)
+
+
+def _read_store(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, _, count = _STORE_HEADER.unpack_from(data, 0)
+    if magic != _STORE_MAGIC:
+        raise ValueError(f"not a shot profile store: {path}")
+    profiles = {}
+    for i in range(count):
+        pid, offset, length = _STORE_ENTRY.unpack_from(data, _STORE_HEADER.size + i * _STORE_ENTRY.size)
+        profiles[pid] = ShotProfile.from_bytes(data[offset:offset + length])
+    return profiles
+
+
+@tracing.traced("shotdetail.build_store")
+@metrics.SHOTDETAIL_LOAD_SECONDS.timed(operation="build_store")
+def build_season_store(season_year=2024):
+    """Aggregate every player in the season CSV in one pass and persist the result."""
+    import pandas as pd
+
+    csv_path = _download_shotdetail(season_year)
+    if not csv_path or not os.path.exists(csv_path):
+        return None
+
+    df = pd.read_csv(csv_path, usecols=lambda c: c in _STORE_COLUMNS)
+    profiles = {
+        int(pid): _profile_from_frame(int(pid), season_year, player_df)
+        for pid, player_df in df.groupby("PLAYER_ID")
+    }
+    _write_store(season_year, profiles)
+    print(f"[shotdetail] Built season store for {season_year}: {len(profiles)} players")
+    return profiles
+
+
+@tracing.traced("shotdetail.load_store")
+@metrics.SHOTDETAIL_LOAD_SECONDS.timed(operation="load_store")
+def load_season_store(season_year=2024, build=True):
+    """
+    {player_id: ShotProfile} for the whole season, from memory, then the
+    persisted store (if not older than the CSV), then -- when *build* --
+    a fresh pass over the CSV.  Returns None when no store is available.
+
+    Reading and building happen outside _store_lock, so per-player loads
+    are never blocked behind a download or a build; the finished store is
+    swapped in under the lock.
+    """
+    with _store_lock:
+        profiles = _stores.get(season_year)
+    metrics.cache_result("shotdetail", profiles is not None)
+    if profiles is not None:
+        return profiles
+
+    profiles = _read_persisted_store(season_year)
+    if profiles is None and build:
+        with _build_lock:
+            # Another caller may have finished a build while we waited
+            with _store_lock:
+                profiles = _stores.get(season_year)
+            if profiles is None:
+                profiles = _read_persisted_store(season_year) or build_season_store(season_year)
+    if profiles is None:
+        return None
+    with _store_lock:
+        return _stores.setdefault(season_year, profiles)
+
+
+def _read_persisted_store(season_year):
+    """The persisted store for *season_year* if it is current with the CSV, else None."""
+    path = _store_path(season_year)
+    csv_path = _get_shotdetail_path(season_year)
+    if not os.path.exists(path) or (
+        os.path.exists(csv_path) and os.path.getmtime(path) < os.path.getmtime(csv_path)
+    ):
+        return None
+    try:
+        return _read_store(path)
+    except Exception as e:
+        print(f"[shotdetail] WARNING: could not read {path}: {e}")
+        return None
+
+
+@tracing.traced("shotdetail.load_player")
+@metrics.SHOTDETAIL_LOAD_SECONDS.timed(operation="load_player")
 def load_player_shotdetail(player_id, season_year=2024):
     """
     Load all shot attempts for a specific player from the shotdetail CSV.
-    Returns a dict with:
-      - total_fga, total_fgm
-      - shooting_splits (pct_fga by distance zone)
-      - shot_zones (by SHOT_ZONE_BASIC + SHOT_ZONE_AREA for zone_distributor)
-      - action_counts (ACTION_TYPE -> count)
-      - zone_area_mid, zone_area_three, zone_area_close (L/LC/C/RC/R percentages)
+    Returns a ShotProfile (see engine/shot_profile.py) with:
+      - total_fga, total_fgm, games_played
+      - shooting_splits() (pct_fga by distance zone)
+      - shot_zones() (by SHOT_ZONE_BASIC + SHOT_ZONE_AREA for zone_distributor)
+      - action_counts() (ACTION_TYPE -> count)
+      - zone_area_mid(), zone_area_three(), zone_area_close() (L/LC/C/RC/R percentages)
     Returns None if data cannot be loaded.
+
+    Served from the season store when one is loaded or persisted; otherwise
+    the CSV is scanned for this player.
     """
+    store = load_season_store(season_year, build=False)
+    if store is not None:
+        return store.get(int(player_id))
+
     csv_path = _download_shotdetail(season_year)
     if not csv_path or not os.path.exists(csv_path):
         return None
 
     print(f"[shotdetail] Loading data for player_id={player_id}")
 
+    import pandas as pd
+
     # Read CSV in chunks — filter by PLAYER_ID early to handle large files
     try:
         chunks = []
@@ -128,116 +268,94 @@ def load_player_shotdetail(player_id, season_year=2024):
         return None
 
     df = pd.concat(chunks, ignore_index=True)
+    print(f"[shotdetail] Found {len(df)} shots for player_id={player_id}")
+
+    return _profile_from_frame(player_id, season_year, df)
+
+
+@tracing.traced("shotdetail.load_players")
+@metrics.SHOTDETAIL_LOAD_SECONDS.timed(operation="load_players")
+def load_players_shotdetail(player_ids, season_year=2024):
+    """
+    Batch form of load_player_shotdetail(): one pass over the season CSV for
+    several players.  Returns {player_id: ShotProfile or None}.
+    """
+    import pandas as pd
+
+    wanted = {int(pid) for pid in player_ids}
+    store = load_season_store(season_year, build=False)
+    if store is not None:
+        return {pid: store.get(pid) for pid in wanted}
+
+    profiles = {pid: None for pid in wanted}
+    csv_path = _download_shotdetail(season_year)
+    if not wanted or not csv_path or not os.path.exists(csv_path):
+        return profiles
+
+    try:
+        chunks = []
+        for chunk in pd.read_csv(csv_path, chunksize=50000):
+            player_chunk = chunk[chunk["PLAYER_ID"].isin(wanted)]
+            if not player_chunk.empty:
+                chunks.append(player_chunk)
+    except Exception as e:
+        print(f"[shotdetail] ERROR: Could not read CSV: {e}")
+        return profiles
+
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+        for pid, player_df in df.groupby("PLAYER_ID"):
+            profiles[int(pid)] = _profile_from_frame(int(pid), season_year, player_df)
+    print(f"[shotdetail] Loaded {sum(1 for p in profiles.values() if p)}/{len(wanted)} players in one pass")
+    return profiles
+
+
+def _profile_from_frame(player_id, season_year, df):
+    """Aggregate one player's shotdetail rows into a ShotProfile."""
     total_shots = len(df)
-    print(f"[shotdetail] Found {total_shots} shots for player_id={player_id}")
-
-    result = {
-        "total_fga": total_shots,
-        "total_fgm": int(df["EVENT_TYPE"].eq("Made Shot").sum()),
-        "shooting_splits": {},
-        "shot_zones": {},
-        "action_counts": {},
-        "zone_area_mid": {},
-        "zone_area_three": {},
-        "zone_area_close": {},
-    }
+    made = df["EVENT_TYPE"].eq("Made Shot")
+
+    profile = ShotProfile(player_id, season_year)
+    profile.total_fga = total_shots
+    profile.total_fgm = int(made.sum())
 
     # Count unique games — GAME_ID column tells us exactly how many games the player played
     if "GAME_ID" in df.columns:
-        result["games_played"] = int(df["GAME_ID"].nunique())
+        profile.games_played = int(df["GAME_ID"].nunique())
     else:
-        result["games_played"] = max(int(total_shots / _ESTIMATED_FGA_PER_GAME), _MIN_ESTIMATED_GAMES)
-
-    # --- Shooting splits by distance zone ---
-    range_counts = df["SHOT_ZONE_RANGE"].value_counts()
-    less8  = int(range_counts.get("Less Than 8 ft.", 0))
-    r8_16  = int(range_counts.get("8-16 ft.", 0))
-    r16_24 = int(range_counts.get("16-24 ft.", 0))
-    r24plus = int(range_counts.get("24+ ft.", 0))
-
-    zone_basic_counts = df["SHOT_ZONE_BASIC"].value_counts()
-    paint        = int(zone_basic_counts.get("In The Paint (Non-RA)", 0))
-    above3       = int(zone_basic_counts.get("Above the Break 3", 0))
-    left_corner3 = int(zone_basic_counts.get("Left Corner 3", 0))
-    right_corner3 = int(zone_basic_counts.get("Right Corner 3", 0))
-    three_shots  = above3 + left_corner3 + right_corner3
-
-    if total_shots > 0:
-        result["shooting_splits"] = {
-            "pct_fga_0_3":    less8  / total_shots,   # < 8 ft (restricted area)
-            "pct_fga_3_10":   paint  / total_shots,   # In The Paint (Non-RA)
-            "pct_fga_10_16":  r8_16  / total_shots,   # 8-16 ft mid-range
-            "pct_fga_16_3pt": r16_24 / total_shots,   # 16-24 ft mid-range
-            "pct_fga_3pt":    three_shots / total_shots,
-        }
-
-    # --- Shot zones for zone_distributor (SHOT_ZONE_BASIC|SHOT_ZONE_AREA) ---
-    zone_groups = df.groupby(["SHOT_ZONE_BASIC", "SHOT_ZONE_AREA"])
-    for (basic, area), group in zone_groups:
-        fga = len(group)
-        fgm = int(group["EVENT_TYPE"].eq("Made Shot").sum())
-        key = f"{basic}|{area}"
-        result["shot_zones"][key] = {
-            "fga": fga,
-            "fgm": fgm,
-            "fg_pct": fgm / fga if fga > 0 else 0,
-        }
+        profile.games_played = max(int(total_shots / _ESTIMATED_FGA_PER_GAME), _MIN_ESTIMATED_GAMES)
 
-    # --- Action type counts for move tendencies ---
-    result["action_counts"] = df["ACTION_TYPE"].value_counts().to_dict()
-
-    # --- Zone area distribution for L/LC/C/RC/R ---
-    area_names = [
-        "Left Side(L)", "Left Side Center(LC)", "Center(C)",
-        "Right Side Center(RC)", "Right Side(R)",
-    ]
-
-    mid_df = df[df["SHOT_ZONE_BASIC"] == "Mid-Range"]
-    if not mid_df.empty:
-        mid_area = mid_df["SHOT_ZONE_AREA"].value_counts()
-        mid_total = len(mid_df)
-        for area_name in area_names:
-            result["zone_area_mid"][area_name] = (
-                mid_area.get(area_name, 0) / mid_total if mid_total > 0 else 0
-            )
+    # --- Distance ranges (shooting splits are derived from these + zone counts) ---
+    for zone_range, cnt in df["SHOT_ZONE_RANGE"].value_counts().items():
+        profile.add_range(zone_range, cnt)
+
+    # --- Shot zones (SHOT_ZONE_BASIC x SHOT_ZONE_AREA) ---
+    zone_fga = df.groupby(["SHOT_ZONE_BASIC", "SHOT_ZONE_AREA"]).size()
+    zone_fgm = made.groupby([df["SHOT_ZONE_BASIC"], df["SHOT_ZONE_AREA"]]).sum()
+    for (basic, area), fga in zone_fga.items():
+        profile.add_zone(basic, area, fga, zone_fgm.get((basic, area), 0))
 
+    # --- 3PT area distribution uses SHOT_TYPE rather than the zone name ---
     three_df = df[df["SHOT_TYPE"] == "3PT Field Goal"]
-    if not three_df.empty:
-        three_area = three_df["SHOT_ZONE_AREA"].value_counts()
-        three_total = len(three_df)
-        for area_name in area_names:
-            result["zone_area_three"][area_name] = (
-                three_area.get(area_name, 0) / three_total if three_total > 0 else 0
-            )
-
-    close_df = df[df["SHOT_ZONE_BASIC"].isin(["Restricted Area", "In The Paint (Non-RA)"])]
-    if not close_df.empty:
-        close_area = close_df["SHOT_ZONE_AREA"].value_counts()
-        close_total = len(close_df)
-        for area_name in area_names:
-            result["zone_area_close"][area_name] = (
-                close_area.get(area_name, 0) / close_total if close_total > 0 else 0
-            )
+    for area, cnt in three_df["SHOT_ZONE_AREA"].value_counts().items():
+        profile.add_three_area(area, cnt)
+
+    # --- Action type counts for move tendencies ---
+    for action, cnt in df["ACTION_TYPE"].value_counts().items():
+        profile.add_action(action, cnt)
 
     # --- Step-back 2pt/3pt split using SHOT_TYPE column ---
     stepback_df = df[df["ACTION_TYPE"].str.contains("Step Back", case=False, na=False)]
     if not stepback_df.empty:
-        result["stepback_2pt_count"] = int(
-            len(stepback_df[stepback_df["SHOT_TYPE"] == "2PT Field Goal"])
-        )
-        result["stepback_3pt_count"] = int(
-            len(stepback_df[stepback_df["SHOT_TYPE"] == "3PT Field Goal"])
-        )
-    else:
-        result["stepback_2pt_count"] = 0
-        result["stepback_3pt_count"] = 0
+        profile.stepback_2pt = int((stepback_df["SHOT_TYPE"] == "2PT Field Goal").sum())
+        profile.stepback_3pt = int((stepback_df["SHOT_TYPE"] == "3PT Field Goal").sum())
 
-    return result
+    return profile
 
 
 def estimate_per_game_stats(shotdetail_data):
     """
-    Estimate per-game stats from shotdetail data dict (returned by load_player_shotdetail).
+    Estimate per-game stats from a ShotProfile (returned by load_player_shotdetail).
     Provides fallback values for tracking/BBRef stats when those endpoints fail.
 
     Returns a dict with:
@@ -252,17 +370,17 @@ def estimate_per_game_stats(shotdetail_data):
     if not shotdetail_data:
         return {}
 
-    total_fga = shotdetail_data.get("total_fga", 0)
-    total_fgm = shotdetail_data.get("total_fgm", 0)
-    games_played = shotdetail_data.get("games_played", 0)
-    action_counts = shotdetail_data.get("action_counts", {})
+    total_fga = shotdetail_data.total_fga
+    total_fgm = shotdetail_data.total_fgm
+    games_played = shotdetail_data.games_played
+    action_counts = shotdetail_data.action_counts()
 
     if total_fga == 0:
         return {}
 
     games = games_played if games_played > 0 else max(total_fga / _ESTIMATED_FGA_PER_GAME, _MIN_ESTIMATED_GAMES)
     fga_per_game = total_fga / games
-    splits = shotdetail_data.get("shooting_splits", {})
+    splits = shotdetail_data.shooting_splits()
     pct_3pt = splits.get("pct_fga_3pt", 0.25)
     fg3a_per_game = fga_per_game * pct_3pt
     fgm_per_game = total_fgm / games
@@ -305,12 +423,14 @@ def estimate_per_game_stats(shotdetail_data):
     }
 
 
-def extract_move_frequencies(action_counts, total_fga, games_played=None):
+def extract_move_frequencies(action_counts, total_fga, games_played=None, stepback_counts=None):
     """
     Convert ACTION_TYPE counts to per-game move frequency estimates.
     Maps NBA action types to 2K tendency move names.
 
     Uses games_played if provided; otherwise estimates from total_fga.
+    stepback_counts is an optional (2pt, 3pt) tuple of exact step-back counts
+    (ShotProfile.stepback_2pt / stepback_3pt).
     """
     games = games_played if games_played and games_played > 0 else max(total_fga / _ESTIMATED_FGA_PER_GAME, _MIN_ESTIMATED_GAMES)
 
@@ -332,10 +452,14 @@ def extract_move_frequencies(action_counts, total_fga, games_played=None):
                 total += cnt
         return total
 
-    # Step-back: use pre-computed 2pt/3pt counts when available (keyed with underscore prefix),
-    # otherwise fall back to keyword-based approximation.
-    sb_2pt_count = action_counts.get("_stepback_2pt", None)
-    sb_3pt_count = action_counts.get("_stepback_3pt", None)
+    # Step-back: use pre-computed 2pt/3pt counts when available (passed explicitly, or
+    # keyed with underscore prefix by older callers), otherwise fall back to
+    # keyword-based approximation.
+    if stepback_counts is not None:
+        sb_2pt_count, sb_3pt_count = stepback_counts
+    else:
+        sb_2pt_count = action_counts.get("_stepback_2pt", None)
+        sb_3pt_count = action_counts.get("_stepback_3pt", None)
     if sb_2pt_count is not None and sb_3pt_count is not None:
         stepback_mid = round(sb_2pt_count / games, 3)
         stepback_3   = round(sb_3pt_count / games, 3)
@@ -1,10 +1,17 @@
 """
 Main tendency calculation engine.
 """
+import hashlib
+import json
 import math
 
+from engine import tracing
 from engine.caps_enforcer import enforce_caps
-from engine.constants import HARD_CAPS, TENDENCY_ORDER
+from engine.constants import HARD_CAPS, RULES_VERSION, TENDENCY_ORDER
+
+# Bump whenever a change here (or in the zone / caps modules) changes the
+# output for the same inputs; stored results from other versions are recomputed.
+ENGINE_VERSION = "1"
 
 # ── Helpers ────────────────────────────────────────────────────────────────
 
@@ -76,6 +83,7 @@ _SHOT_FGA_THRESHOLD  = 12
 
 # ── Core calculator ────────────────────────────────────────────────────────
 
+@tracing.traced()
 def calculate_tendencies(player_data):
     pos      = str(player_data.get("position") or "SG").upper().strip()
     per_game = player_data.get("per_game")       or {}
@@ -494,58 +502,163 @@ def calculate_tendencies(player_data):
 
 # ── Orchestration function ────────────────────────────────────────────────
 
-def generate_tendencies_for_player(player_id, player_name, season="2024-25"):
+# Marks "shotdetail not supplied by the caller" (None means "no shotdetail data")
+_UNSET = object()
+
+
+def engine_version():
+    """Version of the calculation as a whole: engine code + caps/rules table."""
+    return f"{ENGINE_VERSION}+{RULES_VERSION}"
+
+
+def input_hash(inputs, shotdetail_data=None):
+    """
+    Digest of everything compute_player_tendencies() reads for one player:
+    the gathered NBA API inputs and the player's shotdetail aggregates.
+    Equal hashes (under the same engine_version()) give equal results.
+    """
+    # Fetch error messages are provenance only; the data they left behind is hashed
+    hashed = {k: v for k, v in inputs.items() if k != "errors"}
+    h = hashlib.sha256()
+    h.update(json.dumps(hashed, sort_keys=True, default=str).encode())
+    h.update(b"\0")
+    if shotdetail_data is not None:
+        h.update(shotdetail_data.to_bytes())
+    return h.hexdigest()
+
+
+def generate_tendencies_for_player(player_id, player_name, season="2024-25", provenance=False):
     """
     Orchestrates all data fetching and calculation.
     Always returns a valid result even if external APIs are down.
+    With *provenance*, the result also carries the data it was computed
+    from (see compute_player_tendencies).
     """
-    from engine import nba_stats, pbp_parser, zone_distributor
-    from engine import shotdetail_loader
+    return compute_player_tendencies(
+        gather_player_inputs(player_id, player_name, season), provenance=provenance,
+    )
 
-    tracking   = {}
-    shot_zones = {}
-    pbp_moves  = {}
-    per_game_data = {}
-    advanced_data = {}
-    shotdetail_data = None
-    player_info = {"name": player_name, "team": "", "position": "SG"}
 
-    # Fetch player info
-    try:
-        player_info = nba_stats.get_player_info(player_id)
-        if not player_info.get("name"):
-            player_info["name"] = player_name
-    except Exception:
-        pass
-
-    position = player_info.get("position") or "SG"
-    # Normalize position (sometimes comes as "Guard" or multi-position)
+def _normalize_position(position):
+    # Normalize position (sometimes comes as "Guard", "G-F" or multi-position)
     pos_map = {"Guard": "SG", "Forward": "SF", "Center": "C",
                "Point Guard": "PG", "Shooting Guard": "SG",
-               "Small Forward": "SF", "Power Forward": "PF"}
-    position = pos_map.get(position, position)
+               "Small Forward": "SF", "Power Forward": "PF",
+               "G": "SG", "F": "SF"}
+    position = pos_map.get(position or "SG", position or "SG")
     if "-" in position:
         position = position.split("-")[0].strip()
     if "/" in position:
         position = position.split("/")[0].strip()
+    return pos_map.get(position, position)
+
+
+@tracing.traced()
+def gather_player_inputs(player_id, player_name, season="2024-25"):
+    """
+    I/O stage: fetch everything the NBA Stats API provides for one player.
+    Returns a plain, picklable dict for compute_player_tendencies(), so the
+    two stages can run in different threads or processes.
+    """
+    from engine import nba_stats
+
+    inputs = {
+        "player_id":   player_id,
+        "player_name": player_name,
+        "season":      season,
+        "player_info": {"name": player_name, "team": "", "position": "SG"},
+        "tracking":    {},
+        "shot_zones":  {},
+        "per_game":    {},
+        "advanced":    {},
+        "errors":      {},    # source -> error message, for provenance
+    }
+
+    # Fetch player info
+    try:
+        player_info = nba_stats.get_player_info(player_id, season=season)
+        if not player_info.get("name"):
+            player_info["name"] = player_name
+        inputs["player_info"] = player_info
+    except Exception as e:
+        inputs["errors"]["player_info"] = str(e)
 
     # Fetch tracking stats
     try:
-        tracking = nba_stats.get_tracking_stats(player_id, season=season)
-    except Exception:
-        pass
+        inputs["tracking"] = nba_stats.get_tracking_stats(player_id, season=season)
+    except Exception as e:
+        inputs["errors"]["tracking"] = str(e)
 
     # Fetch shot zones
     try:
-        shot_zones = nba_stats.get_shot_zones(player_id, season=season)
-    except Exception:
-        pass
+        inputs["shot_zones"] = nba_stats.get_shot_zones(player_id, season=season)
+    except Exception as e:
+        inputs["errors"]["shot_zones"] = str(e)
 
     # Fetch per-game and advanced stats via nba_api
     try:
-        per_game_data, advanced_data = nba_stats.get_player_per_game_stats(player_id, season=season)
-    except Exception:
-        pass
+        inputs["per_game"], inputs["advanced"] = nba_stats.get_player_per_game_stats(player_id, season=season)
+    except Exception as e:
+        inputs["errors"]["per_game"] = str(e)
+
+    return inputs
+
+
+def _source(data, error=None, ok=None, empty="EMPTY"):
+    """One data_sources entry: status OK / *empty* / FAILED plus the data."""
+    if error:
+        return {"status": "FAILED", "error": error, "data": data or {}}
+    ok = bool(data) if ok is None else ok
+    return {"status": "OK" if ok else empty, "data": data or {}}
+
+
+def _shotdetail_source(shotdetail_data, sd_stats, move_freqs):
+    if not shotdetail_data:
+        return {"status": "NO_DATA", "data": {}}
+    action_counts = shotdetail_data.action_counts()
+    data = {
+        "total_fga":        shotdetail_data.total_fga,
+        "total_fgm":        shotdetail_data.total_fgm,
+        "games_played":     shotdetail_data.games_played,
+        "shooting_splits":  shotdetail_data.shooting_splits(),
+        "zone_area_mid":    shotdetail_data.zone_area_mid(),
+        "zone_area_three":  shotdetail_data.zone_area_three(),
+        "zone_area_close":  shotdetail_data.zone_area_close(),
+        "top_action_types": sorted(action_counts.items(), key=lambda x: x[1], reverse=True)[:20],
+        "estimated_stats":  sd_stats or {},
+    }
+    if move_freqs:
+        data["move_frequencies"] = move_freqs
+    return {"status": "OK", "data": data}
+
+
+@tracing.traced()
+def compute_player_tendencies(inputs, shotdetail_data=_UNSET, provenance=False):
+    """
+    CPU stage: shotdetail aggregation, calculate_tendencies() and zone
+    distribution for inputs from gather_player_inputs().  Pass
+    *shotdetail_data* (a ShotProfile or None) when it was already loaded,
+    e.g. in one pass for a batch of players; otherwise it is loaded here.
+
+    With *provenance*, the result gets a "provenance" dict: "data_sources"
+    (each raw input with its status, as fetched) and "used" (the per-game,
+    advanced, tracking, zone and move data after shotdetail overrides --
+    exactly what calculate_tendencies() saw), plus the engine version.
+    """
+    from engine import pbp_parser, zone_distributor
+    from engine import shotdetail_loader
+
+    player_id     = inputs["player_id"]
+    player_name   = inputs["player_name"]
+    season        = inputs["season"]
+    player_info   = inputs["player_info"]
+    tracking      = dict(inputs["tracking"] or {})
+    shot_zones    = inputs["shot_zones"] or {}
+    per_game_data = inputs["per_game"] or {}
+    advanced_data = dict(inputs["advanced"] or {})
+    pbp_moves     = {}
+
+    position = _normalize_position(player_info.get("position"))
 
     # PBP moves
     try:
@@ -554,39 +667,39 @@ def generate_tendencies_for_player(player_id, player_name, season="2024-25"):
         pass
 
     # Fetch shotdetail data (primary source — overrides bbref/nba_api when available)
-    try:
-        season_year = int(season.split("-")[0])
-        shotdetail_data = shotdetail_loader.load_player_shotdetail(player_id, season_year=season_year)
-    except Exception as e:
-        print(f"[shotdetail] WARNING: Could not load shotdetail data: {e}")
-        shotdetail_data = None
+    if shotdetail_data is _UNSET:
+        try:
+            season_year = int(season.split("-")[0])
+            shotdetail_data = shotdetail_loader.load_player_shotdetail(player_id, season_year=season_year)
+        except Exception as e:
+            print(f"[shotdetail] WARNING: Could not load shotdetail data: {e}")
+            shotdetail_data = None
 
     # --- Merge shotdetail as primary source ---
-    shooting_splits = {}
+    shooting_splits = dict(inputs.get("shooting_splits") or {})
     action_counts   = {}
+    move_freqs      = {}
+    sd_stats        = None
 
     if shotdetail_data:
-        # Override shooting splits with shotdetail data
-        if shotdetail_data.get("shooting_splits"):
-            shooting_splits = shotdetail_data["shooting_splits"]
+        # Override shooting splits with shotdetail data, field by field: a
+        # profile without attempts has no splits and leaves the rest alone
+        shooting_splits.update({k: v for k, v in shotdetail_data.shooting_splits().items() if v is not None})
 
         # Override shot zones with shotdetail data
-        if shotdetail_data.get("shot_zones"):
-            shot_zones = shotdetail_data["shot_zones"]
+        sd_zones = shotdetail_data.shot_zones()
+        if sd_zones:
+            shot_zones = sd_zones
 
         # Build pbp_moves from action_counts using extract_move_frequencies
-        action_counts = shotdetail_data.get("action_counts", {})
+        action_counts = shotdetail_data.action_counts()
         if action_counts:
-            # Inject pre-computed step-back split counts so extract_move_frequencies
+            # Pass the pre-computed step-back split counts so extract_move_frequencies
             # can use exact 2pt/3pt counts instead of keyword approximation.
-            merged_counts = dict(action_counts)
-            merged_counts["_stepback_2pt"] = shotdetail_data.get("stepback_2pt_count", 0)
-            merged_counts["_stepback_3pt"] = shotdetail_data.get("stepback_3pt_count", 0)
-
-            total_fga = shotdetail_data.get("total_fga", 1)
             move_freqs = shotdetail_loader.extract_move_frequencies(
-                merged_counts, total_fga,
-                games_played=shotdetail_data.get("games_played"),
+                action_counts, shotdetail_data.total_fga or 1,
+                games_played=shotdetail_data.games_played,
+                stepback_counts=(shotdetail_data.stepback_2pt, shotdetail_data.stepback_3pt),
             )
             # Override pbp_moves with computed frequencies (only if non-zero)
             merged_pbp = dict(pbp_moves)
@@ -607,7 +720,8 @@ def generate_tendencies_for_player(player_id, player_name, season="2024-25"):
                     "fga":  sd_stats["fga_per_game"],
                     "fg3a": sd_stats["fg3a_per_game"],
                     "pts":  sd_stats["pts_per_game"],
-                    "g":    round(shotdetail_data.get("games_played", 60)),
+                    # 0 means the game count is unknown: leave it missing
+                    "g":    shotdetail_data.games_played or None,
                 }
 
             # Fill missing USG estimate (advanced) from shotdetail
@@ -646,6 +760,9 @@ def generate_tendencies_for_player(player_id, player_name, season="2024-25"):
     }
 
     tendencies = calculate_tendencies(player_data)
+    # Snapshot before zone distribution, which only reads shot_zones
+    used = {k: player_data[k] for k in ("per_game", "advanced", "shooting_splits",
+                                        "tracking", "shot_zones", "pbp_moves")} if provenance else None
 
     # Compute zone tendencies from shot chart data
     zone_tends = zone_distributor.compute_zone_tendencies(
@@ -653,9 +770,9 @@ def generate_tendencies_for_player(player_id, player_name, season="2024-25"):
         parent_shot=tendencies.get("Shot Close") if tendencies.get("Shot Close") is not None else tendencies.get("Shot Under"),
         parent_mid=tendencies.get("Shot Mid"),
         parent_three=tendencies.get("Shot Three"),
-        zone_area_close=shotdetail_data.get("zone_area_close") if shotdetail_data else None,
-        zone_area_mid=shotdetail_data.get("zone_area_mid") if shotdetail_data else None,
-        zone_area_three=shotdetail_data.get("zone_area_three") if shotdetail_data else None,
+        zone_area_close=shotdetail_data.zone_area_close() if shotdetail_data else None,
+        zone_area_mid=shotdetail_data.zone_area_mid() if shotdetail_data else None,
+        zone_area_three=shotdetail_data.zone_area_three() if shotdetail_data else None,
     )
     name_map = {
         "shot_close_left":         "Shot Close Left",
@@ -683,10 +800,28 @@ def generate_tendencies_for_player(player_id, player_name, season="2024-25"):
         f"zones={'OK' if shot_zones else 'FAILED'}"
     )
 
-    return {
+    result = {
         "player_id": player_id,
         "name":      player_data["name"],
         "team":      player_data["team"],
         "position":  position,
         "tendencies": tendencies,
     }
+    if provenance:
+        errors = inputs.get("errors") or {}
+        raw_tracking = inputs["tracking"] or {}
+        result["provenance"] = {
+            "engine_version": engine_version(),
+            "data_sources": {
+                "player_info":        _source(player_info, errors.get("player_info")),
+                "nba_api_per_game":   _source(inputs["per_game"], errors.get("per_game")),
+                "nba_api_advanced":   _source(inputs["advanced"], errors.get("per_game")),
+                "nba_api_tracking":   _source(raw_tracking, errors.get("tracking"),
+                                              ok=any(v is not None for v in raw_tracking.values()),
+                                              empty="ALL_NULL"),
+                "nba_api_shot_zones": _source(inputs["shot_zones"], errors.get("shot_zones")),
+                "shotdetail_csv":     _shotdetail_source(shotdetail_data, sd_stats, move_freqs),
+            },
+            "used": used,
+        }
+    return result
@@ -0,0 +1,167 @@
+"""
+Compiles the NBA 2K Tendency Master workbook into a cached artifact.
+
+The workbook (NBA_2K_Tendency_Master-2.xlsx, "All Scales" sheet) is the
+source of truth for hard caps and locked rules.  Parsing it needs openpyxl,
+so it is done once by a build step:
+
+    python -m engine.tendency_master
+
+which writes data/tendency_master.json (name→index map, cap array, locked
+rules, relational rules) keyed by the workbook's SHA-256.  At startup
+engine/constants.py only reads that JSON file; openpyxl is never imported
+on the request path.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+BASE_DIR      = os.path.join(os.path.dirname(__file__), "..")
+DATA_DIR      = os.path.join(BASE_DIR, "data")
+WORKBOOK_PATH = os.path.join(BASE_DIR, "NBA_2K_Tendency_Master-2.xlsx")
+ARTIFACT_PATH = os.path.join(DATA_DIR, "tendency_master.json")
+
+SCALES_SHEET = "All Scales"
+ARTIFACT_VERSION = 1
+
+# "LOCKED: Step-Back Mid cap = 40."  /  "LOCKED SCALE + ABSOLUTE CAP 35."
+_LOCKED_CAP_RE = re.compile(r"\bcap\s*=\s*(\d+)", re.IGNORECASE)
+_ABSOLUTE_RE   = re.compile(r"\bABSOLUTE\s+CAP\s*=?\s*(\d+)", re.IGNORECASE)
+# "Rule: Spot-Up Mid ≤ Shot Mid."
+_RULE_RE       = re.compile(r"^\s*Rule:\s*(.+?)\s*(≤|<=)\s*(.+?)\.?\s*$", re.IGNORECASE)
+
+
+def workbook_hash(path=WORKBOOK_PATH):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_scales(path):
+    """Return [(order, name, hard_cap, notes)] rows from the All Scales sheet."""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[SCALES_SHEET]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(c or "").strip().lower() for c in next(rows)]
+        col = {name: header.index(name) for name in ("order", "tendency", "hard cap")}
+        notes_col = next((i for i, h in enumerate(header) if h.startswith("notes")), None)
+
+        out = []
+        for row in rows:
+            name = row[col["tendency"]]
+            cap  = row[col["hard cap"]]
+            if not name or cap in (None, ""):
+                continue
+            out.append((
+                int(row[col["order"]]) if row[col["order"]] is not None else len(out) + 1,
+                str(name).strip(),
+                int(float(cap)),
+                str(row[notes_col] or "").strip() if notes_col is not None else "",
+            ))
+        return out
+    finally:
+        wb.close()
+
+
+def compile_workbook(path=WORKBOOK_PATH):
+    """
+    Parse the workbook and merge it onto the engine's locked tendency order.
+    Tendencies that only exist in the engine (directional zones, Driving
+    Layup) keep their built-in caps.
+    """
+    from engine import constants
+
+    scales = _read_scales(path)
+    by_name = {name: (cap, notes) for _, name, cap, notes in scales}
+
+    tendencies = []
+    for t in constants.BUILTIN_TENDENCIES:
+        cap, notes = by_name.get(t["name"], (t["hard_cap"], t["notes"]))
+        tendencies.append({"order": t["order"], "name": t["name"], "hard_cap": cap, "notes": notes})
+    index = {t["name"]: i for i, t in enumerate(tendencies)}
+
+    unknown = [name for name in by_name if name not in index]
+    if unknown:
+        print(f"[tendency_master] WARNING: workbook tendencies not in engine order: {unknown}")
+
+    locked_absolute = {}
+    locked_caps = {}
+    relational_rules = []
+    for _, name, _, notes in scales:
+        if name not in index:
+            continue
+        m = _ABSOLUTE_RE.search(notes)
+        if m:
+            locked_absolute[name] = int(m.group(1))
+        elif "LOCKED" in notes.upper():
+            m = _LOCKED_CAP_RE.search(notes)
+            if m:
+                locked_caps[name] = int(m.group(1))
+        m = _RULE_RE.match(notes)
+        if m:
+            rhs = m.group(3).strip()
+            if rhs in index:
+                relational_rules.append([name, "<=", rhs])
+            else:
+                print(f"[tendency_master] WARNING: unknown tendency in rule for {name!r}: {rhs!r}")
+
+    return {
+        "version":          ARTIFACT_VERSION,
+        "workbook_sha256":  workbook_hash(path),
+        "source":           os.path.basename(path),
+        "tendencies":       tendencies,
+        "index":            index,
+        "hard_caps":        [t["hard_cap"] for t in tendencies],
+        "locked_absolute":  locked_absolute,
+        "locked_caps":      locked_caps,
+        "relational_rules": relational_rules,
+    }
+
+
+def build(path=WORKBOOK_PATH, out=ARTIFACT_PATH):
+    artifact = compile_workbook(path)
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    tmp = out + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, out)
+    return artifact
+
+
+def load_compiled(path=ARTIFACT_PATH, workbook=WORKBOOK_PATH):
+    """
+    Return the compiled artifact, or None when it is missing or was built
+    from a different workbook.  Never imports openpyxl.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except Exception as e:
+        print(f"[tendency_master] WARNING: could not read {path}: {e}")
+        return None
+
+    if artifact.get("version") != ARTIFACT_VERSION:
+        return None
+    if os.path.exists(workbook) and artifact.get("workbook_sha256") != workbook_hash(workbook):
+        print("[tendency_master] WARNING: compiled constants are stale; "
+              "run `python -m engine.tendency_master` to rebuild")
+        return None
+    return artifact
+
+
+if __name__ == "__main__":
+    result = build()
+    print(
+        f"[tendency_master] Compiled {len(result['tendencies'])} tendencies "
+        f"({len(result['locked_caps'])} locked caps, {len(result['locked_absolute'])} absolute, "
+        f"{len(result['relational_rules'])} relational rules) -> {ARTIFACT_PATH}"
+    )
@@ -0,0 +1,300 @@
+"""
+League tendency matrix.
+
+A season's stored tendencies (engine/tendency_store.py) are laid out as one
+uint8 matrix, players × TENDENCY_ORDER, opened with numpy.memmap.  Matrix
+and row index live in a single file, data/tendencies_<season>.<version>.matrix:
+
+    b"TMX1", uint32 header length   (struct "<4sI")
+    header                          JSON: columns, rows, built_at, ids,
+                                    names, teams, positions
+    padding                         to a 64-byte boundary
+    matrix                          rows × COLUMNS uint8
+
+Row i belongs to the player at position i of the header lists.  A build
+writes a new file under a new version (nanoseconds since the epoch) and
+renames it into place once complete, so a reader always sees a matching
+matrix and index.  A published file is never rewritten: readers open the
+newest version, and a matrix that is still mapped keeps its file (Windows
+will not replace or delete a mapped file; older versions that cannot be
+removed yet are removed by a later build).
+
+Queries are vectorized scans over the mapped matrix: nothing is parsed per
+player, and every process that opens the file shares the same page-cache
+pages.  The matrix is rebuilt after each store precompute and reopened
+whenever a newer version appears on disk.
+
+    query("2024-25", position="SF", sort="Drive", limit=20)
+    query("2024-25", where=["Post Up>40"])
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+import time
+
+from engine.constants import SEASON, TENDENCY_INDEX, TENDENCY_ORDER
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+COLUMNS = len(TENDENCY_ORDER)
+
+_MAGIC  = b"TMX1"
+_HEADER = struct.Struct("<4sI")   # magic, JSON header length
+_ALIGN  = 64
+
+_OPS = {
+    ">":  lambda col, v: col > v,
+    ">=": lambda col, v: col >= v,
+    "<":  lambda col, v: col < v,
+    "<=": lambda col, v: col <= v,
+    "=":  lambda col, v: col == v,
+    "==": lambda col, v: col == v,
+    "!=": lambda col, v: col != v,
+}
+_WHERE_RE = re.compile(r"^\s*(.+?)\s*(>=|<=|==|!=|>|<|=)\s*(\d+)\s*$")
+
+# Case-insensitive tendency name lookup ("post up" → column of "Post Up")
+_COLUMN_BY_NAME = {name.lower(): i for name, i in TENDENCY_INDEX.items()}
+
+_matrices = {}   # season -> (path, LeagueMatrix)
+_lock     = threading.Lock()
+
+
+def _versions(season):
+    """[(version, path)] of the season's matrix files on disk, oldest first."""
+    pattern = re.compile(rf"^tendencies_{re.escape(season)}\.(\d+)\.matrix$")
+    try:
+        names = os.listdir(DATA_DIR)
+    except OSError:
+        return []
+    found = [(int(m.group(1)), os.path.join(DATA_DIR, name))
+             for name in names for m in [pattern.match(name)] if m]
+    return sorted(found)
+
+
+def _path(season):
+    """The season's newest matrix file, or None if none has been built."""
+    versions = _versions(season)
+    return versions[-1][1] if versions else None
+
+
+class LeagueMatrix:
+    """Memory-mapped matrix plus the row index for one season."""
+
+    def __init__(self, season, values, index):
+        import numpy as np
+
+        self.season    = season
+        self.values    = values                       # (players, COLUMNS) uint8 memmap
+        self.ids       = np.asarray(index["ids"], dtype=np.int64)
+        self.names     = index["names"]
+        self.teams     = np.asarray(index["teams"])
+        self.positions = np.asarray(index["positions"])
+        self.built_at  = index.get("built_at")
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def build(season=SEASON):
+    """
+    Write the matrix and index for *season* from the tendency store.
+    Returns the row count; nothing is written when the store is empty.
+    """
+    import numpy as np
+
+    from engine import tendency_store
+
+    rows, ids, names, teams, positions = [], [], [], [], []
+    for result in tendency_store.iter_season(season):
+        tendencies = result.get("tendencies") or {}
+        rows.append([tendencies.get(name, 0) or 0 for name in TENDENCY_ORDER])
+        ids.append(int(result["player_id"]))
+        names.append(result.get("name", ""))
+        teams.append((result.get("team", "") or "").upper())
+        positions.append((result.get("position", "") or "").upper())
+
+    if not ids:
+        return 0
+
+    values = np.clip(np.asarray(rows, dtype=np.int64).reshape(len(rows), COLUMNS), 0, 255).astype(np.uint8)
+    header = json.dumps({"season": season, "columns": list(TENDENCY_ORDER), "rows": len(ids),
+                         "built_at": time.time(), "ids": ids, "names": names,
+                         "teams": teams, "positions": positions}).encode("utf-8")
+    offset = -(-(_HEADER.size + len(header)) // _ALIGN) * _ALIGN
+    os.makedirs(DATA_DIR, exist_ok=True)
+    older   = _versions(season)
+    version = max(time.time_ns(), older[-1][0] + 1 if older else 0)
+    path    = os.path.join(DATA_DIR, f"tendencies_{season}.{version}.matrix")
+
+    # Write the whole file aside and rename it to its (new) name, so readers
+    # never map a partial file and no mapped file is ever replaced
+    with open(path + ".tmp", "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(header)))
+        f.write(header)
+        f.write(b"\0" * (offset - _HEADER.size - len(header)))
+        f.write(values.tobytes())
+    os.replace(path + ".tmp", path)
+    for _, old in older:
+        try:
+            os.remove(old)
+        except OSError:
+            pass   # still mapped (Windows); removed by a later build
+    print(f"[tendency_matrix] {season}: {len(ids)} players × {COLUMNS} tendencies "
+          f"({values.nbytes // 1024} KB)")
+    return len(ids)
+
+
+# ── Load ──────────────────────────────────────────────────────────────────────
+
+def _read_header(path):
+    """(index dict, byte offset of the matrix) from a .matrix file."""
+    with open(path, "rb") as f:
+        magic, length = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"not a tendency matrix: {path}")
+        index = json.loads(f.read(length).decode("utf-8"))
+    return index, -(-(_HEADER.size + length) // _ALIGN) * _ALIGN
+
+
+def _open(season, path):
+    import numpy as np
+
+    index, offset = _read_header(path)
+    if index.get("columns") != list(TENDENCY_ORDER):
+        raise ValueError("matrix was built for a different TENDENCY_ORDER")
+    rows = index["rows"]
+    if os.path.getsize(path) != offset + rows * COLUMNS:
+        raise ValueError("matrix and index do not match")
+    if rows == 0:
+        values = np.zeros((0, COLUMNS), dtype=np.uint8)
+    else:
+        values = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(rows, COLUMNS))
+    return LeagueMatrix(season, values, index)
+
+
+def built_at(season=SEASON):
+    """When the season's matrix was built (epoch seconds), or None if it has not been."""
+    path = _path(season)
+    if path is None:
+        return None
+    try:
+        return _read_header(path)[0].get("built_at")
+    except (OSError, ValueError):
+        return None
+
+
+def load(season=SEASON, build_missing=True):
+    """
+    The season's LeagueMatrix, reopened when a newer version is built.
+    A missing matrix is built from the tendency store when *build_missing*.
+    Returns None if there is nothing to load.
+    """
+    with _lock:
+        path = _path(season)
+        if path is None:
+            if not build_missing:
+                return None
+            try:
+                if build(season) == 0:
+                    return None
+            except Exception as e:
+                print(f"[tendency_matrix] WARNING: build failed for {season}: {e}")
+                return None
+            path = _path(season)
+
+        # Published files never change, so the path identifies the contents
+        cached = _matrices.get(season)
+        if cached and cached[0] == path:
+            return cached[1]
+        try:
+            matrix = _open(season, path)
+        except Exception as e:
+            print(f"[tendency_matrix] WARNING: could not open {season} matrix: {e}")
+            return cached[1] if cached else None
+        _matrices[season] = (path, matrix)
+        return matrix
+
+
+# ── Query ─────────────────────────────────────────────────────────────────────
+
+def column(name):
+    """Column number of tendency *name* (case-insensitive)."""
+    i = _COLUMN_BY_NAME.get(str(name).strip().lower())
+    if i is None:
+        raise ValueError(f"Unknown tendency: {name!r}")
+    return i
+
+
+def parse_where(expr):
+    """'Post Up>40' → (column, op, value)."""
+    m = _WHERE_RE.match(str(expr))
+    if not m:
+        raise ValueError(f"Bad filter {expr!r} (expected e.g. 'Post Up>40')")
+    name, op, value = m.groups()
+    return column(name), op, int(value)
+
+
+def query(season=SEASON, position=None, team=None, where=(), sort=None,
+          descending=True, limit=20, columns=None):
+    """
+    Filter and sort the season's players on the tendency matrix.
+
+    position / team  exact match (case-insensitive); lists allowed
+    where            filters such as "Post Up>40" (>, >=, <, <=, =, !=), ANDed
+    sort             tendency to order by (default: input order, player id)
+    limit            max rows returned (None: all; 0: none, "matched" only)
+    columns          tendencies to include per row (default: sort + where)
+
+    Returns {"season", "matched", "results": [...]}, or None when no
+    matrix exists for the season.
+    """
+    import numpy as np
+
+    matrix = load(season)
+    if matrix is None:
+        return None
+
+    mask = np.ones(len(matrix), dtype=bool)
+    for field, wanted in (("positions", position), ("teams", team)):
+        if wanted:
+            wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+            # Team and position codes are stored upper-case ("BOS", "SF")
+            mask &= np.isin(getattr(matrix, field), [str(w).strip().upper() for w in wanted])
+
+    filters = [parse_where(w) for w in where or ()]
+    for col, op, value in filters:
+        mask &= _OPS[op](matrix.values[:, col], value)
+
+    rows = np.flatnonzero(mask)
+    if sort:
+        sort_col = column(sort)
+        keys = matrix.values[rows, sort_col].astype(np.int16)
+        # Stable sort keeps player-id order among ties
+        rows = rows[np.argsort(-keys if descending else keys, kind="stable")]
+    matched = len(rows)
+    if limit is not None:
+        rows = rows[:int(limit)]
+
+    if columns:
+        cols = [column(c) for c in columns]
+    else:
+        cols = ([column(sort)] if sort else []) + [col for col, _, _ in filters]
+        cols = list(dict.fromkeys(cols))
+
+    block = matrix.values[rows][:, cols] if cols else None
+    results = []
+    for n, i in enumerate(rows):
+        results.append({
+            "player_id":  int(matrix.ids[i]),
+            "name":       matrix.names[i],
+            "team":       str(matrix.teams[i]),
+            "position":   str(matrix.positions[i]),
+            "tendencies": {TENDENCY_ORDER[c]: int(block[n, k]) for k, c in enumerate(cols)} if cols else {},
+        })
+    return {"season": season, "matched": matched, "results": results}
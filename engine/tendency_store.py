@@ -0,0 +1,416 @@
+"""
+Materialized tendency store.
+
+Generated tendencies for the current season are kept in a local SQLite
+table (data/tendencies.sqlite3), one row per (season, player).  A scheduled
+precompute refreshes the season once a night through the bulk engine, so
+/api/generate and /api/search answer from the store and only compute on a
+miss or a forced refresh.
+
+Each stored row carries the hash of the inputs it was computed from (NBA
+API data + shotdetail aggregates, see tendency_calculator.input_hash), the
+engine version, and a cheap "source hash": the player's rows in the
+league-wide NBA API frames (nba_stats.league_fingerprints) plus their
+shotdetail aggregates.  A precompute first skips every player whose source
+hash and engine version are unchanged without any per-player API call;
+the rest have their inputs gathered and are recomputed only if the input
+hash changed.  force=True recomputes everyone.  Skipped players are
+counted as such.
+
+The nightly run starts at STORE_REFRESH_HOUR (local time, default 4;
+"off" disables the schedule).  precompute_in_background() starts a run on
+demand.  Each run finishes by rebuilding the season's memory-mapped
+tendency matrix (engine/tendency_matrix.py) used by /api/query.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from engine.constants import SEASON
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+DB_PATH  = os.path.join(DATA_DIR, "tendencies.sqlite3")
+
+STORE_REFRESH_HOUR = os.environ.get("STORE_REFRESH_HOUR", "4")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tendencies (
+    season      TEXT NOT NULL,
+    player_id   INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    team        TEXT,
+    position    TEXT,
+    result      TEXT NOT NULL,
+    computed_at REAL NOT NULL,
+    input_hash  TEXT,
+    engine_version TEXT,
+    provenance  TEXT,
+    source_hash TEXT,
+    PRIMARY KEY (season, player_id)
+);
+CREATE TABLE IF NOT EXISTS store_runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    season      TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    total       INTEGER,
+    done        INTEGER,
+    failed      INTEGER,
+    skipped     INTEGER,
+    players_per_sec REAL
+);
+"""
+
+# Columns added after the first release of the schema: (table, column, type)
+_MIGRATIONS = [
+    ("tendencies", "input_hash",     "TEXT"),
+    ("tendencies", "engine_version", "TEXT"),
+    ("tendencies", "provenance",     "TEXT"),
+    ("tendencies", "source_hash",    "TEXT"),
+    ("store_runs", "skipped",        "INTEGER"),
+]
+
+_db_lock      = threading.Lock()    # serializes writers
+_init_lock    = threading.Lock()
+_initialized  = False
+_running      = set()     # seasons with a precompute in progress
+_run_lock     = threading.Lock()
+_scheduler    = None
+
+
+# ── Storage ────────────────────────────────────────────────────────────────────
+
+def _connect():
+    global _initialized
+    os.makedirs(DATA_DIR, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _initialized:
+        with _init_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            for table, col, kind in _MIGRATIONS:
+                cols = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+                if col not in cols:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {kind}")
+            _initialized = True
+    return conn
+
+
+def get(player_id, season=SEASON, provenance=False):
+    """
+    Stored result for one player, or None.  With *provenance*, the
+    result's "provenance" is included when it was stored with one.
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT result, provenance FROM tendencies WHERE season = ? AND player_id = ?",
+            (season, int(player_id)),
+        ).fetchone()
+    if row is None:
+        return None
+    result = json.loads(row["result"])
+    if provenance and row["provenance"]:
+        result["provenance"] = json.loads(row["provenance"])
+    return result
+
+
+def computed_at(player_id, season=SEASON, with_provenance=False):
+    """
+    When the stored result for one player was computed (epoch seconds), or
+    None -- also None with *with_provenance* if it was stored without one.
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT computed_at FROM tendencies WHERE season = ? AND player_id = ?"
+            + (" AND provenance IS NOT NULL" if with_provenance else ""),
+            (season, int(player_id)),
+        ).fetchone()
+    return row["computed_at"] if row else None
+
+
+def season_stamp(season=SEASON):
+    """(stored players, latest computed_at or 0.0) -- changes whenever the season's rows do."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT COUNT(*) AS n, MAX(computed_at) AS latest FROM tendencies WHERE season = ?", (season,)
+        ).fetchone()
+    return row["n"], row["latest"] or 0.0
+
+
+def stored_ids(player_ids, season=SEASON):
+    """The subset of *player_ids* that have a stored result for *season*."""
+    ids = [int(pid) for pid in player_ids]
+    if not ids:
+        return set()
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT player_id FROM tendencies WHERE season = ? AND player_id IN ({','.join('?' * len(ids))})",
+            (season, *ids),
+        ).fetchall()
+    return {r["player_id"] for r in rows}
+
+
+def stored_versions(season=SEASON):
+    """{player_id: (input_hash, engine_version, source_hash)} for every stored row of *season*."""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT player_id, input_hash, engine_version, source_hash FROM tendencies WHERE season = ?",
+            (season,),
+        ).fetchall()
+    return {r["player_id"]: (r["input_hash"], r["engine_version"], r["source_hash"]) for r in rows}
+
+
+def put(result, season=SEASON, input_hash=None, engine_version=None, source_hash=None):
+    """
+    Upsert one generation result.  Rows stored without an input hash are
+    recomputed by the next precompute.  A result's "provenance" is kept in
+    its own column (see get()).
+    """
+    result = dict(result)
+    provenance = result.pop("provenance", None)
+    with _db_lock, _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO tendencies "
+            "(season, player_id, name, team, position, result, computed_at, input_hash, engine_version, "
+            "provenance, source_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (season, int(result["player_id"]), result.get("name", ""), result.get("team", ""),
+             result.get("position", ""), json.dumps(result), time.time(), input_hash, engine_version,
+             json.dumps(provenance, default=str) if provenance is not None else None, source_hash),
+        )
+
+
+def _set_source_hash(player_id, season, source_hash):
+    """Record a new source hash for a row whose inputs turned out unchanged."""
+    with _db_lock, _connect() as conn:
+        conn.execute(
+            "UPDATE tendencies SET source_hash = ? WHERE season = ? AND player_id = ?",
+            (source_hash, season, int(player_id)),
+        )
+
+
+def generate(player_id, player_name, season=SEASON):
+    """
+    Generate one player now, with provenance, and store the result with
+    its input hash, engine version and source hash -- so the next
+    precompute finds the row current without fetching or recomputing it.
+    Returns the result.
+    """
+    from engine import nba_stats, shotdetail_loader
+    from engine.tendency_calculator import (compute_player_tendencies, engine_version,
+                                            gather_player_inputs, input_hash)
+
+    inputs = gather_player_inputs(player_id, player_name, season)
+    try:
+        sd = shotdetail_loader.load_player_shotdetail(player_id, season_year=int(season.split("-")[0]))
+    except Exception as e:
+        print(f"[shotdetail] WARNING: Could not load shotdetail data: {e}")
+        sd = None
+    result = compute_player_tendencies(inputs, shotdetail_data=sd, provenance=True)
+    # The league frames were just fetched (or are cached) for this player's
+    # inputs, so the fingerprints cost no extra request
+    fingerprints = nba_stats.league_fingerprints(season)
+    source_hash  = _source_hash(fingerprints.get(int(player_id)), sd) if fingerprints is not None else None
+    put(result, season=season, input_hash=input_hash(inputs, sd), engine_version=engine_version(),
+        source_hash=source_hash)
+    return result
+
+
+def iter_season(season=SEASON):
+    """Yield every stored result for *season*, ordered by player id."""
+    conn = _connect()
+    try:
+        for row in conn.execute(
+            "SELECT result FROM tendencies WHERE season = ? ORDER BY player_id", (season,)
+        ):
+            yield json.loads(row["result"])
+    finally:
+        conn.close()
+
+
+def status(season=SEASON):
+    with _connect() as conn:
+        count = conn.execute(
+            "SELECT COUNT(*) AS n, MAX(computed_at) AS latest FROM tendencies WHERE season = ?", (season,)
+        ).fetchone()
+        last_run = conn.execute(
+            "SELECT * FROM store_runs WHERE season = ? ORDER BY id DESC LIMIT 1", (season,)
+        ).fetchone()
+    with _run_lock:
+        running = season in _running
+    return {
+        "season":       season,
+        "players":      count["n"],
+        "latest":       count["latest"],
+        "running":      running,
+        "last_run":     dict(last_run) if last_run else None,
+        "refresh_hour": STORE_REFRESH_HOUR,
+    }
+
+
+# ── Precompute ─────────────────────────────────────────────────────────────────
+
+def _source_hash(fingerprint, shotdetail_data):
+    h = hashlib.sha256((fingerprint or "absent").encode())
+    h.update(b"\0")
+    if shotdetail_data is not None:
+        h.update(shotdetail_data.to_bytes())
+    return h.hexdigest()
+
+
+def precompute(season=SEASON, force=False):
+    """
+    Bring the store up to date for every rostered player of *season*,
+    recomputing only players whose inputs or engine version changed (all
+    of them with *force*).  Blocking; returns the bulk stats, or None if a
+    run for the season is already in progress.
+    """
+    from engine import nba_stats, shotdetail_loader
+    from engine.bulk_runner import iter_bulk
+    from engine.player_search import get_all_players
+    from engine.tendency_calculator import engine_version, input_hash
+
+    with _run_lock:
+        if season in _running:
+            return None
+        _running.add(season)
+    try:
+        players = list(get_all_players(season=season))
+        with _db_lock, _connect() as conn:
+            run_id = conn.execute(
+                "INSERT INTO store_runs (season, started_at, total) VALUES (?, ?, ?)",
+                (season, time.time(), len(players)),
+            ).lastrowid
+        version = engine_version()
+        stored  = {} if force else stored_versions(season)
+        print(f"[tendency_store] Precomputing {len(players)} players for {season} "
+              f"(engine {version}{', forced' if force else ''})")
+
+        season_year = int(season.split("-")[0])
+        try:
+            shotdetail_loader.load_season_store(season_year)
+        except Exception as e:
+            print(f"[tendency_store] WARNING: shotdetail store unavailable: {e}")
+
+        def shotdetail(pid):
+            try:
+                return shotdetail_loader.load_players_shotdetail([pid], season_year).get(pid)
+            except Exception:
+                return None
+
+        # Cheap pass: league frames are one request each for the whole season,
+        # so players whose rows (and shotdetail) are unchanged need no fetch at all
+        fingerprints = nba_stats.league_fingerprints(season)
+        sources, unchanged = {}, 0
+        if fingerprints is not None:
+            pending = []
+            for p in players:
+                pid = int(p["id"])
+                sources[pid] = _source_hash(fingerprints.get(pid), shotdetail(pid))
+                row = stored.get(pid)
+                if row and row[1:] == (version, sources[pid]):
+                    unchanged += 1
+                else:
+                    pending.append(p)
+        else:
+            pending = players
+
+        hashes = {}
+
+        def should_compute(p, inputs):
+            pid = int(p["id"])
+            hashes[pid] = input_hash(inputs, shotdetail(pid))
+            row = stored.get(pid)
+            if row and row[:2] == (hashes[pid], version):
+                if pid in sources and row[2] != sources[pid]:
+                    _set_source_hash(pid, season, sources[pid])
+                return False
+            return True
+
+        stats = {}
+        # With provenance, so /api/debug-raw answers precomputed players from the store
+        for p, result, error in iter_bulk(pending, season=season, stats=stats,
+                                          should_compute=should_compute, provenance=True):
+            if error is not None:
+                print(f"[tendency_store] {p.get('name')} ({p.get('id')}) failed: {error}")
+            elif result is not None:
+                pid = int(p["id"])
+                put(result, season=season, input_hash=hashes.get(pid), engine_version=version,
+                    source_hash=sources.get(pid))
+        stats["total"]   = len(players)
+        stats["skipped"] = stats.get("skipped", 0) + unchanged
+
+        with _db_lock, _connect() as conn:
+            conn.execute(
+                "UPDATE store_runs SET finished_at = ?, done = ?, failed = ?, skipped = ?, "
+                "players_per_sec = ? WHERE id = ?",
+                (time.time(), stats.get("done", 0), stats.get("failed", 0), stats.get("skipped", 0),
+                 stats.get("players_per_sec", 0.0), run_id),
+            )
+        print(f"[tendency_store] {season}: {stats.get('done', 0)} recomputed, "
+              f"{stats.get('skipped', 0)} unchanged (skipped, {unchanged} without fetching), "
+              f"{stats.get('failed', 0)} failed")
+
+        # Rebuild the matrix when rows changed, or when it is missing or
+        # older than the store (deleted, or rows written by /api/generate)
+        try:
+            from engine import tendency_matrix
+            built = tendency_matrix.built_at(season)
+            if stats.get("done") or built is None or built < season_stamp(season)[1]:
+                tendency_matrix.build(season)
+        except Exception as e:
+            print(f"[tendency_store] WARNING: tendency matrix build failed: {e}")
+        return stats
+    finally:
+        with _run_lock:
+            _running.discard(season)
+
+
+def precompute_in_background(season=SEASON, force=False):
+    """Start precompute() on a daemon thread.  Returns False if one is already running."""
+    with _run_lock:
+        if season in _running:
+            return False
+
+    def run():
+        try:
+            precompute(season, force=force)
+        except Exception as e:
+            print(f"[tendency_store] Precompute for {season} failed: {e}")
+
+    threading.Thread(target=run, name=f"precompute-{season}", daemon=True).start()
+    return True
+
+
+def _seconds_until(hour, now=None):
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def start_scheduler(season=SEASON):
+    """Run precompute() every night at STORE_REFRESH_HOUR on a daemon thread (once)."""
+    global _scheduler
+    if _scheduler is not None or str(STORE_REFRESH_HOUR).lower() in ("off", "none", ""):
+        return False
+    hour = int(STORE_REFRESH_HOUR) % 24
+
+    def loop():
+        while True:
+            time.sleep(_seconds_until(hour))
+            try:
+                precompute(season)
+            except Exception as e:
+                print(f"[tendency_store] Nightly precompute failed: {e}")
+
+    _scheduler = threading.Thread(target=loop, name="tendency-store-scheduler", daemon=True)
+    _scheduler.start()
+    print(f"[tendency_store] Nightly precompute scheduled at {hour:02d}:00 for {season}")
+    return True
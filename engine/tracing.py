@@ -0,0 +1,234 @@
+"""
+Lightweight tracing for the generation pipeline.
+
+app.py opens a trace per request (start_trace) and every instrumented stage
+below it -- NBA API calls, rate-limit sleeps, shotdetail loads,
+calculate_tendencies, zone distribution -- records a span:
+
+    with tracing.span("shotdetail.scan", player_id=pid):
+        ...
+
+    @tracing.traced("calculate_tendencies")
+    def calculate_tendencies(...):
+
+The current trace and parent span live in contextvars, so spans nest
+without passing anything around; work submitted to other threads joins the
+trace when run under contextvars.copy_context() (see bulk_runner).  Outside
+a trace, span() is a no-op.
+
+Finished traces are
+  - aggregated per endpoint: count and total/max ms per span name
+    (aggregates(), GET /api/traces);
+  - kept in a ring of the last TRACE_KEEP traces, exportable in the Chrome
+    trace event format (chrome_trace()), which chrome://tracing, Perfetto
+    and speedscope load directly.
+
+TRACING=0 disables tracing entirely.
+"""
+
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+ENABLED    = os.environ.get("TRACING", "1") != "0"
+TRACE_KEEP = int(os.environ.get("TRACE_KEEP", "50"))
+
+_trace  = contextvars.ContextVar("trace", default=None)
+_parent = contextvars.ContextVar("span_parent", default=None)
+
+_ids        = itertools.count(1)
+_recent     = deque(maxlen=TRACE_KEEP)
+_aggregates = {}   # endpoint -> {"count", "total_ms", "spans": {name: [count, total_ms, max_ms]}}
+_lock       = threading.Lock()
+
+
+class Trace:
+    __slots__ = ("id", "name", "started", "wall_start", "spans", "duration_ms")
+
+    def __init__(self, name):
+        self.id          = next(_ids)
+        self.name        = name
+        self.started     = time.perf_counter()
+        self.wall_start  = time.time()
+        self.spans       = []      # finished span dicts, appended from any thread
+        self.duration_ms = None
+
+    def summary(self):
+        """{"total_ms", "spans": {name: {"count", "total_ms", "max_ms"}}} for this trace."""
+        by_name = {}
+        for s in self.spans:
+            agg = by_name.setdefault(s["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            agg["count"]    += 1
+            agg["total_ms"] += s["ms"]
+            agg["max_ms"]    = max(agg["max_ms"], s["ms"])
+        for agg in by_name.values():
+            agg["total_ms"] = round(agg["total_ms"], 2)
+            agg["max_ms"]   = round(agg["max_ms"], 2)
+        return {"id": self.id, "name": self.name, "total_ms": self.duration_ms, "spans": by_name}
+
+
+class _Span:
+    __slots__ = ("trace", "name", "attrs", "id", "start", "token")
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name  = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.id    = next(_ids)
+        self.token = _parent.set(self.id)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _parent.reset(self.token)
+        record = {
+            "name":   self.name,
+            "id":     self.id,
+            "parent": _parent.get(),
+            "start":  self.start - self.trace.started,
+            "ms":     (end - self.start) * 1000,
+            "thread": threading.get_ident(),
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.trace.spans.append(record)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **attrs):
+    """Context manager timing one stage of the current trace (no-op outside one)."""
+    trace = _trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name, attrs)
+
+
+def traced(name=None):
+    """Decorator: run the function inside span(*name*) (default: its qualified name)."""
+    def decorate(fn):
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _trace.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _Span(trace, span_name, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current():
+    """The active Trace, or None."""
+    return _trace.get()
+
+
+def start_trace(name):
+    """Begin a trace in the current context and return it (None when TRACING=0)."""
+    if not ENABLED:
+        return None
+    trace = Trace(name)
+    _trace.set(trace)
+    _parent.set(None)
+    return trace
+
+
+def finish_trace(trace):
+    """End *trace*: detach it from the context, aggregate it and keep it in the ring."""
+    if trace is None or trace.duration_ms is not None:
+        return
+    trace.duration_ms = round((time.perf_counter() - trace.started) * 1000, 2)
+    if _trace.get() is trace:
+        _trace.set(None)
+    with _lock:
+        agg = _aggregates.setdefault(trace.name, {"count": 0, "total_ms": 0.0, "spans": {}})
+        agg["count"]    += 1
+        agg["total_ms"] += trace.duration_ms
+        for s in list(trace.spans):
+            entry = agg["spans"].setdefault(s["name"], [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += s["ms"]
+            entry[2]  = max(entry[2], s["ms"])
+        _recent.append(trace)
+
+
+def aggregates():
+    """Per-endpoint totals since startup, with the mean per request for each span name."""
+    with _lock:
+        out = {}
+        for endpoint, agg in _aggregates.items():
+            n = agg["count"]
+            out[endpoint] = {
+                "count":   n,
+                "mean_ms": round(agg["total_ms"] / n, 2) if n else 0.0,
+                "spans": {
+                    name: {"count": c, "total_ms": round(total, 2), "max_ms": round(mx, 2),
+                           "mean_ms_per_request": round(total / n, 2) if n else 0.0}
+                    for name, (c, total, mx) in sorted(agg["spans"].items(), key=lambda kv: -kv[1][1])
+                },
+            }
+        return out
+
+
+def recent(trace_id=None):
+    """Kept traces, newest last (or just the one with *trace_id*)."""
+    with _lock:
+        traces = list(_recent)
+    if trace_id is not None:
+        traces = [t for t in traces if t.id == trace_id]
+    return traces
+
+
+def chrome_trace(traces):
+    """
+    Chrome trace event JSON ({"traceEvents": [...]}) for *traces*: one
+    complete ("X") event per request and per span, timestamps in µs since
+    the epoch, one pid per trace and the recording thread as tid.
+    """
+    events = []
+    for trace in traces:
+        base = trace.wall_start * 1e6
+        events.append({"name": "process_name", "ph": "M", "pid": trace.id,
+                       "args": {"name": f"{trace.name} #{trace.id}"}})
+        events.append({"name": trace.name, "ph": "X", "pid": trace.id, "tid": 0,
+                       "ts": base, "dur": (trace.duration_ms or 0) * 1000, "cat": "request"})
+        for s in list(trace.spans):
+            args = dict(s.get("attrs") or {})
+            if "error" in s:
+                args["error"] = s["error"]
+            events.append({"name": s["name"], "ph": "X", "pid": trace.id, "tid": s["thread"],
+                           "ts": base + s["start"] * 1e6, "dur": s["ms"] * 1000,
+                           "cat": s["name"].split(".", 1)[0], "args": args})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def server_timing(trace):
+    """Server-Timing header value summarizing *trace* by span name (slowest first)."""
+    parts = []
+    for name, agg in sorted(trace.summary()["spans"].items(), key=lambda kv: -kv[1]["total_ms"])[:20]:
+        token = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        parts.append(f'{token};dur={agg["total_ms"]};desc="{agg["count"]}x"')
+    return ", ".join(parts)
@@ -0,0 +1,237 @@
+"""
+Startup model.
+
+app.py and the engine import their dependencies lazily (inside handlers and
+functions), which keeps `import app` cheap but makes the first request pay
+for whatever it touches first.  To keep first-request latency predictable:
+
+  - the server binds and starts accepting connections immediately;
+  - start() then preloads HOT_MODULES on a background thread, so the
+    imports every generate/search request needs are already done;
+  - rarely used modules (exports, the tendency matrix, the profiler)
+    stay lazy and load on first use.
+
+Warm-up then loads the current season's data, so the first /api/generate
+does not pay for it either.  Phases run in order and are chosen with the
+WARMUP environment variable (comma-separated; "none" disables warm-up):
+
+  modules     import HOT_MODULES
+  roster      season roster snapshot + search index
+  shotdetail  season shotdetail store (one ShotProfile per player)
+  league      league-wide NBA API frames (tracking, Synergy, dashboards)
+
+WARMUP_SEASON selects the season (default: engine.constants.SEASON).
+status() / GET /api/ready report progress and readiness.
+
+`python -m engine.warmup` prints a measured import-time profile
+(python -X importtime) of `import app` and of each hot module, for
+checking the startup budget after dependency changes.
+"""
+
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Imported by the warm-up thread after the server binds
+HOT_MODULES = [
+    "engine.constants",
+    "engine.metrics",
+    "engine.tracing",
+    "engine.search_index",
+    "engine.player_search",
+    "engine.nba_stats",
+    "engine.pbp_parser",
+    "engine.shot_profile",
+    "engine.shotdetail_loader",
+    "engine.zone_distributor",
+    "engine.caps_enforcer",
+    "engine.tendency_calculator",
+    "engine.bulk_runner",
+    "engine.jobs",
+    "engine.tendency_store",
+    "pandas",
+    "nba_api.stats.static.players",
+    "nba_api.stats.endpoints.playerindex",
+    "nba_api.stats.endpoints.commonplayerinfo",
+    "nba_api.stats.endpoints.playerprofilev2",
+    "nba_api.stats.endpoints.playercareerstats",
+    "nba_api.stats.endpoints.playerdashptshots",
+    "nba_api.stats.endpoints.playerdashptpass",
+    "nba_api.stats.endpoints.shotchartdetail",
+    "nba_api.stats.endpoints.leaguedashptstats",
+    "nba_api.stats.endpoints.leaguedashplayerstats",
+    "nba_api.stats.endpoints.playerestimatedmetrics",
+    "nba_api.stats.endpoints.synergyplaytypes",
+]
+
+# Deliberately not preloaded: only needed by exports, queries and profiling.
+# (engine.tendency_master comes in with engine.constants; only its
+# workbook build step imports openpyxl.)
+LAZY_MODULES = [
+    "engine.exporters",
+    "engine.tendency_matrix",
+    "engine.profiler",
+]
+
+PHASES = ("modules", "roster", "shotdetail", "league")
+
+_state = {"status": "idle", "season": None, "started_at": None, "finished_at": None,
+          "phases": {}, "modules": {}}
+_state_lock = threading.Lock()
+
+
+def configured_phases(value=None):
+    """Phases selected by *value* (default: the WARMUP env var, else all)."""
+    value = os.environ.get("WARMUP", "") if value is None else value
+    value = value.strip().lower()
+    if value in ("none", "off", "0", "false"):
+        return []
+    if not value or value == "all":
+        return list(PHASES)
+    wanted = [p.strip() for p in value.split(",") if p.strip()]
+    unknown = [p for p in wanted if p not in PHASES]
+    if unknown:
+        print(f"[warmup] WARNING: unknown phases ignored: {', '.join(unknown)}")
+    return [p for p in PHASES if p in wanted]
+
+
+def preload_modules(modules=HOT_MODULES):
+    """Import *modules*, recording wall time per module (ms, or the error)."""
+    timings = {}
+    for name in modules:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            timings[name] = round((time.perf_counter() - t0) * 1000, 1)
+        except Exception as e:
+            timings[name] = f"{type(e).__name__}: {e}"
+    return timings
+
+
+def _phase_modules(season):
+    timings = preload_modules()
+    with _state_lock:
+        _state["modules"] = timings
+    failed = [m for m, v in timings.items() if not isinstance(v, float)]
+    return f"{len(timings) - len(failed)} modules" + (f", {len(failed)} unavailable" if failed else "")
+
+
+def _phase_roster(season):
+    from engine.player_search import get_snapshot
+    return f"{len(get_snapshot(season).players)} players"
+
+
+def _phase_shotdetail(season):
+    from engine.shotdetail_loader import load_season_store
+    store = load_season_store(int(season.split("-")[0]))
+    if store is None:
+        raise RuntimeError("shotdetail data unavailable")
+    return f"{len(store)} players"
+
+
+def _phase_league(season):
+    from engine.nba_stats import prefetch_league_frames
+    return f"{prefetch_league_frames(season)} frames"
+
+
+_PHASE_FUNCS = {
+    "modules":    _phase_modules,
+    "roster":     _phase_roster,
+    "shotdetail": _phase_shotdetail,
+    "league":     _phase_league,
+}
+
+
+def _run(phases, season):
+    with _state_lock:
+        _state.update(status="running", started_at=time.time())
+    t_all = time.perf_counter()
+    for name in phases:
+        with _state_lock:
+            _state["phases"][name]["status"] = "running"
+        t0 = time.perf_counter()
+        try:
+            detail = _PHASE_FUNCS[name](season)
+            result = {"status": "done", "detail": detail}
+        except Exception as e:
+            result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        result["ms"] = round((time.perf_counter() - t0) * 1000)
+        with _state_lock:
+            _state["phases"][name] = result
+        print(f"[warmup] {name}: {result['status']} in {result['ms']} ms "
+              f"({result.get('detail') or result.get('error')})")
+    with _state_lock:
+        _state.update(status="done", finished_at=time.time())
+    print(f"[warmup] Complete in {(time.perf_counter() - t_all):.1f}s")
+
+
+def start(phases=None, season=None):
+    """Start the warm-up thread (once).  Returns immediately."""
+    from engine.constants import SEASON
+
+    phases = configured_phases() if phases is None else list(phases)
+    season = season or os.environ.get("WARMUP_SEASON") or SEASON
+    with _state_lock:
+        if _state["status"] != "idle":
+            return False
+        _state.update(status="starting", season=season,
+                      phases={name: {"status": "pending"} for name in phases})
+        if not phases:
+            _state.update(status="done", finished_at=time.time())
+            return False
+    threading.Thread(target=_run, args=(phases, season), name="warmup", daemon=True).start()
+    return True
+
+
+def status():
+    """Warm-up progress; "ready" once every configured phase has finished."""
+    with _state_lock:
+        state = dict(_state, phases={k: dict(v) for k, v in _state["phases"].items()})
+    state["ready"] = state["status"] == "done"
+    return state
+
+
+# ── Import-time profile ───────────────────────────────────────────────────────
+
+def _importtime(statement):
+    """[(depth, cumulative_ms, module)] from `python -X importtime -c statement`."""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=root, capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(cumulative) / 1000, name.strip()))
+    return rows
+
+
+def import_profile(statement="import app", top=15, depth=1):
+    """
+    Run *statement* in a fresh interpreter under -X importtime and return
+    [(cumulative_ms, module)] for the slowest imports up to *depth* levels
+    deep, excluding what a bare interpreter imports anyway.
+    """
+    baseline = {name for _, _, name in _importtime("pass")}
+    rows = [(ms, "  " * d + name) for d, ms, name in _importtime(statement)
+            if d <= depth and name not in baseline]
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    print("Cold `import app` (what the server pays before binding):")
+    for ms, name in import_profile("import app"):
+        print(f"  {ms:8.1f} ms  {name}")
+    print("\nHot modules (preloaded in the background after bind):")
+    statement = "; ".join(f"import {m}" for m in HOT_MODULES if importlib.util.find_spec(m.split('.')[0]))
+    for ms, name in import_profile(statement):
+        print(f"  {ms:8.1f} ms  {name}")
@@ -2,6 +2,8 @@
 Compute directional shot tendency values from NBA API shot-zone data.
 """
 
+from engine import tracing
+
 
 def _round5(v):
     return max(0, round(v / 5) * 5)
@@ -28,6 +30,7 @@ def _zone_stats(shot_zones, basic_filter, area_filter=None):
     return fga, fgm
 
 
+@tracing.traced()
 def compute_zone_tendencies(
     shot_zones,
     parent_shot=None,
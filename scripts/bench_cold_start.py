@@ -0,0 +1,61 @@
+"""
+Cold-start benchmark: time to import the app and serve the first export in
+a fresh interpreter, with and without pandas on the import path.
+
+    python scripts/bench_cold_start.py [--runs 7]
+
+"with pandas" pre-imports pandas before the app, reproducing the old
+module-level `import pandas as pd` in app.py, so the two columns show what
+the lazy import saves.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+_PROBE = r"""
+import time
+t0 = time.perf_counter()
+{preload}
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+client.post("/api/export/csv", json={{"name": "bench", "tendencies": {{"Shot": 50, "Touch": 35}}}})
+client.post("/api/export/excel", json={{"name": "bench", "tendencies": {{"Shot": 50, "Touch": 35}}}})
+t2 = time.perf_counter()
+print(f"{{(t1 - t0) * 1000:.1f}} {{(t2 - t1) * 1000:.1f}}")
+"""
+
+
+def _run(preload, runs):
+    imports, exports = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(preload=preload)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        imports.append(float(out[-2]))
+        exports.append(float(out[-1]))
+    return statistics.median(imports), statistics.median(exports)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    lean   = _run("", args.runs)
+    pandas = _run("import pandas", args.runs)
+
+    print(f"{'':<16}{'import app':>14}{'first exports':>16}")
+    print(f"{'without pandas':<16}{lean[0]:>11.1f} ms{lean[1]:>13.1f} ms")
+    print(f"{'with pandas':<16}{pandas[0]:>11.1f} ms{pandas[1]:>13.1f} ms")
+    print(f"saved {pandas[0] - lean[0]:.1f} ms at import (median of {args.runs} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Write gzip (and, when the brotli package is installed, brotli) copies of
+the static assets next to the originals, e.g. static/script.js.gz, so the
+server can send them without compressing per request.
+
+    python scripts/precompress_static.py
+
+Copies older than their source are ignored by the server, so re-run this
+after editing the assets (start.sh / start.bat do so on every start).
+"""
+
+import gzip
+import os
+
+ROOT       = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STATIC_DIR = os.path.join(ROOT, "static")
+
+EXTENSIONS = (".js", ".css", ".html", ".svg", ".json")
+
+
+def main():
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    for name in sorted(os.listdir(STATIC_DIR)):
+        if not name.endswith(EXTENSIONS):
+            continue
+        path = os.path.join(STATIC_DIR, name)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        sizes = []
+        with open(path + ".gz", "wb") as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        sizes.append(f"gzip {os.path.getsize(path + '.gz')}")
+        if brotli is not None:
+            with open(path + ".br", "wb") as f:
+                f.write(brotli.compress(data, quality=11))
+            sizes.append(f"br {os.path.getsize(path + '.br')}")
+        print(f"{name}: {len(data)} bytes -> {', '.join(sizes)}")
+
+    if brotli is None:
+        print("(brotli not installed; wrote gzip copies only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 @echo off
 echo Installing dependencies...
 pip install -r requirements.txt
+echo Compiling tendency constants...
+python -m engine.tendency_master
+echo Precompressing static assets...
+python scripts/precompress_static.py
 echo Starting NBA 2K26 Tendency Generator...
 python app.py
 pause
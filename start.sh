@@ -1,5 +1,9 @@
 #!/bin/bash
 echo "Installing dependencies..."
 pip3 install -r requirements.txt
+echo "Compiling tendency constants..."
+python3 -m engine.tendency_master
+echo "Precompressing static assets..."
+python3 scripts/precompress_static.py
 echo "Starting NBA 2K26 Tendency Generator..."
 python3 app.py
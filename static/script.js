@@ -7,6 +7,8 @@ const API = {
   exportCsv:     '/api/export/csv',
   exportExcel:   '/api/export/excel',
   bulkGenerate:  '/api/bulk-generate',
+  jobs:          '/api/jobs',
+  tendencyMaster: '/api/tendency-master',
 };
 
 const NBA_TEAMS = [
@@ -29,7 +31,7 @@ const CATEGORIES = {
   'Defense':             ['Takes Charge','Foul','Hard Foul','Pass Interception','On-Ball Steal','Blocked Shot','Contest Shot'],
 };
 
-// Hard caps (mirrors engine/constants.py)
+// Hard caps (mirrors engine/constants.py; refreshed from /api/tendency-master on load)
 const HARD_CAPS = {
   'Shot':75,'Touch':65,'Shot Close':60,'Shot Under':60,
   'Shot Close Left':50,'Shot Close Middle':50,'Shot Close Right':50,
@@ -102,6 +104,12 @@ NBA_TEAMS.forEach(t => {
   teamSelect.appendChild(opt);
 });
 
+// Pick up cap edits compiled from the Tendency Master workbook
+fetch(API.tendencyMaster)
+  .then(res => res.json())
+  .then(data => { if (data.hard_caps) Object.assign(HARD_CAPS, data.hard_caps); })
+  .catch(() => {});
+
 /* ── Search ──────────────────────────────────────────────────────────── */
 searchInput.addEventListener('input', () => {
   clearTimeout(searchTimer);
@@ -165,11 +173,9 @@ async function runGenerate(playerId, playerName) {
   showLoading('Fetching player data…');
   resultsSection.classList.add('hidden');
   try {
-    const res  = await fetch(API.generate, {
-      method:  'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body:    JSON.stringify({ player_id: playerId, player_name: playerName }),
-    });
+    // GET so the browser cache can revalidate stored results (ETag → 304)
+    const qs   = new URLSearchParams({ player_id: playerId, player_name: playerName || '' });
+    const res  = await fetch(`${API.generate}?${qs}`);
     const data = await res.json();
     if (data.error) throw new Error(data.error);
     currentResult = data;
@@ -304,7 +310,7 @@ refreshBtn.addEventListener('click', async () => {
     const res  = await fetch(API.refreshRoster);
     const data = await res.json();
     if (data.error) throw new Error(data.error);
-    alert(`Roster refreshed: ${data.count} players loaded.`);
+    alert(`Roster refresh started in the background (${data.count} players cached).`);
   } catch (err) {
     alert('Refresh error: ' + err.message);
   } finally {
@@ -440,33 +446,40 @@ bulkBtn.addEventListener('click', async () => {
   bulkBtn.disabled = true;
 
   try {
-    const res  = await fetch(API.bulkGenerate, {
+    const res = await fetch(API.jobs, {
       method:  'POST',
       headers: { 'Content-Type': 'application/json' },
       body:    JSON.stringify({ team }),
     });
-    const data = await res.json();
-    if (data.error) throw new Error(data.error);
-
-    const total = data.length;
-    data.forEach((p, i) => {
-      progressBar.style.width = `${Math.round((i + 1) / total * 100)}%`;
-      progressLabel.textContent = `${i + 1} / ${total}`;
-
-      const card = document.createElement('div');
-      card.className = 'bulk-player-card';
-      card.innerHTML = `<div class="bulk-player-name">${esc(p.name)}</div>
-        <div class="bulk-player-meta">${esc(p.position||'')} · ${esc(p.team||'')} · ${Object.keys(p.tendencies||{}).length} tendencies</div>`;
-      card.addEventListener('click', () => {
-        currentResult = p;
-        renderResults(p);
-        window.scrollTo({ top: 0, behavior: 'smooth' });
-      });
-      bulkResults.appendChild(card);
-    });
+    const job = await res.json();
+    if (job.error) throw new Error(job.error);
+
+    // Poll job progress and append results as players finish
+    let after = 0;
+    let status = job;
+    while (true) {
+      const rres  = await fetch(`${API.jobs}/${job.job_id}/results?after=${after}`);
+      const batch = await rres.json();
+      if (batch.error) throw new Error(batch.error);
+      after = batch.next;
+      batch.results.forEach(addBulkCard);
+      batch.errors.forEach(e => console.warn(`Bulk: ${e.name} failed: ${e.error}`));
+
+      const sres = await fetch(`${API.jobs}/${job.job_id}?players=0`);
+      status = await sres.json();
+      if (status.error) throw new Error(status.error);
+      const finished = status.done + status.failed;
+      progressBar.style.width = `${status.total ? Math.round(finished / status.total * 100) : 100}%`;
+      progressLabel.textContent = `${finished} / ${status.total}`;
+
+      if (status.status === 'done' || status.status === 'failed') {
+        if (after < finished) continue;   // drain results that finished since the last fetch
+        break;
+      }
+      await new Promise(r => setTimeout(r, 1500));
+    }
 
-    progressBar.style.width = '100%';
-    progressLabel.textContent = `${total} / ${total}`;
+    if (status.failed) progressLabel.textContent += ` (${status.failed} failed)`;
   } catch (err) {
     alert('Bulk error: ' + err.message);
   } finally {
@@ -474,6 +487,19 @@ bulkBtn.addEventListener('click', async () => {
   }
 });
 
+function addBulkCard(p) {
+  const card = document.createElement('div');
+  card.className = 'bulk-player-card';
+  card.innerHTML = `<div class="bulk-player-name">${esc(p.name)}</div>
+    <div class="bulk-player-meta">${esc(p.position||'')} · ${esc(p.team||'')} · ${Object.keys(p.tendencies||{}).length} tendencies</div>`;
+  card.addEventListener('click', () => {
+    currentResult = p;
+    renderResults(p);
+    window.scrollTo({ top: 0, behavior: 'smooth' });
+  });
+  bulkResults.appendChild(card);
+}
+
 /* ── Helpers ─────────────────────────────────────────────────────────── */
 function showLoading(msg) {
   loadingMsg.textContent = msg || 'Loading…';
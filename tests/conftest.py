@@ -0,0 +1,35 @@
+"""
+Shared fixtures.  Tests run offline: nothing here (or in any test) talks to
+the NBA Stats API, and every on-disk store is redirected to a temp dir.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point every module's DATA_DIR (and the tendency store DB) at a temp dir."""
+    from engine import player_search, shotdetail_loader, tendency_matrix, tendency_store
+
+    for module in (player_search, shotdetail_loader, tendency_matrix, tendency_store):
+        monkeypatch.setattr(module, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(player_search, "CACHE_FILE", str(tmp_path / "players_cache.json"))
+    monkeypatch.setattr(tendency_store, "DB_PATH", str(tmp_path / "tendencies.sqlite3"))
+    monkeypatch.setattr(tendency_store, "_initialized", False)
+    monkeypatch.setattr(tendency_matrix, "_matrices", {})
+    monkeypatch.setattr(player_search, "_snapshots", {})
+    return tmp_path
+
+
+@pytest.fixture
+def client(data_dir):
+    """Flask test client over temp-dir stores."""
+    import app
+
+    app.app.config["TESTING"] = True
+    return app.app.test_client()
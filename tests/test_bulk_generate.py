@@ -0,0 +1,123 @@
+import json
+import time
+
+import pytest
+
+import app as app_module
+from engine import bulk_runner, exporters, player_search
+from engine.player_search import RosterSnapshot
+
+SEASON = "2024-25"
+ROSTER = [{"id": pid, "name": f"Player {pid}", "team_abbrev": team, "position": "SF"}
+          for pid, team in ((1, "BOS"), (2, "BOS"), (3, "BOS"), (4, "LAL"))]
+
+
+@pytest.fixture
+def bulk(client, monkeypatch):
+    """Rostered players and a stub iter_bulk: player 2 fails, results arrive in reverse order."""
+    player_search._snapshots[SEASON] = RosterSnapshot(SEASON, ROSTER, time.time())
+
+    def iter_bulk(players, season="2024-25", stats=None, **kwargs):
+        stats = stats if stats is not None else {}
+        stats.update(total=len(players), done=0, failed=0, skipped=0)
+        for p in reversed(players):
+            if p["id"] == 2:
+                stats["failed"] += 1
+                yield p, None, "RuntimeError: boom"
+            else:
+                stats["done"] += 1
+                yield p, {"player_id": p["id"], "name": p["name"], "team": p.get("team_abbrev", ""),
+                          "tendencies": {"Shot": p["id"]}}, None
+
+    monkeypatch.setattr(bulk_runner, "iter_bulk", iter_bulk)
+    return client
+
+
+def _post(client, body, query="", headers=None):
+    return client.post(f"/api/bulk-generate{query}", json={"season": SEASON, **body}, headers=headers or {})
+
+
+def test_ndjson_stream(bulk):
+    response = _post(bulk, {"team": "BOS"}, "?stream=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Cache-Control"] == "no-cache"
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(e["type"], e.get("player_id")) for e in events] == [
+        ("result", 3), ("error", 2), ("result", 1), ("done", None)]
+    assert events[1]["error"] == "RuntimeError: boom"
+    assert (events[-1]["total"], events[-1]["done"], events[-1]["failed"]) == (3, 2, 1)
+
+
+def test_sse_stream_from_accept_header(bulk):
+    response = _post(bulk, {"team": "LAL"}, headers={"Accept": "text/event-stream"})
+    assert response.mimetype == "text/event-stream"
+    frames = response.get_data(as_text=True).split("\n\n")
+    assert frames[0].startswith("event: result\ndata: ")
+    assert json.loads(frames[0].split("data: ", 1)[1])["player_id"] == 4
+    assert frames[1].startswith("event: done\n")
+
+
+def test_streams_are_not_capped(bulk, monkeypatch):
+    monkeypatch.setattr(app_module, "BULK_GENERATION_LIMIT", 1)
+    lines = _post(bulk, {"all": True}, "?stream=ndjson").get_data(as_text=True).splitlines()
+    assert len(lines) == len(ROSTER) + 1
+
+
+def test_default_response_reports_errors_in_input_order(bulk):
+    body = _post(bulk, {"team": "BOS"}).get_json()
+    assert [r["player_id"] for r in body["results"]] == [1, 3]
+    assert body["errors"] == [{"player_id": 2, "name": "Player 2", "error": "RuntimeError: boom"}]
+
+
+def test_oversized_request_is_rejected_not_truncated(bulk, monkeypatch):
+    monkeypatch.setattr(app_module, "BULK_GENERATION_LIMIT", 3)
+    response = _post(bulk, {"all": True})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["players"] == len(ROSTER)
+    assert "/api/jobs" in body["error"]
+
+
+def test_compact_responses_carry_errors(bulk):
+    table = _post(bulk, {"team": "BOS"}, "?format=columnar").get_json()
+    assert [p[0] for p in table["players"]] == [1, 3]
+    assert [e["player_id"] for e in table["errors"]] == [2]
+
+    packed = _post(bulk, {"team": "BOS"}, "?format=packed").get_data()
+    assert exporters.unpack(packed)["errors"] == table["errors"]
+
+
+def test_players_required(bulk):
+    assert _post(bulk, {}).status_code == 400
+
+
+# ── Batch generate ────────────────────────────────────────────────────────────
+
+def _batch(client, players, **body):
+    return client.post("/api/batch-generate", json={"season": SEASON, "players": players, **body})
+
+
+def test_batch_returns_one_entry_per_request_in_order(bulk):
+    player_search._snapshots["2023-24"] = RosterSnapshot("2023-24", ROSTER[:1], time.time())
+    response = _batch(bulk, [3, {"player_id": 2}, {"player_name": "player 4"},
+                             {"player_name": "Nobody Atall"}, {"player_id": 1, "season": "2023-24"}])
+    entries = response.get_json()["results"]
+    assert [(e["player_id"], e["status"]) for e in entries] == [
+        (3, "ok"), (2, "error"), (4, "ok"), (None, "error"), (1, "ok")]
+    assert entries[0]["result"]["name"] == "Player 3"
+    assert entries[1]["error"] == "RuntimeError: boom"
+    assert entries[3]["error"] == "Player not found: Nobody Atall"
+    assert entries[4]["season"] == "2023-24"
+    assert response.get_json()["stats"]["total"] == 4
+
+
+@pytest.mark.parametrize("players", [[], "1,2", None])
+def test_batch_requires_a_list(bulk, players):
+    assert _batch(bulk, players).status_code == 400
+
+
+def test_batch_rejects_oversized_requests(bulk, monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_GENERATION_LIMIT", 2)
+    response = _batch(bulk, [1, 2, 3])
+    assert response.status_code == 400
+    assert "/api/jobs" in response.get_json()["error"]
@@ -0,0 +1,132 @@
+import multiprocessing
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from engine import bulk_runner, shotdetail_loader, tendency_calculator
+
+SEASON = "2024-25"
+
+
+class FakePool:
+    """Stands in for the process pool: futures that hang, or fail like a dead worker."""
+
+    def __init__(self, mode):
+        self.mode       = mode
+        self.submitted  = 0
+        self.terminated = False
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        future = Future()
+        if self.mode == "broken":
+            future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.terminated = True
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    """Offline stages: gather fails for negative ids, compute echoes the inputs."""
+    gathered = []
+
+    def gather(player_id, player_name, season):
+        gathered.append(player_id)
+        if player_id < 0:
+            raise ValueError("no such player")
+        return {"player_id": player_id, "season": season, "name": player_name}
+
+    def compute(inputs, shotdetail_data=None, provenance=False):
+        result = {"player_id": inputs["player_id"], "name": inputs["name"]}
+        if provenance:
+            result["provenance"] = {"inputs": inputs}
+        return result
+
+    monkeypatch.setattr(tendency_calculator, "gather_player_inputs", gather)
+    monkeypatch.setattr(tendency_calculator, "compute_player_tendencies", compute)
+    monkeypatch.setattr(shotdetail_loader, "shotdetail_csv_path", lambda year: None)
+    monkeypatch.setattr(shotdetail_loader, "load_players_shotdetail", lambda ids, season_year: {})
+    monkeypatch.setattr(bulk_runner, "_get_cpu_pool", lambda: None)
+    monkeypatch.setattr(bulk_runner, "BATCH_SIZE", 2)
+    return gathered
+
+
+def _players(*ids):
+    return [{"id": pid, "name": f"Player {pid}"} for pid in ids]
+
+
+def test_every_player_is_yielded_once_with_stats(runner):
+    stats = {}
+    out = list(bulk_runner.iter_bulk(_players(1, 2, -3, 4, 5), season=SEASON, stats=stats))
+    assert sorted(p["id"] for p, _, _ in out) == [-3, 1, 2, 4, 5]
+    errors = {p["id"]: error for p, result, error in out if error}
+    assert errors == {-3: "ValueError: no such player"}
+    assert all(result["player_id"] == p["id"] for p, result, error in out if not error)
+    assert (stats["total"], stats["done"], stats["failed"], stats["skipped"]) == (5, 4, 1, 0)
+
+
+def test_should_compute_skips_before_the_compute_stage(runner):
+    stats = {}
+    out = list(bulk_runner.iter_bulk(_players(1, 2, 3), season=SEASON, stats=stats,
+                                     should_compute=lambda p, inputs: p["id"] != 2))
+    assert {p["id"]: result is None for p, result, _ in out} == {1: False, 2: True, 3: False}
+    assert (stats["done"], stats["skipped"]) == (2, 1)
+
+
+def test_provenance_is_passed_to_compute(runner):
+    (_, result, _), = bulk_runner.iter_bulk(_players(1), season=SEASON, provenance=True)
+    assert result["provenance"]["inputs"]["player_id"] == 1
+
+
+def test_run_bulk_keeps_input_order(runner):
+    results, errors, stats = bulk_runner.run_bulk(_players(5, 4, -1, 3), season=SEASON)
+    assert [r["player_id"] for r in results] == [5, 4, 3]
+    assert errors == [{"player_id": -1, "name": "Player -1", "error": "ValueError: no such player"}]
+
+
+def test_stuck_batch_times_out_and_is_computed_in_process(runner, monkeypatch):
+    pool = FakePool("hang")
+    monkeypatch.setattr(bulk_runner, "_get_cpu_pool", lambda: pool)
+    monkeypatch.setattr(bulk_runner, "_cpu_pool", pool)
+    monkeypatch.setattr(bulk_runner, "COMPUTE_TIMEOUT", 0.05)
+    out = list(bulk_runner.iter_bulk(_players(1, 2, 3), season=SEASON))
+    assert sorted(result["player_id"] for _, result, _ in out) == [1, 2, 3]
+    assert pool.submitted >= 1 and pool.terminated
+
+
+def test_broken_pool_batch_is_recomputed_in_process(runner, monkeypatch):
+    pool = FakePool("broken")
+    monkeypatch.setattr(bulk_runner, "_get_cpu_pool", lambda: pool)
+    stats = {}
+    out = list(bulk_runner.iter_bulk(_players(1, 2, 3), season=SEASON, stats=stats))
+    assert sorted(result["player_id"] for _, result, _ in out) == [1, 2, 3]
+    assert stats["done"] == 3 and pool.submitted >= 1
+
+
+def test_workers_are_never_forked(monkeypatch):
+    monkeypatch.setattr(bulk_runner, "_cpu_pool", None)
+    pool = bulk_runner._get_cpu_pool()
+    try:
+        method = pool._mp_context.get_start_method()
+    finally:
+        bulk_runner._reset_cpu_pool()
+    assert method == ("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+def test_terminate_kills_a_hung_worker(monkeypatch):
+    monkeypatch.setattr(bulk_runner, "_cpu_pool", None)
+    monkeypatch.setattr(bulk_runner, "CPU_WORKERS", 1)
+    pool = bulk_runner._get_cpu_pool()
+    hung = pool.submit(time.sleep, 60)
+    queue = bulk_runner._cpu_pids
+    pid = queue.get()            # reported by the worker as it starts
+    queue.put(pid)
+
+    bulk_runner._reset_cpu_pool(terminate=True)
+    assert bulk_runner._cpu_pool is None
+    with pytest.raises(BrokenProcessPool):
+        hung.result(timeout=10)
@@ -0,0 +1,114 @@
+import gzip
+import os
+
+import pytest
+
+import app as app_module
+from engine import tendency_store
+
+SEASON = "2024-25"
+# Large enough to pass COMPRESS_MIN_BYTES once serialized
+RESULT = {"player_id": 7, "name": "Ann Alpha", "team": "BOS", "position": "PG",
+          "tendencies": {f"Tendency {i}": i % 100 for i in range(200)}}
+
+
+@pytest.fixture
+def stored(client):
+    tendency_store.put(RESULT, season=SEASON)
+    return f"/api/generate?player_id=7&season={SEASON}"
+
+
+def test_gzip_when_accepted(client, stored, monkeypatch):
+    monkeypatch.setattr(app_module, "_brotli", lambda: None)
+    plain = client.get(stored)
+    packed = client.get(stored, headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in packed.headers["Vary"]
+    assert gzip.decompress(packed.data) == plain.data
+    assert len(packed.data) < len(plain.data)
+
+
+def test_compressed_etag_is_weak_and_still_revalidates(client, stored, monkeypatch):
+    monkeypatch.setattr(app_module, "_brotli", lambda: None)
+    headers = {"Accept-Encoding": "gzip"}
+    etag = client.get(stored, headers=headers).headers["ETag"]
+    assert etag.startswith('W/"')
+    assert client.get(stored, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_brotli_preferred_when_available(client, stored):
+    brotli = pytest.importorskip("brotli")
+    response = client.get(stored, headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.data) == client.get(stored).data
+
+
+def test_brotli_falls_back_to_gzip_without_the_module(client, stored, monkeypatch):
+    monkeypatch.setattr(app_module, "_brotli", lambda: None)
+    response = client.get(stored, headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert client.get(stored, headers={"Accept-Encoding": "br"}).headers.get("Content-Encoding") is None
+
+
+def test_small_bodies_are_not_compressed(client, stored, monkeypatch):
+    monkeypatch.setattr(app_module, "COMPRESS_MIN_BYTES", 10 ** 6)
+    response = client.get(stored, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_streamed_responses_are_not_compressed(monkeypatch):
+    # NDJSON / SSE / bulk CSV streams must reach the client as produced
+    monkeypatch.setattr(app_module, "COMPRESS_MIN_BYTES", 0)
+    with app_module.app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = app_module.Response(iter(["a,b\n"] * 1000), mimetype="text/csv")
+        assert "Content-Encoding" not in app_module._compress(response).headers
+
+
+def test_file_downloads_are_compressed(client, monkeypatch):
+    monkeypatch.setattr(app_module, "_brotli", lambda: None)
+    response = client.post("/api/export/csv", json={"name": "Ann", "tendencies": RESULT["tendencies"]},
+                           headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).decode().startswith("Tendency,Value\n")
+
+
+def test_precompressed_static_file(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "_brotli", lambda: None)
+    monkeypatch.setattr(app_module.app, "static_folder", str(tmp_path))
+    source = "console.log('hi');\n" * 200
+    (tmp_path / "app.js").write_text(source)
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(source.encode()))
+
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.mimetype in ("text/javascript", "application/javascript")
+    assert gzip.decompress(response.data).decode() == source
+
+    # A copy older than its source is ignored (compressed on the fly instead)
+    os.utime(tmp_path / "app.js.gz", (0, 0))
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert gzip.decompress(response.data).decode() == source
+    assert client.get("/static/app.js").data.decode() == source
+
+
+@pytest.mark.parametrize("encoding", [None, "gzip"])
+def test_every_representation_revalidates_with_the_etag_it_was_sent(client, stored, tmp_path, monkeypatch,
+                                                                    encoding):
+    monkeypatch.setattr(app_module, "_brotli", lambda: None)
+    monkeypatch.setattr(app_module.app, "static_folder", str(tmp_path))
+    source = "console.log('hi');\n" * 200
+    (tmp_path / "app.js").write_text(source)
+    (tmp_path / "pre.js").write_text(source)
+    (tmp_path / "pre.js.gz").write_bytes(gzip.compress(source.encode()))
+
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    for url in (stored, "/static/app.js", "/static/pre.js"):
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"'), url
+        again = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert again.status_code == 304, url
+        assert again.headers["ETag"] == etag, url
@@ -0,0 +1,136 @@
+import csv
+import io
+import zipfile
+
+import pytest
+
+from engine import exporters
+from engine.constants import TENDENCY_ORDER
+
+FIRST, SECOND = TENDENCY_ORDER[0], TENDENCY_ORDER[1]
+
+RESULTS = [
+    {"player_id": 1, "name": "Ann Alpha",  "team": "BOS", "position": "PG", "tendencies": {FIRST: 40, SECOND: 7}},
+    {"player_id": 2, "name": "Bo Beta",    "team": "LAL", "position": "C",  "tendencies": {FIRST: 90}},
+    {"player_id": 3, "name": "Cy Gamma",   "team": "BOS", "position": "SF", "tendencies": {}},
+]
+
+
+def _read_xlsx(data):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True)
+    return {ws.title: [list(r) for r in ws.iter_rows(values_only=True)] for ws in wb.worksheets}
+
+
+def test_iter_csv_streams_header_then_one_chunk_per_row():
+    chunks = list(exporters.iter_csv(iter(RESULTS)))
+    assert len(chunks) == 1 + len(RESULTS)
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == exporters.HEADER
+    assert rows[1][:6] == ["Ann Alpha", "BOS", "PG", "1", "40", "7"]
+    assert rows[2][4:6] == ["90", ""]       # missing tendencies are left blank
+
+
+def test_results_xlsx_wide():
+    buf = io.BytesIO()
+    assert exporters.results_xlsx(iter(RESULTS), buf) == 3
+    sheets = _read_xlsx(buf.getvalue())
+    assert list(sheets) == ["Tendencies"]
+    rows = sheets["Tendencies"]
+    assert rows[0] == exporters.HEADER
+    assert [r[0] for r in rows[1:]] == ["Ann Alpha", "Bo Beta", "Cy Gamma"]
+    assert rows[1][4:6] == [40, 7]
+
+
+def test_results_xlsx_one_sheet_per_team_in_order_of_appearance():
+    buf = io.BytesIO()
+    assert exporters.results_xlsx(iter(RESULTS), buf, layout="teams") == 3
+    sheets = _read_xlsx(buf.getvalue())
+    assert list(sheets) == ["BOS", "LAL"]
+    assert [r[0] for r in sheets["BOS"]] == ["Player", "Ann Alpha", "Cy Gamma"]
+    assert [r[0] for r in sheets["LAL"]] == ["Player", "Bo Beta"]
+
+
+def test_results_xlsx_empty_and_bad_layout():
+    buf = io.BytesIO()
+    assert exporters.results_xlsx([], buf, layout="teams") == 0
+    assert _read_xlsx(buf.getvalue()) == {"Tendencies": [exporters.HEADER]}
+    with pytest.raises(ValueError):
+        exporters.results_xlsx(RESULTS, io.BytesIO(), layout="tall")
+
+
+def test_sheet_titles_are_made_valid():
+    assert exporters._sheet_title("A/B:C*D?[E]") == "A_B_C_D__E_"
+    assert exporters._sheet_title("") == "Free Agents"
+    assert len(exporters._sheet_title("x" * 40)) == 31
+
+
+# ── Direct SpreadsheetML writer ───────────────────────────────────────────────
+
+def test_write_xlsx_cell_types_and_escaping():
+    buf = io.BytesIO()
+    exporters.write_xlsx([("Mixed <&>", [["a", 1, 2.5, True, None, "<b>&\"x\""]])], buf)
+    assert _read_xlsx(buf.getvalue()) == {"Mixed <&>": [["a", 1, 2.5, True, None, "<b>&\"x\""]]}
+
+
+def test_write_xlsx_numpy_scalars_and_non_finite_values():
+    np = pytest.importorskip("numpy")
+    buf = io.BytesIO()
+    row = [np.int64(7), np.float32(0.5), np.bool_(True), float("nan"), float("inf"), np.float64("-inf"), 1e-05]
+    exporters.write_xlsx([("Numbers", [row])], buf)
+    assert _read_xlsx(buf.getvalue()) == {"Numbers": [[7, 0.5, True, None, None, None, 1e-05]]}
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as zf:
+        sheet = zf.read("xl/worksheets/sheet1.xml").decode()
+    assert "nan" not in sheet and "inf" not in sheet and "inlineStr" not in sheet
+
+
+def test_tendency_xlsx_single_player():
+    buf = io.BytesIO()
+    exporters.tendency_xlsx({FIRST: 40, SECOND: 7}, buf)
+    assert _read_xlsx(buf.getvalue())["Tendencies"] == [["Tendency", "Value"], [FIRST, 40], [SECOND, 7]]
+
+
+def test_exporting_imports_neither_pandas_nor_openpyxl():
+    import os
+    import subprocess
+    import sys
+
+    code = ("import io, sys; from engine import exporters; "
+            "exporters.tendency_xlsx({'x': 1}, io.BytesIO()); "
+            "exporters.results_xlsx([{'name': 'a', 'team': 'BOS'}], io.BytesIO(), layout='teams'); "
+            "print(sorted(m for m in ('pandas', 'openpyxl') if m in sys.modules))")
+    root = os.path.join(os.path.dirname(__file__), "..")
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+# ── Compact bulk responses ────────────────────────────────────────────────────
+
+def test_columnar():
+    table = exporters.columnar(RESULTS)
+    assert table["columns"] == list(TENDENCY_ORDER)
+    assert table["players"][1] == [2, "Bo Beta", "LAL", "C"]
+    assert table["values"][0][:2] == [40, 7]
+    assert table["values"][2] == [0] * len(TENDENCY_ORDER)
+
+
+def test_packed_round_trip():
+    data = exporters.packed(RESULTS)
+    assert data[:4] == exporters.PACKED_MAGIC
+    assert exporters.unpack(data) == exporters.columnar(RESULTS)
+
+    errors = [{"player_id": 9, "name": "x", "error": "boom"}]
+    assert "errors" not in exporters.columnar(RESULTS)
+    assert exporters.unpack(exporters.packed(RESULTS, errors))["errors"] == errors
+
+
+def test_packed_values_are_clamped_to_uint8():
+    results = [{"player_id": 9, "tendencies": {FIRST: 300, SECOND: -5, TENDENCY_ORDER[2]: 255}}]
+    values = exporters.unpack(exporters.packed(results))["values"][0]
+    assert values[:3] == [255, 0, 255]
+
+
+def test_packed_empty_and_foreign_bytes():
+    assert exporters.unpack(exporters.packed([]))["values"] == []
+    with pytest.raises(ValueError):
+        exporters.unpack(b"NOPE" + bytes(10))
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from engine import player_search, tendency_store
+from engine.player_search import RosterSnapshot
+
+SEASON = "2024-25"
+RESULT = {"player_id": 7, "name": "Ann Alpha", "team": "BOS", "position": "PG", "tendencies": {"Shot": 50}}
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    """Stub tendency_store.generate(): stores a result and records the call."""
+    calls = []
+
+    def generate(player_id, player_name, season="2024-25"):
+        calls.append(player_id)
+        result = dict(RESULT, player_id=player_id)
+        tendency_store.put(result, season=season)
+        return result
+
+    monkeypatch.setattr(tendency_store, "generate", generate)
+    return calls
+
+
+def _get(client, headers=None, **params):
+    query = "&".join(f"{k}={v}" for k, v in {"player_id": 7, "season": SEASON, **params}.items())
+    return client.get(f"/api/generate?{query}", headers=headers or {})
+
+
+def test_stored_result_has_validators(client, generated):
+    tendency_store.put(RESULT, season=SEASON)
+    response = _get(client)
+    assert response.status_code == 200
+    assert response.get_json()["tendencies"] == {"Shot": 50}
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.headers["ETag"] and response.headers["Last-Modified"]
+    assert generated == []
+
+
+def test_revalidation_answers_304_until_the_row_changes(client, generated):
+    tendency_store.put(RESULT, season=SEASON)
+    etag = _get(client).headers["ETag"]
+
+    response = _get(client, {"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+    time.sleep(0.01)
+    tendency_store.put(dict(RESULT, tendencies={"Shot": 51}), season=SEASON)
+    response = _get(client, {"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["tendencies"] == {"Shot": 51}
+
+
+def test_if_modified_since(client, generated):
+    tendency_store.put(RESULT, season=SEASON)
+    last_modified = _get(client).headers["Last-Modified"]
+    assert _get(client, {"If-Modified-Since": last_modified}).status_code == 304
+    assert _get(client, {"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+
+
+def test_miss_generates_once_then_serves_the_store(client, generated):
+    first = _get(client)
+    assert first.status_code == 200 and generated == [7]
+    second = _get(client, {"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304 and generated == [7]
+
+
+def test_refresh_only_on_post(client, generated):
+    tendency_store.put(RESULT, season=SEASON)
+    assert _get(client, refresh=1).status_code == 200
+    assert generated == []
+
+    response = client.post("/api/generate", json={"player_id": 7, "season": SEASON, "refresh": True})
+    assert response.status_code == 200
+    assert generated == [7]
+
+
+def test_search_is_publicly_cacheable_and_revalidated(client):
+    player_search._snapshots[SEASON] = RosterSnapshot(
+        SEASON, [{"id": 7, "name": "Ann Alpha", "team_abbrev": "BOS", "position": "PG"}], time.time())
+    response = client.get(f"/api/search?q=ann&season={SEASON}")
+    assert response.get_json()[0]["player_id"] == 7
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+
+    again = client.get(f"/api/search?q=ann&season={SEASON}", headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+    # Storing the player changes the "stored" flag, so the ETag changes too
+    tendency_store.put(RESULT, season=SEASON)
+    again = client.get(f"/api/search?q=ann&season={SEASON}", headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 200
+    assert again.get_json()[0]["stored"] is True
+
+
+def test_index_and_versioned_assets(client):
+    response = client.get("/")
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert client.get("/", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    assert client.get("/static/script.js").headers["Cache-Control"] == "public, no-cache"
+    assert client.get("/static/script.js?v=1").headers["Cache-Control"] == "public, max-age=31536000, immutable"
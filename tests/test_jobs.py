@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from engine import bulk_runner, jobs
+
+SEASON = "2024-25"
+
+
+@pytest.fixture
+def job_db(tmp_path, monkeypatch):
+    """Jobs in a temp DB, with iter_bulk stubbed: player ids < 0 fail."""
+    monkeypatch.setattr(jobs, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "DB_PATH", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(jobs, "_started", False)
+    monkeypatch.setattr(jobs, "_executor", None)
+
+    started = []
+
+    def iter_bulk(players, season="2024-25", stats=None, on_start=None, **kwargs):
+        # Finish in reverse order, as a parallel run may
+        for p in reversed(players):
+            if on_start:
+                on_start(p)
+            started.append(p["id"])
+            if p["id"] < 0:
+                yield p, None, "ValueError: no such player"
+            else:
+                yield p, {"player_id": p["id"], "name": p["name"], "tendencies": {"Shot": p["id"]}}, None
+
+    monkeypatch.setattr(bulk_runner, "iter_bulk", iter_bulk)
+    iter_bulk.started = started
+    yield iter_bulk
+    if jobs._executor is not None:
+        jobs._executor.shutdown(wait=True)
+
+
+def _wait(job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.get_job(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish: {job}")
+
+
+def _players(*ids):
+    return [{"id": pid, "name": f"Player {pid}"} for pid in ids]
+
+
+def test_job_runs_to_done_with_per_player_status(job_db):
+    job = _wait(jobs.submit_job(_players(1, -2, 3), SEASON, team="BOS"))
+    assert (job["status"], job["total"], job["done"], job["failed"], job["pending"]) == ("done", 3, 2, 1, 0)
+    assert job["team"] == "BOS"
+    assert [(p["player_id"], p["status"]) for p in job["players"]] == [(1, "done"), (-2, "error"), (3, "done")]
+    assert job["players"][1]["error"] == "ValueError: no such player"
+
+
+def test_results_cursor_and_submission_order_export(job_db):
+    job_id = jobs.submit_job(_players(1, 2, 3), SEASON)
+    _wait(job_id)
+
+    results, errors, after = jobs.get_results(job_id)
+    assert [r["player_id"] for r in results] == [3, 2, 1]      # completion order
+    assert errors == [] and after == 3
+    assert jobs.get_results(job_id, after=after) == ([], [], 3)
+    assert [r["player_id"] for r in jobs.iter_results(job_id)] == [1, 2, 3]   # submission order
+
+
+def test_all_errors_fail_the_job_and_empty_jobs_are_done(job_db):
+    assert _wait(jobs.submit_job(_players(-1, -2), SEASON))["status"] == "failed"
+    assert jobs.get_job(jobs.submit_job([], SEASON))["status"] == "done"
+
+
+def test_unknown_job(job_db):
+    assert jobs.get_job("nope") is None
+    assert jobs.get_results("nope") is None
+
+
+def test_interrupted_players_are_resumed(job_db):
+    job_id = jobs.submit_job([], SEASON)
+    with jobs._connect() as conn:
+        conn.execute("UPDATE jobs SET status = 'running', total = 2 WHERE id = ?", (job_id,))
+        conn.executemany(
+            "INSERT INTO job_players (job_id, seq, player_id, player_name, status) VALUES (?, ?, ?, ?, ?)",
+            [(job_id, 0, 10, "Player 10", "running"), (job_id, 1, 11, "Player 11", "pending")])
+
+    assert jobs.resume_unfinished() == [job_id]
+    job = _wait(job_id)
+    assert (job["status"], job["done"]) == ("done", 2)
+    assert sorted(job_db.started) == [10, 11]
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from engine import nba_stats
+
+FRAME = pd.DataFrame({"PLAYER_ID": [1629029], "DRIVES": [20.5]})
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    monkeypatch.setattr(nba_stats, "_league_frames", {})
+    monkeypatch.setattr(nba_stats, "_frame_locks", {})
+    monkeypatch.setattr(nba_stats, "_fingerprints", {})
+
+
+def _fetcher(value=FRAME, delay=0.0):
+    def fetch():
+        fetch.calls += 1
+        time.sleep(delay)
+        return value
+    fetch.calls = 0
+    return fetch
+
+
+def test_frame_is_fetched_once_within_the_ttl(frames):
+    fetch = _fetcher()
+    key = ("pt_stats", "2024-25", "Drives")
+    assert nba_stats._league_frame(key, fetch) is FRAME
+    assert nba_stats._league_frame(key, fetch) is FRAME
+    assert fetch.calls == 1
+
+    # Other seasons and measures are separate frames
+    nba_stats._league_frame(("pt_stats", "2023-24", "Drives"), fetch)
+    nba_stats._league_frame(("pt_stats", "2024-25", "Passing"), fetch)
+    assert fetch.calls == 3
+
+
+def test_expired_frame_is_refetched(frames, monkeypatch):
+    fetch = _fetcher()
+    key = ("synergy", "2024-25", "Isolation")
+    nba_stats._league_frame(key, fetch)
+    fetched_at, df = nba_stats._league_frames[key]
+    nba_stats._league_frames[key] = (fetched_at - nba_stats.LEAGUE_FRAME_TTL_SECONDS - 1, df)
+    nba_stats._league_frame(key, fetch)
+    assert fetch.calls == 2
+
+
+def test_failed_fetch_is_not_cached(frames):
+    key = ("estimated_metrics", "2024-25", None)
+    empty = _fetcher(None)
+    for _ in range(3):
+        assert nba_stats._league_frame(key, empty) is None
+    assert empty.calls == 3
+
+    def broken():
+        raise ConnectionError("stats.nba.com timed out")
+
+    with pytest.raises(ConnectionError):
+        nba_stats._league_frame(key, broken)
+    assert nba_stats._league_frame(key, _fetcher()) is FRAME
+
+
+def test_empty_frame_is_not_cached(frames):
+    key = ("synergy", "2024-25", "Transition")
+    empty = _fetcher(FRAME.iloc[0:0])
+    assert nba_stats._league_frame(key, empty) is None
+    assert key not in nba_stats._league_frames
+    assert nba_stats._league_frame(key, empty) is None
+    assert empty.calls == 2
+
+    fetch = _fetcher()
+    assert nba_stats._league_frame(key, fetch) is FRAME
+    assert nba_stats._league_frame(key, fetch) is FRAME
+    assert fetch.calls == 1
+
+
+def test_concurrent_callers_share_one_fetch(frames):
+    fetch = _fetcher(delay=0.05)
+    key = ("player_stats", "2024-25", "Advanced")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(nba_stats._league_frame(key, fetch)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(r is FRAME for r in results) and len(results) == 8
+    assert fetch.calls == 1
+
+
+def test_fingerprints_are_reused_until_a_frame_changes(frames, monkeypatch):
+    league = {"a": FRAME, "b": pd.DataFrame({"PLAYER_ID": [1629029, 2544], "PTS": [28.1, 24.4]})}
+    monkeypatch.setattr(nba_stats, "_league_loaders", lambda season: [lambda: league["a"], lambda: league["b"]])
+
+    first = nba_stats.league_fingerprints("2024-25")
+    assert set(first) == {1629029, 2544}
+    assert nba_stats.league_fingerprints("2024-25") is first
+
+    league["b"] = pd.DataFrame({"PLAYER_ID": [1629029, 2544], "PTS": [28.1, 25.0]})
+    second = nba_stats.league_fingerprints("2024-25")
+    assert second is not first
+    assert second[1629029] == first[1629029] and second[2544] != first[2544]
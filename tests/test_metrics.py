@@ -0,0 +1,88 @@
+import pytest
+
+from engine import metrics
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    h = metrics.Histogram("job_seconds", "Job time.", ("kind",), buckets=(0.1, 1, 10))
+    for seconds in (0.05, 0.5, 0.5, 5, 50):
+        h.observe(seconds, kind="a")
+    assert list(h._samples()) == [
+        'job_seconds_bucket{kind="a",le="0.1"} 1',
+        'job_seconds_bucket{kind="a",le="1"} 3',
+        'job_seconds_bucket{kind="a",le="10"} 4',
+        'job_seconds_bucket{kind="a",le="+Inf"} 5',
+        'job_seconds_sum{kind="a"} 56.05',
+        'job_seconds_count{kind="a"} 5',
+    ]
+
+
+def test_histogram_boundary_goes_in_its_own_bucket_and_labels_are_separate():
+    h = metrics.Histogram("t_seconds", "T.", ("kind",), buckets=(1,))
+    h.observe(1, kind="b")
+    h.observe(2, kind="a")
+    assert list(h._samples()) == [
+        't_seconds_bucket{kind="a",le="1"} 0',
+        't_seconds_bucket{kind="a",le="+Inf"} 1',
+        't_seconds_sum{kind="a"} 2.0',
+        't_seconds_count{kind="a"} 1',
+        't_seconds_bucket{kind="b",le="1"} 1',
+        't_seconds_bucket{kind="b",le="+Inf"} 1',
+        't_seconds_sum{kind="b"} 1.0',
+        't_seconds_count{kind="b"} 1',
+    ]
+
+
+def test_histogram_timers_observe_on_error():
+    h = metrics.Histogram("op_seconds", "Op.", ("op",))
+
+    @h.timed(op="fail")
+    def fail():
+        raise RuntimeError
+
+    with h.time(op="ok"):
+        pass
+    with pytest.raises(RuntimeError):
+        fail()
+    assert {key: entry[-1] for key, entry in h._values.items()} == {("ok",): 1, ("fail",): 1}
+
+
+def test_counter_and_label_escaping():
+    c = metrics.Counter("things_total", "Things.", ("name",))
+    c.inc(name='say "hi"\n')
+    c.inc(2, name="plain")
+    assert c.value(name="plain") == 2
+    assert list(c._samples()) == ['things_total{name="plain"} 2',
+                                  'things_total{name="say \\"hi\\"\\n"} 1']
+    assert list(metrics.Counter("bare_total", "Bare.")._samples()) == ["bare_total 0"]
+
+
+def test_render_exposition_format():
+    metrics.cache_result("roster", True)
+    text = metrics.render()
+    assert text.endswith("\n")
+    assert "# TYPE process_start_time_seconds gauge" in text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert "# HELP cache_requests_total Cache lookups by cache and result (hit / miss).\n" in text
+    assert 'cache_requests_total{cache="roster",result="hit"} ' in text
+    # Every metric is declared once, HELP before TYPE
+    names = [line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")]
+    assert len(names) == len(set(names))
+
+
+@pytest.mark.parametrize("exc, throttled", [
+    (RuntimeError("429 Client Error: Too Many Requests"), True),
+    (TimeoutError("read timed out"), True),
+    (type("ReadTimeout", (Exception,), {})("x"), True),
+    (KeyError("resultSets"), False),
+])
+def test_is_throttle(exc, throttled):
+    assert metrics.is_throttle(exc) is throttled
+
+
+def test_metrics_endpoint_counts_requests(client):
+    client.get("/api/ready")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert 'http_request_duration_seconds_count{route="/api/ready",method="GET",status="' in response.get_data(as_text=True)
@@ -0,0 +1,158 @@
+import time
+
+import pytest
+
+from engine import player_search
+from engine.player_search import RosterSnapshot
+from engine.search_index import NameIndex
+
+SEASON = "2024-25"
+
+ROSTER = [
+    {"id": 203507, "name": "Giannis Antetokounmpo", "team_abbrev": "MIL", "position": "F"},
+    {"id": 203999, "name": "Nikola Jokić",          "team_abbrev": "DEN", "position": "C"},
+    {"id": 1628991, "name": "Jaren Jackson Jr.",    "team_abbrev": "MEM", "position": "F-C"},
+    {"id": 2544,   "name": "LeBron James",          "team_abbrev": "LAL", "position": "F"},
+    {"id": 1626164, "name": "Devin Booker",         "team_abbrev": "PHX", "position": "G"},
+    {"id": 1629029, "name": "Luka Dončić",          "team_abbrev": "DAL", "position": "G"},
+]
+
+
+@pytest.fixture
+def roster(data_dir, monkeypatch):
+    player_search._snapshots[SEASON] = RosterSnapshot(SEASON, ROSTER, time.time())
+    monkeypatch.setattr(player_search, "_get_static_index",
+                        lambda: NameIndex([{"id": 76375, "name": "Wilt Chamberlain"}]))
+    return ROSTER
+
+
+@pytest.mark.parametrize("name, player_id", [
+    ("Giannis Antetokounmpo", 203507),
+    ("nikola jokic", 203999),           # diacritics and case folded
+    ("Jaren Jackson", 1628991),         # suffix dropped
+    ("Jaren Jackson Jr", 1628991),
+    ("Greek Freak", 203507),            # nickname
+    ("king james", 2544),
+    ("Booker", 1626164),                # unique last name on the roster
+    ("Wilt Chamberlain", 76375),        # static (historical) list
+])
+def test_resolve_player(roster, name, player_id):
+    assert player_search.resolve_player(name, season=SEASON)["id"] == player_id
+
+
+@pytest.mark.parametrize("name", ["", "   ", "Nobody Atall"])
+def test_resolve_player_unresolved(roster, name):
+    assert player_search.resolve_player(name, season=SEASON) is None
+
+
+def test_names_win_over_nicknames(roster):
+    player_search._snapshots[SEASON] = RosterSnapshot(
+        SEASON, ROSTER + [{"id": 1, "name": "Kai Book"}], time.time())
+    assert player_search.resolve_player("book", season=SEASON)["id"] == 1              # last name
+    assert player_search.resolve_player("Booker", season=SEASON)["id"] == 1626164
+    assert player_search.resolve_player("bron", season=SEASON)["id"] == 2544           # no such name
+
+    player_search._snapshots[SEASON] = RosterSnapshot(SEASON, ROSTER, time.time())
+    assert player_search.resolve_player("book", season=SEASON)["id"] == 1626164        # nickname
+
+
+def test_ambiguous_last_name_is_not_guessed(roster):
+    player_search._snapshots[SEASON] = RosterSnapshot(
+        SEASON, ROSTER + [{"id": 1, "name": "Josh James"}], time.time())
+    assert player_search.resolve_player("James", season=SEASON) is None
+
+
+# ── Roster snapshots ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def fetches(data_dir, monkeypatch):
+    """Record roster fetches; each returns whatever the test put in `fetches.roster`."""
+    calls = []
+
+    def fetch(season):
+        calls.append(season)
+        return list(fetch.roster)
+
+    fetch.roster = ROSTER
+    monkeypatch.setattr(player_search, "_fetch_players", fetch)
+    monkeypatch.setattr(player_search, "_last_attempt", {})
+    monkeypatch.setattr(player_search, "_refreshing", set())
+    fetch.calls = calls
+    return fetch
+
+
+def _wait_for_refresh(season):
+    deadline = time.time() + 5
+    while season in player_search._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_first_load_fetches_and_persists(fetches):
+    snapshot = player_search.get_snapshot(SEASON)
+    assert fetches.calls == [SEASON]
+    assert len(snapshot.players) == len(ROSTER)
+
+    # A new process (empty memory) reads the file instead of fetching
+    player_search._snapshots.clear()
+    again = player_search.get_snapshot(SEASON)
+    assert fetches.calls == [SEASON]
+    assert again.version == snapshot.version
+
+
+def test_seasons_are_separate(fetches):
+    player_search.get_snapshot("2024-25")
+    fetches.roster = ROSTER[:2]
+    assert len(player_search.get_all_players("2023-24")) == 2
+    assert len(player_search.get_all_players("2024-25")) == len(ROSTER)
+    assert fetches.calls == ["2024-25", "2023-24"]
+
+
+def test_stale_snapshot_is_served_while_refreshing(fetches):
+    stale = RosterSnapshot(SEASON, ROSTER[:1], time.time() - player_search.ROSTER_TTL_SECONDS - 1)
+    player_search._snapshots[SEASON] = stale
+
+    assert player_search.get_snapshot(SEASON) is stale
+    _wait_for_refresh(SEASON)
+    assert fetches.calls == [SEASON]
+    assert len(player_search.get_snapshot(SEASON).players) == len(ROSTER)
+
+
+def test_failed_refresh_keeps_the_current_snapshot(fetches):
+    stale = RosterSnapshot(SEASON, ROSTER, 0)
+    player_search._snapshots[SEASON] = stale
+    fetches.roster = []
+
+    player_search.get_snapshot(SEASON)
+    _wait_for_refresh(SEASON)
+    assert fetches.calls == [SEASON]
+    assert player_search.get_snapshot(SEASON) is stale
+    # ...and the retry is throttled rather than hammering the API
+    assert not player_search._refresh_in_background(SEASON)
+
+
+# ── Roster bio ────────────────────────────────────────────────────────────────
+
+BIO = {"id": 1629029, "name": "Luka Doncic", "team_abbrev": "LAL", "position": "G",
+       "height": "6-6", "weight": "230"}
+
+
+def test_player_bio_from_snapshot(roster):
+    player_search._snapshots[SEASON] = RosterSnapshot(SEASON, ROSTER[:1] + [BIO], time.time())
+    assert player_search.get_player_bio(1629029, season=SEASON) == {
+        "name": "Luka Doncic", "team": "LAL", "position": "G", "height": "6-6", "weight": "230"}
+    # Unknown player, or a snapshot without bio fields (CommonAllPlayers fallback)
+    assert player_search.get_player_bio(1, season=SEASON) is None
+    player_search._snapshots[SEASON] = RosterSnapshot(SEASON, [dict(BIO, position="")], time.time())
+    assert player_search.get_player_bio(1629029, season=SEASON) is None
+
+
+def test_player_info_skips_per_player_calls_for_rostered_players(roster, monkeypatch):
+    from engine import nba_stats
+
+    def no_api(*args, **kwargs):
+        raise AssertionError("per-player NBA API call made")
+
+    monkeypatch.setattr(nba_stats, "api_call", no_api)
+    player_search._snapshots[SEASON] = RosterSnapshot(SEASON, [BIO], time.time())
+    info = nba_stats.get_player_info(1629029, season=SEASON)
+    assert (info["name"], info["team"], info["height"]) == ("Luka Doncic", "LAL", "6-6")
@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+from engine import (bulk_runner, nba_stats, player_search, shotdetail_loader, tendency_calculator,
+                    tendency_matrix, tendency_store)
+from engine.shot_profile import ShotProfile
+
+SEASON  = "2024-25"
+PLAYERS = [{"id": pid, "name": f"Player {pid}"} for pid in (1, 2, 3)]
+
+
+class League:
+    """What the NBA API and shotdetail data currently say, and what was asked of them."""
+
+    def __init__(self):
+        self.fingerprints = {pid: f"fp{pid}" for pid in (1, 2, 3)}
+        self.inputs       = {pid: {"pts": 10 * pid} for pid in (1, 2, 3)}
+        self.shotdetail   = {}
+        self.version      = "1+rules"
+        self.gathered     = []
+        self.computed     = []
+
+    def run(self, force=False):
+        self.gathered, self.computed = [], []
+        return tendency_store.precompute(SEASON, force=force)
+
+
+@pytest.fixture
+def league(data_dir, monkeypatch):
+    league = League()
+
+    def gather(player_id, player_name, season):
+        league.gathered.append(player_id)
+        return {"player_id": player_id, "season": season, "stats": dict(league.inputs[player_id])}
+
+    def compute(batch, provenance=False):
+        league.computed.extend(inputs["player_id"] for inputs in batch)
+        return [({"player_id": inputs["player_id"], "name": f"Player {inputs['player_id']}",
+                  "team": "BOS", "position": "SF", "tendencies": {"Shot": inputs["stats"]["pts"]}}, None)
+                for inputs in batch]
+
+    monkeypatch.setattr(player_search, "get_all_players", lambda season: PLAYERS)
+    monkeypatch.setattr(nba_stats, "league_fingerprints", lambda season: league.fingerprints)
+    monkeypatch.setattr(tendency_calculator, "gather_player_inputs", gather)
+    monkeypatch.setattr(tendency_calculator, "engine_version", lambda: league.version)
+    monkeypatch.setattr(shotdetail_loader, "shotdetail_csv_path", lambda year: None)
+    monkeypatch.setattr(shotdetail_loader, "load_season_store", lambda year: None)
+    monkeypatch.setattr(shotdetail_loader, "load_players_shotdetail",
+                        lambda ids, season_year: {pid: league.shotdetail[pid] for pid in ids
+                                                  if pid in league.shotdetail})
+    monkeypatch.setattr(bulk_runner, "_get_cpu_pool", lambda: None)
+    monkeypatch.setattr(bulk_runner, "_compute_batch", compute)
+    return league
+
+
+def test_first_run_computes_everyone(league):
+    stats = league.run()
+    assert sorted(league.computed) == [1, 2, 3]
+    assert (stats["total"], stats["done"], stats["skipped"]) == (3, 3, 0)
+    rows = tendency_store.stored_versions(SEASON)
+    assert all(row[0] and row[1] == "1+rules" and row[2] for row in rows.values())
+
+
+def test_unchanged_players_are_not_fetched(league):
+    league.run()
+    stats = league.run()
+    assert league.gathered == [] and league.computed == []
+    assert (stats["done"], stats["skipped"]) == (0, 3)
+
+
+def test_changed_frame_rows_are_fetched_but_recomputed_only_if_inputs_changed(league):
+    league.run()
+
+    # Player 1's league-frame rows changed, but not in anything the engine reads
+    league.fingerprints[1] = "fp1-new"
+    stats = league.run()
+    assert league.gathered == [1] and league.computed == []
+    assert (stats["done"], stats["skipped"]) == (0, 3)
+    # ...and the new source hash is recorded, so the next run does not fetch again
+    league.run()
+    assert league.gathered == []
+
+    league.fingerprints[2] = "fp2-new"
+    league.inputs[2] = {"pts": 99}
+    stats = league.run()
+    assert league.gathered == [2] and league.computed == [2]
+    assert tendency_store.get(2, season=SEASON)["tendencies"] == {"Shot": 99}
+
+
+def test_changed_shotdetail_is_fetched(league):
+    league.run()
+    profile = ShotProfile(3, 2024)
+    profile.total_fga = 12
+    league.shotdetail[3] = profile
+    league.run()
+    assert league.gathered == [3]
+    assert league.computed == [3]
+
+
+def test_without_fingerprints_everyone_is_fetched(league):
+    league.run()
+    league.fingerprints = None
+    league.inputs[1] = {"pts": 11}
+    stats = league.run()
+    assert sorted(league.gathered) == [1, 2, 3]
+    assert league.computed == [1]
+    assert (stats["done"], stats["skipped"]) == (1, 2)
+
+
+def test_on_demand_rows_are_skipped_without_fetching(league, monkeypatch):
+    def compute(inputs, shotdetail_data=None, provenance=False):
+        return {"player_id": inputs["player_id"], "name": f"Player {inputs['player_id']}",
+                "tendencies": {"Shot": inputs["stats"]["pts"]}, "provenance": {}}
+
+    monkeypatch.setattr(tendency_calculator, "compute_player_tendencies", compute)
+    monkeypatch.setattr(shotdetail_loader, "load_player_shotdetail",
+                        lambda pid, season_year: league.shotdetail.get(pid))
+    tendency_store.generate(2, "Player 2", season=SEASON)
+    assert tendency_store.stored_versions(SEASON)[2][2] is not None
+
+    league.run()
+    assert 2 not in league.gathered
+    assert sorted(league.computed) == [1, 3]
+
+
+def test_engine_version_change_and_force_recompute_everyone(league):
+    league.run()
+    league.version = "2+rules"
+    league.run()
+    assert sorted(league.computed) == [1, 2, 3]
+    league.run(force=True)
+    assert sorted(league.computed) == [1, 2, 3]
+
+
+def test_missing_or_stale_matrix_is_rebuilt(league):
+    league.run()
+    path = tendency_matrix._path(SEASON)
+    assert path and os.path.exists(path)
+
+    os.remove(path)
+    league.run()
+    assert league.computed == [] and tendency_matrix._path(SEASON) is not None
+
+    # A row written outside precompute (e.g. /api/generate) makes the matrix stale
+    tendency_store.put({"player_id": 4, "name": "Player 4", "tendencies": {"Shot": 1}}, season=SEASON)
+    league.run()
+    assert 4 in tendency_matrix.load(SEASON).ids
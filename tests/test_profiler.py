@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from engine import profiler, tendency_calculator
+
+
+def _leaf():
+    end = time.perf_counter() + 0.03
+    while time.perf_counter() < end:
+        pass
+    return "done"
+
+
+def _work(x):
+    return _leaf(), x
+
+
+def test_profile_returns_result_and_report():
+    result, report = profiler.profile(_work, 1, interval_ms=1)
+    assert result == ("done", 1)
+    assert report["function"] == "_work"
+    assert report["samples"] > 0 and report["wall_ms"] >= 30
+    assert report["tree"]["name"].startswith("_work (tests/test_profiler.py:")
+    assert report["tree"]["children"][0]["name"].startswith("_leaf ")
+    assert report["top"][0]["name"].startswith("_leaf ")
+
+    for line in report["folded"].splitlines():
+        stack, n = line.rsplit(" ", 1)
+        assert stack.startswith("_work ") and int(n) > 0
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in report["folded"].splitlines()) == report["samples"]
+
+
+def test_every_sample_is_rooted_at_the_profiled_function():
+    for _ in range(20):
+        _, report = profiler.profile(_work, 1, interval_ms=0.2)
+        assert report["tree"]["name"].startswith("_work ")
+        assert all(line.startswith("_work ") for line in report["folded"].splitlines())
+
+
+def test_sample_outside_the_call_is_dropped():
+    thread_id, caller = threading.get_ident(), sys._getframe().f_back
+    assert profiler._sample(thread_id, object()) is None                      # not inside the call
+    assert profiler._sample(thread_id, caller, profiler._code_of(_work)) is None   # not in fn
+    assert profiler._sample(thread_id, caller)[0] is test_sample_outside_the_call_is_dropped.__code__
+
+
+def test_switch_interval_is_clamped_and_restored():
+    before = sys.getswitchinterval()
+    during, _ = profiler.profile(sys.getswitchinterval, interval_ms=0.01)
+    assert during == pytest.approx(min(before, profiler.MIN_SWITCH_INTERVAL_MS / 1000))
+    assert sys.getswitchinterval() == before
+
+
+def test_profile_propagates_errors_and_releases_the_lock():
+    def boom():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        profiler.profile(boom, interval_ms=1)
+    assert profiler.profile(lambda: 3, interval_ms=1)[0] == 3
+
+
+def test_one_profile_at_a_time():
+    profiler._active.acquire()
+    try:
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.profile(_work, 1)
+    finally:
+        profiler._active.release()
+
+
+def test_generate_with_profile(client, monkeypatch):
+    monkeypatch.setattr(profiler, "ENABLED", False)
+    assert client.get("/api/generate?player_id=7&profile=1").status_code == 403
+
+    def generate(player_id, player_name, season, provenance=False):
+        _leaf()
+        return {"player_id": player_id, "season": season, "tendencies": {"Shot": 1}}
+
+    monkeypatch.setattr(profiler, "ENABLED", True)
+    monkeypatch.setattr(tendency_calculator, "generate_tendencies_for_player", generate)
+    resp = client.get("/api/generate?player_id=7&profile=1")
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == "no-store"
+    body = resp.get_json()
+    assert body["tendencies"] == {"Shot": 1}
+    assert body["_profile"]["function"].endswith(".generate")
+
+    profiler._active.acquire()
+    try:
+        assert client.get("/api/generate?player_id=7&profile=1").status_code == 409
+    finally:
+        profiler._active.release()
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from engine import nba_stats, player_search, shotdetail_loader, tendency_calculator, tendency_store
+from engine.player_search import RosterSnapshot
+from engine.shot_profile import ShotProfile
+
+SEASON = "2024-25"
+
+
+def _inputs(**overrides):
+    inputs = {
+        "player_id":   7,
+        "player_name": "Ann Alpha",
+        "season":      SEASON,
+        "player_info": {"name": "Ann Alpha", "team": "BOS", "position": "PG"},
+        "tracking":    {"drives_per_game": None, "touches_per_game": None},
+        "shot_zones":  {},
+        "per_game":    {"pts": 20.0, "fga": 15.0, "fg3a": 5.0, "g": 70},
+        "advanced":    {"usg_pct": 25.0},
+        "errors":      {"shot_zones": "ReadTimeout: timed out"},
+    }
+    inputs.update(overrides)
+    return inputs
+
+
+def test_provenance_records_sources_and_what_was_used():
+    plain = tendency_calculator.compute_player_tendencies(_inputs(), shotdetail_data=None)
+    result = tendency_calculator.compute_player_tendencies(_inputs(), shotdetail_data=None, provenance=True)
+    assert "provenance" not in plain
+    assert result["tendencies"] == plain["tendencies"]
+
+    provenance = result["provenance"]
+    assert provenance["engine_version"] == tendency_calculator.engine_version()
+    sources = provenance["data_sources"]
+    assert sources["nba_api_per_game"] == {"status": "OK", "data": _inputs()["per_game"]}
+    assert sources["nba_api_tracking"]["status"] == "ALL_NULL"
+    assert sources["nba_api_shot_zones"] == {"status": "FAILED", "error": "ReadTimeout: timed out", "data": {}}
+    assert sources["shotdetail_csv"] == {"status": "NO_DATA", "data": {}}
+    assert provenance["used"]["per_game"] == _inputs()["per_game"]
+
+
+def test_input_hash_covers_inputs_and_shotdetail_but_not_fetch_errors():
+    base = tendency_calculator.input_hash(_inputs())
+    assert tendency_calculator.input_hash(_inputs(errors={})) == base
+    assert tendency_calculator.input_hash(_inputs(per_game={"pts": 21.0})) != base
+    profile = ShotProfile(7, 2024)
+    profile.total_fga = 3
+    assert tendency_calculator.input_hash(_inputs(), profile) != base
+
+
+@pytest.fixture
+def offline_generate(data_dir, monkeypatch):
+    """tendency_store.generate() over canned inputs; counts gathers."""
+    calls = []
+
+    def gather(player_id, player_name, season):
+        calls.append(player_id)
+        return _inputs(player_id=player_id, player_name=player_name)
+
+    monkeypatch.setattr(tendency_calculator, "gather_player_inputs", gather)
+    monkeypatch.setattr(shotdetail_loader, "load_player_shotdetail", lambda pid, season_year: None)
+    monkeypatch.setattr(nba_stats, "league_fingerprints", lambda season: {7: "fp7"})
+    player_search._snapshots[SEASON] = RosterSnapshot(
+        SEASON, [{"id": 7, "name": "Ann Alpha", "team_abbrev": "BOS", "position": "PG"}], time.time())
+    return calls
+
+
+def test_generate_stores_provenance_and_hashes(offline_generate):
+    result = tendency_store.generate(7, "Ann Alpha", season=SEASON)
+    assert "provenance" in result
+    input_hash, version, source_hash = tendency_store.stored_versions(SEASON)[7]
+    assert input_hash == tendency_calculator.input_hash(_inputs())
+    assert version == tendency_calculator.engine_version()
+    assert source_hash == tendency_store._source_hash("fp7", None)
+    assert tendency_store.get(7, season=SEASON, provenance=True)["provenance"] == result["provenance"]
+
+
+def test_debug_raw_resolves_names_and_reads_the_store(client, offline_generate):
+    assert client.post("/api/debug-raw", json={}).status_code == 400
+    assert client.post("/api/debug-raw", json={"player_name": "Nobody Atall", "season": SEASON}).status_code == 404
+
+    first = client.post("/api/debug-raw", json={"player_name": "ann alpha", "season": SEASON}).get_json()
+    assert (first["player_id"], first["from_store"]) == (7, False)
+    assert first["data_sources"]["nba_api_shot_zones"]["status"] == "FAILED"
+    assert first["engine_version"] == tendency_calculator.engine_version()
+
+    again = client.post("/api/debug-raw", json={"player_id": 7, "season": SEASON}).get_json()
+    assert again["from_store"] is True
+    assert again["inputs_used"] == first["inputs_used"]
+    assert offline_generate == [7]
+
+
+def test_debug_raw_regenerates_rows_stored_without_provenance(client, offline_generate):
+    tendency_store.put({"player_id": 7, "name": "Ann Alpha", "tendencies": {"Shot": 1}}, season=SEASON)
+    response = client.post("/api/debug-raw", json={"player_id": 7, "season": SEASON}).get_json()
+    assert response["from_store"] is False and response["data_sources"]
+    assert offline_generate == [7]
@@ -0,0 +1,104 @@
+import pytest
+
+from engine.search_index import NameIndex, bounded_levenshtein, normalize_name
+
+PLAYERS = [{"id": i, "name": name} for i, name in enumerate([
+    "Anthony Davis",
+    "Anthony Edwards",
+    "Giannis Antetokounmpo",
+    "Thanasis Antetokounmpo",
+    "Kevin Durant",
+    "Nikola Jokić",
+    "Jaren Jackson Jr.",
+    "De'Aaron Fox",
+    "Shai Gilgeous-Alexander",
+])]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return NameIndex(PLAYERS)
+
+
+def _names(players):
+    return [p["name"] for p in players]
+
+
+@pytest.mark.parametrize("raw, norm", [
+    ("Nikola Jokić", "nikola jokic"),
+    ("De'Aaron Fox", "deaaron fox"),
+    ("Shai Gilgeous-Alexander", "shai gilgeous alexander"),
+    ("  Jaren  Jackson Jr. ", "jaren jackson jr"),
+])
+def test_normalize_name(raw, norm):
+    assert normalize_name(raw) == norm
+
+
+def test_lookup(index):
+    assert index.lookup("NIKOLA JOKIC")["name"] == "Nikola Jokić"
+    assert index.lookup("Jaren Jackson")["name"] == "Jaren Jackson Jr."
+    assert index.lookup("Jokic") is None
+
+
+def test_search_ranks_name_prefix_then_word_prefix_then_substring(index):
+    assert _names(index.search("ant")) == [
+        "Anthony Davis", "Anthony Edwards",                          # name starts with it
+        "Giannis Antetokounmpo", "Thanasis Antetokounmpo",           # a word starts with it
+        "Kevin Durant",                                              # anywhere in the name
+    ]
+    assert _names(index.search("okounm")) == ["Giannis Antetokounmpo", "Thanasis Antetokounmpo"]
+    assert _names(index.search("gilgeous")) == ["Shai Gilgeous-Alexander"]
+
+
+def test_search_limit(index):
+    assert _names(index.search("an", limit=2)) == ["Anthony Davis", "Anthony Edwards"]
+    assert index.search("an", limit=0) == []
+    assert index.search("") == []
+    assert index.search("zzz") == []
+
+
+def test_by_last_name(index):
+    assert _names(index.by_last_name("Antetokounmpo")) == ["Giannis Antetokounmpo", "Thanasis Antetokounmpo"]
+    assert _names(index.by_last_name("jackson")) == ["Jaren Jackson Jr."]
+
+
+# ── Fuzzy search ──────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("a, b, max_dist, dist", [
+    ("durant", "durant", 2, 0),
+    ("durnat", "durant", 2, 2),
+    ("kevin", "kelvin", 1, 1),
+    ("abc", "xyzxyz", 2, 3),           # length gap alone exceeds the bound
+    ("abcdef", "uvwxyz", 2, 3),        # capped at max_dist + 1
+])
+def test_bounded_levenshtein(a, b, max_dist, dist):
+    assert bounded_levenshtein(a, b, max_dist) == dist
+
+
+@pytest.mark.parametrize("query, name", [
+    ("antetokoumpo", "Giannis Antetokounmpo"),
+    ("giannis antetokoumpo", "Giannis Antetokounmpo"),
+    ("jokich", "Nikola Jokić"),
+    ("kevin durnat", "Kevin Durant"),
+    ("gilgeus", "Shai Gilgeous-Alexander"),
+])
+def test_fuzzy_search_finds_typos(index, query, name):
+    assert _names(index.fuzzy_search(query, budget_ms=1000))[0] == name
+
+
+def test_fuzzy_search_excludes_and_limits(index):
+    giannis = index.lookup("Giannis Antetokounmpo")
+    found = _names(index.fuzzy_search("antetokoumpo", budget_ms=1000, exclude=[giannis]))
+    assert found == ["Thanasis Antetokounmpo"]
+    assert len(index.fuzzy_search("antetokoumpo", limit=1, budget_ms=1000)) == 1
+    assert index.fuzzy_search("antetokoumpo", limit=0) == []
+
+
+def test_fuzzy_search_rejects_short_and_distant_queries(index):
+    assert index.fuzzy_search("an", budget_ms=1000) == []
+    assert index.fuzzy_search("qwertyuiop", budget_ms=1000) == []
+
+
+def test_fuzzy_search_zero_budget_returns_quickly(index):
+    # Past the deadline before any work: whatever was found, never an error
+    assert isinstance(index.fuzzy_search("antetokoumpo", budget_ms=0), list)
@@ -0,0 +1,92 @@
+import pickle
+
+import pytest
+
+from engine.shot_profile import ACTION_TYPES, ShotProfile
+
+
+def _profile():
+    p = ShotProfile(player_id=203999, season_year=2024)
+    p.total_fga, p.total_fgm, p.games_played = 120, 61, 9
+    p.stepback_2pt, p.stepback_3pt = 3, 4
+    p.add_zone("Restricted Area", "Center(C)", 50, 35)
+    p.add_zone("Above the Break 3", "Left Side Center(LC)", 30, 11)
+    p.add_range("Less Than 8 ft.", 50)
+    p.add_range("24+ ft.", 30)
+    p.add_three_area("Left Side Center(LC)", 30)
+    p.add_action("Driving Layup Shot", 20)
+    p.add_action("Jump Shot", 25)
+    p.add_action("Some New Action", 2)      # not in ACTION_TYPES
+    return p
+
+
+def test_bytes_round_trip():
+    p = _profile()
+    q = ShotProfile.from_bytes(p.to_bytes())
+    assert q == p
+    assert q.to_dict() == p.to_dict()
+    assert (q.player_id, q.season_year) == (203999, 2024)
+    assert q.extra_actions == {"Some New Action": 2}
+
+
+def test_pickle_round_trip():
+    p = _profile()
+    assert pickle.loads(pickle.dumps(p)) == p
+
+
+def test_unknown_zone_and_range_are_ignored():
+    p = ShotProfile(1, 2024)
+    p.add_zone("Nowhere", "Center(C)", 5, 5)
+    p.add_range("Downtown", 5)
+    assert p == ShotProfile(1, 2024)
+
+
+def test_older_blob_with_fewer_actions():
+    p = _profile()
+    blob = bytearray(p.to_bytes())
+    # Rewrite the header's action count and drop the trailing action slots,
+    # as a blob written before the vocabulary grew would look
+    from engine.shot_profile import _HEADER, _N_ZONES, ZONE_AREAS, ZONE_RANGES
+    fields = list(_HEADER.unpack_from(blob, 0))
+    fields[9] = len(ACTION_TYPES) - 1
+    start = _HEADER.size + 4 * (2 * _N_ZONES + len(ZONE_RANGES) + len(ZONE_AREAS))
+    end = start + 4 * len(ACTION_TYPES)
+    old = _HEADER.pack(*fields) + bytes(blob[_HEADER.size:end - 4]) + bytes(blob[end:])
+
+    q = ShotProfile.from_bytes(old)
+    assert len(q.action_fga) == len(ACTION_TYPES)
+    assert q.action_counts() == p.action_counts()
+
+
+def test_rejects_foreign_bytes():
+    with pytest.raises(ValueError):
+        ShotProfile.from_bytes(b"XX" + bytes(64))
+
+
+def _inputs(**overrides):
+    inputs = {"player_id": 203999, "player_name": "Nikola Jokic", "season": "2024-25",
+              "player_info": {"name": "Nikola Jokic", "position": "C"}, "tracking": {},
+              "shot_zones": {}, "per_game": {}, "advanced": {}}
+    inputs.update(overrides)
+    return inputs
+
+
+def _used(inputs, profile):
+    from engine.tendency_calculator import compute_player_tendencies
+    return compute_player_tendencies(inputs, shotdetail_data=profile, provenance=True)["provenance"]["used"]
+
+
+def test_shotdetail_overrides_only_the_splits_it_has():
+    splits = {"pct_fga_3pt": 0.4, "pct_fga_0_3": 0.3}
+    empty = ShotProfile(player_id=203999, season_year=2024)
+    assert _used(_inputs(shooting_splits=splits), empty)["shooting_splits"] == splits
+
+    used = _used(_inputs(shooting_splits=splits), _profile())["shooting_splits"]
+    assert used == _profile().shooting_splits()
+
+
+def test_zero_games_played_is_left_missing_not_replaced_with_60():
+    p = _profile()
+    p.games_played = 0
+    assert _used(_inputs(), p)["per_game"]["g"] is None
+    assert _used(_inputs(), _profile())["per_game"]["g"] == 9
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+
+import pytest
+
+from engine import shotdetail_loader
+
+YEAR = 2030
+
+_ROWS = [
+    # PLAYER_ID, GAME_ID, EVENT_TYPE, SHOT_ZONE_RANGE, SHOT_ZONE_BASIC, SHOT_ZONE_AREA, SHOT_TYPE, ACTION_TYPE
+    (1, 1, "Made Shot",   "Less Than 8 ft.", "Restricted Area",   "Center(C)",            "2PT Field Goal", "Driving Layup Shot"),
+    (1, 1, "Missed Shot", "24+ ft.",         "Above the Break 3", "Left Side Center(LC)", "3PT Field Goal", "Step Back Jump shot"),
+    (1, 2, "Made Shot",   "16-24 ft.",       "Mid-Range",         "Right Side(R)",        "2PT Field Goal", "Pullup Jump shot"),
+    (2, 1, "Made Shot",   "24+ ft.",         "Left Corner 3",     "Left Side(L)",         "3PT Field Goal", "Jump Shot"),
+    (3, 3, "Missed Shot", "8-16 ft.",        "In The Paint (Non-RA)", "Center(C)",        "2PT Field Goal", "Floating Jump shot"),
+]
+
+
+@pytest.fixture
+def season_csv(data_dir, monkeypatch):
+    monkeypatch.setattr(shotdetail_loader, "_stores", {})
+    path = os.path.join(str(data_dir), f"shotdetail_{YEAR}.csv")
+    with open(path, "w") as f:
+        f.write("PLAYER_ID,GAME_ID,EVENT_TYPE,SHOT_ZONE_RANGE,SHOT_ZONE_BASIC,SHOT_ZONE_AREA,SHOT_TYPE,ACTION_TYPE\n")
+        for row in _ROWS:
+            f.write(",".join(map(str, row)) + "\n")
+    return path
+
+
+def test_store_matches_a_per_player_csv_scan(season_csv):
+    scanned = shotdetail_loader.load_players_shotdetail([1, 2, 3, 99], YEAR)
+    assert scanned[99] is None
+    assert (scanned[1].total_fga, scanned[1].total_fgm, scanned[1].games_played) == (3, 2, 2)
+    assert (scanned[1].stepback_2pt, scanned[1].stepback_3pt) == (0, 1)
+
+    store = shotdetail_loader.load_season_store(YEAR)
+    assert sorted(store) == [1, 2, 3]
+    assert all(store[pid] == scanned[pid] for pid in (1, 2, 3))
+    assert shotdetail_loader.load_player_shotdetail(2, YEAR) is store[2]
+
+
+def test_store_is_persisted_and_reread(season_csv, monkeypatch):
+    built = shotdetail_loader.load_season_store(YEAR)
+    assert os.path.exists(shotdetail_loader._store_path(YEAR))
+
+    monkeypatch.setattr(shotdetail_loader, "_stores", {})
+    monkeypatch.setattr(shotdetail_loader, "build_season_store", lambda year: pytest.fail("rebuilt"))
+    assert shotdetail_loader.load_season_store(YEAR) == built
+
+
+def test_store_older_than_the_csv_is_ignored(season_csv, monkeypatch):
+    shotdetail_loader.load_season_store(YEAR)
+    monkeypatch.setattr(shotdetail_loader, "_stores", {})
+    past = time.time() - 60
+    os.utime(shotdetail_loader._store_path(YEAR), (past, past))
+    assert shotdetail_loader.load_season_store(YEAR, build=False) is None
+
+
+def test_concurrent_loads_build_once(season_csv, monkeypatch):
+    builds = []
+    real_build = shotdetail_loader.build_season_store
+
+    def slow_build(year):
+        builds.append(year)
+        time.sleep(0.1)
+        return real_build(year)
+
+    monkeypatch.setattr(shotdetail_loader, "build_season_store", slow_build)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(shotdetail_loader.load_season_store(YEAR)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert builds == [YEAR]
+    assert all(r is results[0] for r in results)
+
+
+def test_player_loads_are_not_blocked_by_a_build(season_csv, monkeypatch):
+    release = threading.Event()
+    real_build = shotdetail_loader.build_season_store
+
+    def stuck_build(year):
+        release.wait(5)
+        return real_build(year)
+
+    monkeypatch.setattr(shotdetail_loader, "build_season_store", stuck_build)
+    builder = threading.Thread(target=shotdetail_loader.load_season_store, args=(YEAR,))
+    builder.start()
+    try:
+        time.sleep(0.05)
+        t0 = time.perf_counter()
+        profile = shotdetail_loader.load_player_shotdetail(1, YEAR)   # scans the CSV meanwhile
+        assert time.perf_counter() - t0 < 2
+        assert profile.total_fga == 3
+    finally:
+        release.set()
+        builder.join()
@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from engine import constants, tendency_master
+
+
+def _workbook(path, rows):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = tendency_master.SCALES_SHEET
+    ws.append(["Order", "Tendency", "Hard Cap", "Notes (2K26)"])
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    return _workbook(tmp_path / "master.xlsx", [
+        [1, "Shot", 70, "Usage tendency"],
+        [8, "Shot Mid", 55, "LOCKED: Shot Mid cap = 45."],
+        [9, "Spot-Up Shot Mid", 50, "Rule: Spot-Up Shot Mid ≤ Shot Mid."],
+        [10, "Off-Screen Mid", 40, "LOCKED SCALE + ABSOLUTE CAP 35."],
+        [11, "Not An Engine Tendency", 10, ""],
+        [12, "Touch", None, "no cap: ignored"],
+    ])
+
+
+def test_compile_merges_onto_the_engine_order(workbook):
+    artifact = tendency_master.compile_workbook(workbook)
+    names = [t["name"] for t in constants.BUILTIN_TENDENCIES]
+    assert [t["name"] for t in artifact["tendencies"]] == names
+    assert artifact["index"] == {name: i for i, name in enumerate(names)}
+
+    caps = dict(zip(names, artifact["hard_caps"]))
+    assert caps["Shot"] == 70
+    builtin_touch = next(t["hard_cap"] for t in constants.BUILTIN_TENDENCIES if t["name"] == "Touch")
+    assert caps["Touch"] == builtin_touch            # no cap in the workbook: built-in kept
+
+
+def test_compile_parses_locked_caps_and_rules(workbook):
+    artifact = tendency_master.compile_workbook(workbook)
+    assert artifact["locked_caps"] == {"Shot Mid": 45}
+    assert artifact["locked_absolute"] == {"Off-Screen Mid": 35}
+    assert artifact["relational_rules"] == [["Spot-Up Shot Mid", "<=", "Shot Mid"]]
+    assert artifact["workbook_sha256"] == tendency_master.workbook_hash(workbook)
+
+
+def test_build_and_load_compiled(workbook, tmp_path):
+    out = str(tmp_path / "out" / "tendency_master.json")
+    built = tendency_master.build(workbook, out)
+    assert tendency_master.load_compiled(out, workbook) == json.loads(json.dumps(built))
+
+    # Missing artifact, other artifact version, or a changed workbook: fall back
+    assert tendency_master.load_compiled(str(tmp_path / "missing.json"), workbook) is None
+    _workbook(workbook, [[1, "Shot", 60, ""]])
+    assert tendency_master.load_compiled(out, workbook) is None
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(dict(built, version=tendency_master.ARTIFACT_VERSION + 1), f)
+    assert tendency_master.load_compiled(out, str(tmp_path / "no-workbook.xlsx")) is None
+
+
+def test_shipped_artifact_matches_the_shipped_workbook():
+    if not os.path.exists(tendency_master.WORKBOOK_PATH):
+        pytest.skip("workbook not present")
+    assert tendency_master.load_compiled() is not None
+
+
+def test_constants_do_not_import_openpyxl():
+    code = "import sys; import engine.constants; print('openpyxl' in sys.modules)"
+    root = os.path.join(os.path.dirname(__file__), "..")
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from engine import tendency_matrix, tendency_store
+from engine.constants import TENDENCY_ORDER
+
+SEASON = "2024-25"
+SHOT, TOUCH = "Shot", "Touch"
+
+
+def _result(pid, name, team, position, drive, post):
+    return {"player_id": pid, "name": name, "team": team, "position": position,
+            "tendencies": {SHOT: drive, TOUCH: post}}
+
+
+@pytest.fixture
+def league(data_dir):
+    for r in [
+        _result(1, "Ann Alpha", "BOS", "PG", 80, 10),
+        _result(2, "Bo Beta",   "lal", "C",  20, 90),
+        _result(3, "Cy Gamma",  "BOS", "SF", 80, 45),
+        _result(4, "Di Delta",  "MIA", "SF", 55, 60),
+    ]:
+        tendency_store.put(r, season=SEASON)
+    return data_dir
+
+
+def _ids(result):
+    return [r["player_id"] for r in result["results"]]
+
+
+def test_build_writes_one_file(league):
+    assert tendency_matrix.build(SEASON) == 4
+    files = [p for p in league.iterdir() if p.suffix == ".matrix"]
+    assert len(files) == 1 and files[0].name.startswith(f"tendencies_{SEASON}.")
+    assert str(files[0]) == tendency_matrix._path(SEASON)
+    matrix = tendency_matrix.load(SEASON)
+    assert len(matrix) == 4
+    assert list(matrix.ids) == [1, 2, 3, 4]
+    assert list(matrix.teams) == ["BOS", "LAL", "BOS", "MIA"]
+    assert matrix.values.shape == (4, len(TENDENCY_ORDER))
+    assert tendency_matrix.built_at(SEASON) == matrix.built_at
+
+
+def test_query_is_built_on_demand_and_none_without_data(data_dir):
+    assert tendency_matrix.query(SEASON) is None
+    assert tendency_matrix.built_at(SEASON) is None
+
+
+def test_query_filters(league):
+    assert _ids(tendency_matrix.query(SEASON, position="sf")) == [3, 4]
+    assert _ids(tendency_matrix.query(SEASON, team=["bos", "LAL"])) == [1, 2, 3]
+    assert _ids(tendency_matrix.query(SEASON, where=[f"{SHOT}>=55", f"{TOUCH.lower()} > 40"])) == [3, 4]
+    assert _ids(tendency_matrix.query(SEASON, team="BOS", where=[f"{TOUCH}<20"])) == [1]
+    assert tendency_matrix.query(SEASON, team="NYK")["matched"] == 0
+
+
+def test_query_sort_is_stable_and_returns_the_sort_column(league):
+    result = tendency_matrix.query(SEASON, sort=SHOT)
+    assert _ids(result) == [1, 3, 4, 2]               # ties keep player-id order
+    assert result["results"][0]["tendencies"] == {SHOT: 80}
+    assert _ids(tendency_matrix.query(SEASON, sort=SHOT, descending=False)) == [2, 4, 1, 3]
+    row = tendency_matrix.query(SEASON, sort=SHOT, columns=[TOUCH], limit=1)["results"][0]
+    assert row == {"player_id": 1, "name": "Ann Alpha", "team": "BOS", "position": "PG",
+                   "tendencies": {TOUCH: 10}}
+
+
+@pytest.mark.parametrize("limit, returned", [(None, 4), (2, 2), (0, 0), (10, 4)])
+def test_query_limit(league, limit, returned):
+    result = tendency_matrix.query(SEASON, sort=TOUCH, limit=limit)
+    assert result["matched"] == 4
+    assert len(result["results"]) == returned
+
+
+def test_bad_filters_and_columns(league):
+    with pytest.raises(ValueError):
+        tendency_matrix.query(SEASON, where=["Shot!40"])
+    with pytest.raises(ValueError):
+        tendency_matrix.query(SEASON, sort="Not A Tendency")
+
+
+def test_rebuild_is_picked_up(league):
+    tendency_matrix.build(SEASON)
+    before = tendency_matrix.load(SEASON)
+    tendency_store.put(_result(5, "Ed Eps", "BOS", "PF", 99, 99), season=SEASON)
+    tendency_matrix.build(SEASON)
+    after = tendency_matrix.load(SEASON)
+    assert after is not before
+    assert len(after) == 5
+    assert len(before) == 4      # an open matrix is not changed under its reader
+    assert before.values.sum() > 0
+
+
+def test_rebuild_never_replaces_a_mapped_file(league, monkeypatch):
+    tendency_matrix.build(SEASON)
+    first = tendency_matrix._path(SEASON)
+    mapped = tendency_matrix.load(SEASON)
+
+    # Windows refuses to replace or remove a file that is still mapped
+    replace, remove = os.replace, os.remove
+    locked = {first}
+
+    def guarded_replace(src, dst):
+        if os.path.exists(dst):
+            raise PermissionError(f"in use: {dst}")
+        replace(src, dst)
+
+    def guarded_remove(path):
+        if path in locked:
+            raise PermissionError(f"in use: {path}")
+        remove(path)
+
+    monkeypatch.setattr(os, "replace", guarded_replace)
+    monkeypatch.setattr(os, "remove", guarded_remove)
+    tendency_store.put(_result(5, "Ed Eps", "BOS", "PF", 99, 99), season=SEASON)
+    tendency_matrix.build(SEASON)
+    second = tendency_matrix._path(SEASON)
+    assert second != first and os.path.exists(first)
+    assert len(tendency_matrix.load(SEASON)) == 5
+    assert len(mapped) == 4
+
+    locked.clear()
+    tendency_matrix.build(SEASON)
+    assert [path for _, path in tendency_matrix._versions(SEASON)] == [tendency_matrix._path(SEASON)]
+    assert not os.path.exists(first) and not os.path.exists(second)
@@ -0,0 +1,114 @@
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from engine import bulk_runner, player_search, tendency_store
+from engine.player_search import RosterSnapshot
+
+SEASON = "2024-25"
+
+
+def _result(pid, shot=50, **extra):
+    return {"player_id": pid, "name": f"Player {pid}", "team": "BOS", "position": "SF",
+            "tendencies": {"Shot": shot}, **extra}
+
+
+def test_put_get_round_trip(data_dir):
+    assert tendency_store.get(1, season=SEASON) is None
+    tendency_store.put(_result(1), season=SEASON, input_hash="h1", engine_version="v1", source_hash="s1")
+    assert tendency_store.get(1, season=SEASON) == _result(1)
+    assert tendency_store.get(1, season="2023-24") is None
+    assert tendency_store.stored_versions(SEASON) == {1: ("h1", "v1", "s1")}
+
+    tendency_store.put(_result(1, shot=60), season=SEASON)
+    assert tendency_store.get(1, season=SEASON)["tendencies"] == {"Shot": 60}
+
+
+def test_put_keeps_provenance_apart(data_dir):
+    tendency_store.put(_result(1, provenance={"inputs": {"pts": 20}}), season=SEASON)
+    assert "provenance" not in tendency_store.get(1, season=SEASON)
+    assert tendency_store.get(1, season=SEASON, provenance=True)["provenance"] == {"inputs": {"pts": 20}}
+    assert tendency_store.computed_at(1, season=SEASON, with_provenance=True) is not None
+
+    tendency_store.put(_result(1, shot=60), season=SEASON)
+    assert tendency_store.computed_at(1, season=SEASON) is not None
+    assert tendency_store.computed_at(1, season=SEASON, with_provenance=True) is None
+
+
+def test_season_queries(data_dir):
+    assert tendency_store.season_stamp(SEASON) == (0, 0.0)
+    for pid in (3, 1, 2):
+        tendency_store.put(_result(pid), season=SEASON)
+    count, latest = tendency_store.season_stamp(SEASON)
+    assert count == 3 and latest == pytest.approx(time.time(), abs=60)
+    assert [r["player_id"] for r in tendency_store.iter_season(SEASON)] == [1, 2, 3]
+    assert tendency_store.stored_ids([1, 3, 9], season=SEASON) == {1, 3}
+    assert tendency_store.stored_ids([], season=SEASON) == set()
+    status = tendency_store.status(SEASON)
+    assert (status["players"], status["running"], status["last_run"]) == (3, False, None)
+    assert status["latest"] == pytest.approx(time.time(), abs=60)
+
+
+def test_old_database_is_migrated(data_dir):
+    with sqlite3.connect(tendency_store.DB_PATH) as conn:
+        conn.execute("CREATE TABLE tendencies (season TEXT NOT NULL, player_id INTEGER NOT NULL, "
+                     "name TEXT NOT NULL, team TEXT, position TEXT, result TEXT NOT NULL, "
+                     "computed_at REAL NOT NULL, PRIMARY KEY (season, player_id))")
+        conn.execute("INSERT INTO tendencies VALUES (?, 1, 'Player 1', 'BOS', 'SF', '{\"player_id\": 1}', 1.0)",
+                     (SEASON,))
+    assert tendency_store.stored_versions(SEASON) == {1: (None, None, None)}
+    tendency_store.put(_result(2), season=SEASON, input_hash="h2")
+    assert tendency_store.stored_versions(SEASON)[2][0] == "h2"
+
+
+def test_precompute_stores_every_rostered_player(data_dir, monkeypatch):
+    roster = [{"id": pid, "name": f"Player {pid}"} for pid in (1, 2, 3)]
+    player_search._snapshots[SEASON] = RosterSnapshot(SEASON, roster, time.time())
+
+    def iter_bulk(players, season="2024-25", stats=None, **kwargs):
+        stats.update(total=len(players), done=0, failed=0, players_per_sec=1.0)
+        for p in players:
+            if p["id"] == 2:
+                stats["failed"] += 1
+                yield p, None, "RuntimeError: boom"
+            else:
+                stats["done"] += 1
+                yield p, _result(p["id"]), None
+
+    monkeypatch.setattr(bulk_runner, "iter_bulk", iter_bulk)
+    stats = tendency_store.precompute(SEASON)
+    assert (stats["done"], stats["failed"]) == (2, 1)
+    assert tendency_store.stored_ids([1, 2, 3], season=SEASON) == {1, 3}
+    last_run = tendency_store.status(SEASON)["last_run"]
+    assert (last_run["total"], last_run["done"], last_run["failed"]) == (3, 2, 1)
+
+
+def test_only_one_precompute_per_season(data_dir, monkeypatch):
+    monkeypatch.setattr(tendency_store, "_running", {SEASON})
+    assert tendency_store.precompute(SEASON) is None
+    assert tendency_store.precompute_in_background(SEASON) is False
+    assert tendency_store.status(SEASON)["running"] is True
+
+
+@pytest.mark.parametrize("now, hour, seconds", [
+    (datetime(2030, 1, 1, 3, 0), 4, 3600),
+    (datetime(2030, 1, 1, 4, 0), 4, 24 * 3600),       # at the hour: next night
+    (datetime(2030, 1, 1, 23, 30), 4, 4.5 * 3600),
+])
+def test_seconds_until_the_nightly_run(now, hour, seconds):
+    assert tendency_store._seconds_until(hour, now) == seconds
+
+
+def test_store_endpoint(client, monkeypatch):
+    started = []
+    monkeypatch.setattr(tendency_store, "precompute_in_background",
+                        lambda season, force=False: started.append((season, force)) or True)
+    tendency_store.put(_result(1), season=SEASON)
+
+    assert client.get(f"/api/store?season={SEASON}").get_json()["players"] == 1
+    response = client.post(f"/api/store?season={SEASON}&force=1")
+    assert response.status_code == 202
+    assert response.get_json()["started"] is True
+    assert started == [(SEASON, True)]
@@ -0,0 +1,119 @@
+import contextvars
+import threading
+from collections import deque
+
+import pytest
+
+from engine import tendency_store, tracing
+
+
+@pytest.fixture(autouse=True)
+def fresh_traces(monkeypatch):
+    monkeypatch.setattr(tracing, "_aggregates", {})
+    monkeypatch.setattr(tracing, "_recent", deque(maxlen=tracing.TRACE_KEEP))
+    monkeypatch.setattr(tracing, "ENABLED", True)
+
+
+def _in_fresh_context(fn):
+    return contextvars.Context().run(fn)
+
+
+@tracing.traced()
+def _stage():
+    with tracing.span("inner", n=1):
+        pass
+
+
+def test_spans_nest_and_record_errors():
+    def run():
+        trace = tracing.start_trace("/api/x")
+        with tracing.span("outer"):
+            _stage()
+        with pytest.raises(KeyError):
+            with tracing.span("broken"):
+                raise KeyError("x")
+        tracing.finish_trace(trace)
+        return trace
+
+    trace = _in_fresh_context(run)
+    spans = {s["name"]: s for s in trace.spans}
+    assert set(spans) == {"outer", "test_tracing._stage", "inner", "broken"}
+    assert spans["outer"]["parent"] is None
+    assert spans["test_tracing._stage"]["parent"] == spans["outer"]["id"]
+    assert spans["inner"]["parent"] == spans["test_tracing._stage"]["id"]
+    assert spans["inner"]["attrs"] == {"n": 1}
+    assert spans["broken"]["error"] == "KeyError"
+    assert tracing.current() is None
+
+
+def test_spans_are_no_ops_outside_a_trace():
+    def run():
+        with tracing.span("nothing"):
+            _stage()
+        return tracing.current()
+
+    assert _in_fresh_context(run) is None
+    assert tracing.aggregates() == {}
+
+
+def test_threads_join_the_trace_via_copied_context():
+    def run():
+        trace = tracing.start_trace("/api/bulk")
+        with tracing.span("parent"):
+            worker = threading.Thread(target=contextvars.copy_context().run, args=(_stage,))
+            worker.start()
+            worker.join()
+        tracing.finish_trace(trace)
+        return trace
+
+    trace = _in_fresh_context(run)
+    spans = {s["name"]: s for s in trace.spans}
+    assert spans["test_tracing._stage"]["parent"] == spans["parent"]["id"]
+    assert spans["test_tracing._stage"]["thread"] != spans["parent"]["thread"]
+
+
+def test_aggregates_ring_and_exports():
+    def run():
+        trace = tracing.start_trace("/api/generate")
+        _stage()
+        _stage()
+        tracing.finish_trace(trace)
+        tracing.finish_trace(trace)          # finishing twice is harmless
+        return trace
+
+    first, second = _in_fresh_context(run), _in_fresh_context(run)
+    agg = tracing.aggregates()["/api/generate"]
+    assert agg["count"] == 2
+    assert agg["spans"]["inner"]["count"] == 4
+    assert [t.id for t in tracing.recent()] == [first.id, second.id]
+    assert tracing.recent(second.id) == [second]
+    assert first.summary()["spans"]["inner"]["count"] == 2
+
+    events = tracing.chrome_trace([first])["traceEvents"]
+    assert events[0]["ph"] == "M" and events[1]["name"] == "/api/generate"
+    assert {e["name"] for e in events[2:]} == {"test_tracing._stage", "inner"}
+    assert all(e["pid"] == first.id for e in events)
+
+    timing = tracing.server_timing(first)
+    assert 'inner;dur=' in timing and 'desc="2x"' in timing
+
+
+def test_trace_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "ENABLED", False)
+    assert _in_fresh_context(lambda: tracing.start_trace("/api/x")) is None
+
+
+def test_request_traces_over_http(client):
+    tendency_store.put({"player_id": 7, "name": "Ann Alpha", "tendencies": {"Shot": 1}}, season="2024-25")
+    plain = client.get("/api/generate?player_id=7")
+    assert plain.headers["X-Trace-Id"] and "Server-Timing" not in plain.headers
+    assert "_trace" not in plain.get_json()
+
+    traced = client.get("/api/generate?player_id=7&trace=1")
+    assert "Server-Timing" in traced.headers
+    assert traced.get_json()["_trace"]["name"] == "/api/generate"
+
+    trace_id = int(traced.headers["X-Trace-Id"])
+    assert client.get(f"/api/traces/{trace_id}").get_json()["traceEvents"]
+    assert client.get("/api/traces/999999").status_code == 404
+    assert client.get("/api/traces").get_json()["endpoints"]["/api/generate"]["count"] == 2
@@ -0,0 +1,93 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+from engine import warmup
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def _imported_after(statement, modules):
+    code = f"import sys; {statement}; print(','.join(m for m in {modules!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def test_import_app_leaves_heavy_modules_for_the_warmup_thread():
+    heavy = ["pandas", "numpy", "nba_api", "openpyxl", "engine.tendency_calculator", "engine.exporters"]
+    assert _imported_after("import app", heavy) == []
+
+
+def test_lazy_modules_are_not_preloaded():
+    assert _imported_after("from engine import warmup; warmup.preload_modules()", warmup.LAZY_MODULES) == []
+
+
+def test_module_lists_name_real_modules():
+    for name in warmup.HOT_MODULES + warmup.LAZY_MODULES:
+        if name.startswith("engine."):
+            assert importlib.util.find_spec(name) is not None, name
+    assert not set(warmup.HOT_MODULES) & set(warmup.LAZY_MODULES)
+
+
+def test_preload_records_times_and_errors():
+    timings = warmup.preload_modules(["json", "engine.no_such_module"])
+    assert isinstance(timings["json"], float)
+    assert timings["engine.no_such_module"].startswith("ModuleNotFoundError")
+
+
+# ── Phases and readiness ──────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("value, phases", [
+    ("", list(warmup.PHASES)),
+    ("all", list(warmup.PHASES)),
+    ("none", []),
+    ("off", []),
+    ("league, Roster", ["roster", "league"]),          # run in PHASES order
+    ("roster,bogus", ["roster"]),
+])
+def test_configured_phases(value, phases):
+    assert warmup.configured_phases(value) == phases
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(warmup, "_state", {"status": "idle", "season": None, "started_at": None,
+                                           "finished_at": None, "phases": {}, "modules": {}})
+
+
+def test_run_records_each_phase(fresh_state, monkeypatch):
+    def failing(season):
+        raise RuntimeError("shotdetail data unavailable")
+
+    monkeypatch.setitem(warmup._PHASE_FUNCS, "roster", lambda season: f"roster {season}")
+    monkeypatch.setitem(warmup._PHASE_FUNCS, "shotdetail", failing)
+    warmup._state.update(season="2030-31", phases={"roster": {}, "shotdetail": {}})
+    warmup._run(["roster", "shotdetail"], "2030-31")
+
+    state = warmup.status()
+    assert state["ready"] and state["status"] == "done"
+    assert state["phases"]["roster"]["detail"] == "roster 2030-31"
+    assert state["phases"]["shotdetail"] == {
+        "status": "failed", "error": "RuntimeError: shotdetail data unavailable",
+        "ms": state["phases"]["shotdetail"]["ms"]}
+
+
+def test_start_runs_once_and_no_phases_is_ready(fresh_state):
+    assert warmup.start(phases=[], season="2030-31") is False
+    assert warmup.status()["ready"]
+    assert warmup.start(phases=["roster"]) is False      # already started
+
+
+def test_ready_endpoint(client, fresh_state):
+    warmup._state.update(status="running", phases={"roster": {"status": "running"}})
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.get_json()["phases"] == {"roster": {"status": "running"}}
+
+    warmup._state.update(status="done", modules={"json": 0.1})
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    assert "modules" not in response.get_json()